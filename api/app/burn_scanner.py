@@ -0,0 +1,397 @@
+"""
+On-chain discovery of CCTP burns for the relayer
+Scans source chains for DepositForBurn events emitted by Circle's
+TokenMessengers on behalf of our router contracts, and hands each burn to the
+relayer as soon as it is seen, so transfers are relayed even when the client
+never registers them.
+"""
+
+import asyncio
+import glob
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional
+
+from web3 import AsyncWeb3, Web3
+
+from app.transfer_store import TransferStore
+
+logger = logging.getLogger(__name__)
+
+# event DepositForBurn(uint64 indexed nonce, address indexed burnToken, uint256 amount,
+#     address indexed depositor, bytes32 mintRecipient, uint32 destinationDomain,
+#     bytes32 destinationTokenMessenger, bytes32 destinationCaller)
+DEPOSIT_FOR_BURN_V1 = (
+    "0x"
+    + bytes(
+        Web3.keccak(
+            text="DepositForBurn(uint64,address,uint256,address,bytes32,uint32,bytes32,bytes32)"
+        )
+    ).hex()
+)
+# event DepositForBurn(address indexed burnToken, uint256 amount,
+#     address indexed depositor, bytes32 mintRecipient, uint32 destinationDomain,
+#     bytes32 destinationTokenMessenger, bytes32 destinationCaller, uint256 maxFee,
+#     uint32 indexed minFinalityThreshold, bytes hookData)
+DEPOSIT_FOR_BURN_V2 = (
+    "0x"
+    + bytes(
+        Web3.keccak(
+            text="DepositForBurn(address,uint256,address,bytes32,uint32,bytes32,bytes32,uint256,uint32,bytes)"
+        )
+    ).hex()
+)
+
+# TokenMessengerV2 is deployed at the same address on every chain
+TOKEN_MESSENGER_V2 = "0x28b5a0e9C621a5BadaA536219b3a228C8168cf5d"
+TOKEN_MESSENGER_V2_TESTNET = "0x8FE6B999Dc680CcFDD5Bf7EB0974218be2542DAA"
+
+# CCTP domain per chain ID (testnets share their mainnet's domain)
+CHAIN_DOMAINS = {
+    1: 0,
+    11155111: 0,  # Ethereum / Sepolia
+    43114: 1,
+    43113: 1,  # Avalanche / Fuji
+    10: 2,
+    11155420: 2,  # Optimism / OP Sepolia
+    42161: 3,
+    421614: 3,  # Arbitrum / Arbitrum Sepolia
+    8453: 6,
+    84532: 6,  # Base / Base Sepolia
+    137: 7,
+    80002: 7,  # Polygon / Amoy
+}
+TESTNET_CHAIN_IDS = {11155111, 43113, 11155420, 421614, 84532, 80002}
+
+# Approximate block times, used as the head polling interval
+BLOCK_TIMES = {
+    1: 12.0,
+    11155111: 12.0,
+    42161: 0.25,
+    421614: 0.25,
+    8453: 2.0,
+    84532: 2.0,
+    10: 2.0,
+    11155420: 2.0,
+}
+DEFAULT_BLOCK_TIME = 2.0
+
+
+class DepositForBurn(NamedTuple):
+    """Non-indexed fields of a DepositForBurn log shared by v1 and v2"""
+
+    amount: int
+    dest_domain: int
+    # v2 only: most the burn pays for fast finality (0 in v1)
+    max_fee: int
+
+
+def parse_deposit_for_burn(log) -> Optional[DepositForBurn]:
+    """Decode a v1/v2 DepositForBurn log; None for any other log"""
+    topics = log.get("topics") or []
+    topic = _hex(topics[0]) if topics else None
+    if topic not in (DEPOSIT_FOR_BURN_V1, DEPOSIT_FOR_BURN_V2):
+        return None
+    # amount and destinationDomain are the first and third words of the
+    # non-indexed data in both versions; maxFee is the sixth in v2
+    data = bytes(log["data"])
+    max_fee = (
+        int.from_bytes(data[160:192], "big") if topic == DEPOSIT_FOR_BURN_V2 else 0
+    )
+    return DepositForBurn(
+        amount=int.from_bytes(data[0:32], "big"),
+        dest_domain=int.from_bytes(data[64:96], "big"),
+        max_fee=max_fee,
+    )
+
+
+@dataclass
+class ScanTarget:
+    """Contracts to watch on one source chain"""
+
+    chain_id: int
+    network: str
+    rpc: Optional[str]
+    token_messengers: List[str] = field(default_factory=list)
+    # Contracts that call depositForBurn on users' behalf (our routers)
+    depositors: List[str] = field(default_factory=list)
+
+    @property
+    def domain(self) -> Optional[int]:
+        return CHAIN_DOMAINS.get(self.chain_id)
+
+
+def load_scan_targets(path: str, network: str = "mainnet") -> Dict[int, ScanTarget]:
+    """Read scan targets from the contract deployment exports
+
+    Accepts a directory of per-network files (contracts/deployments/exported/*.json,
+    each with ``chainId``, ``contracts``, ``externalContracts`` and ``rpc``) or a
+    single file. Only chains of ``network`` (mainnet/testnet) are kept: testnets
+    share their mainnet's CCTP domain, so a burn on the other network would be
+    looked up in the wrong Iris API and never attested.
+    """
+    files = (
+        sorted(glob.glob(os.path.join(path, "*.json")))
+        if os.path.isdir(path)
+        else [path]
+    )
+    targets: Dict[int, ScanTarget] = {}
+    for file in files:
+        with open(file) as f:
+            deployment = json.load(f)
+        if not isinstance(deployment, dict) or "chainId" not in deployment:
+            continue
+        chain_id = int(deployment["chainId"])
+        if chain_id not in CHAIN_DOMAINS:
+            continue
+        if (chain_id in TESTNET_CHAIN_IDS) != (network == "testnet"):
+            logger.warning(
+                f"Not scanning {deployment.get('network', chain_id)} for burns: the "
+                f"relayer runs on {network}"
+            )
+            continue
+
+        external = deployment.get("externalContracts", {})
+        token_messengers = [
+            external.get("CCTPTokenMessenger"),
+            deployment.get("protocols", {}).get("cctp", {}).get("address"),
+            TOKEN_MESSENGER_V2_TESTNET
+            if chain_id in TESTNET_CHAIN_IDS
+            else TOKEN_MESSENGER_V2,
+        ]
+        target = targets.setdefault(
+            chain_id,
+            ScanTarget(
+                chain_id=chain_id,
+                network=deployment.get("network", str(chain_id)),
+                rpc=deployment.get("rpc"),
+            ),
+        )
+        target.rpc = target.rpc or deployment.get("rpc")
+        for address in token_messengers:
+            if (
+                address
+                and Web3.to_checksum_address(address) not in target.token_messengers
+            ):
+                target.token_messengers.append(Web3.to_checksum_address(address))
+        for address in deployment.get("contracts", {}).values():
+            if address and Web3.to_checksum_address(address) not in target.depositors:
+                target.depositors.append(Web3.to_checksum_address(address))
+    return targets
+
+
+OnBurn = Callable[[str, int, int], Awaitable[None]]
+
+
+class BurnScanner:
+    """Follows each source chain's head with eth_getLogs and reports burns
+
+    Block ranges adapt to the provider: they double while queries succeed with
+    few results and halve when a query fails (range or result-size limits,
+    timeouts), and stay at half the smallest range that has ever failed. The
+    last scanned block is checkpointed per chain so a restart resumes where it
+    stopped.
+    """
+
+    def __init__(
+        self,
+        targets: Dict[int, ScanTarget],
+        store: Optional[TransferStore] = None,
+        web3_instances: Optional[Dict[int, AsyncWeb3]] = None,
+        initial_range: int = 500,
+        max_range: int = 2000,
+        checkpoint_interval: float = 5.0,
+        start_lookback: int = 0,
+    ):
+        """
+        Args:
+            targets: Scan targets by chain ID (see load_scan_targets)
+            store: Store for per-chain checkpoints (in-memory only if None)
+            web3_instances: Clients by chain ID; defaults to one per target's rpc
+            initial_range: First eth_getLogs block range when catching up
+            max_range: Largest block range per eth_getLogs query
+            checkpoint_interval: Minimum seconds between checkpoint writes per chain
+            start_lookback: Blocks behind head to start from on a chain that has
+                no checkpoint yet
+        """
+        self.targets = {
+            chain_id: t
+            for chain_id, t in targets.items()
+            if t.depositors and t.domain is not None
+        }
+        self.store = store
+        self.web3_instances = dict(web3_instances or {})
+        self.initial_range = initial_range
+        self.max_range = max_range
+        self.checkpoint_interval = checkpoint_interval
+        self.start_lookback = start_lookback
+
+        self.checkpoints: Dict[int, int] = {}
+        self.ranges: Dict[int, int] = {}
+        # Smallest range that failed per chain; growth stops at half of it
+        self._failed_ranges: Dict[int, int] = {}
+        self.discovered: Dict[int, int] = {}
+        self._saved: Dict[int, int] = {}
+        self._saved_at: Dict[int, float] = {}
+        self._on_burn: Optional[OnBurn] = None
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(
+        self, on_burn: OnBurn, web3_instances: Optional[Dict[int, AsyncWeb3]] = None
+    ):
+        """Start one scan task per chain
+
+        Args:
+            on_burn: Coroutine called per burn with (tx_hash, source_domain,
+                dest_domain)
+            web3_instances: Existing clients by chain ID, used where none was given
+                to the constructor (targets without either use their ``rpc``)
+        """
+        self._on_burn = on_burn
+        for chain_id, web3 in (web3_instances or {}).items():
+            self.web3_instances.setdefault(chain_id, web3)
+        for chain_id, target in self.targets.items():
+            if chain_id not in self.web3_instances:
+                if not target.rpc:
+                    logger.warning(
+                        f"No RPC for {target.network}, not scanning it for burns"
+                    )
+                    continue
+                self.web3_instances[chain_id] = AsyncWeb3(
+                    AsyncWeb3.AsyncHTTPProvider(target.rpc)
+                )
+            self._tasks.append(asyncio.create_task(self._scan_loop(target)))
+        logger.info(f"Burn scanner watching {len(self._tasks)} chains")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        for chain_id in list(self.checkpoints):
+            await self._save_checkpoint(chain_id, force=True)
+
+    async def _scan_loop(self, target: ScanTarget):
+        chain_id = target.chain_id
+        web3 = self.web3_instances[chain_id]
+        block_time = BLOCK_TIMES.get(chain_id, DEFAULT_BLOCK_TIME)
+        self.ranges[chain_id] = self.initial_range
+
+        while True:
+            try:
+                head = await web3.eth.block_number
+                if chain_id not in self.checkpoints:
+                    await self._load_checkpoint(chain_id, head)
+
+                # Catch up in adaptive ranges, then follow the head block by block
+                while self.checkpoints[chain_id] < head:
+                    from_block = self.checkpoints[chain_id] + 1
+                    to_block = min(head, from_block + self.ranges[chain_id] - 1)
+                    found = await self._scan_range(target, web3, from_block, to_block)
+                    self.checkpoints[chain_id] = to_block
+                    if (
+                        found < 100
+                        and to_block - from_block + 1 == self.ranges[chain_id]
+                    ):
+                        ceiling = (
+                            self._failed_ranges.get(chain_id, 2 * self.max_range) // 2
+                        )
+                        self.ranges[chain_id] = max(
+                            1, min(self.max_range, ceiling, self.ranges[chain_id] * 2)
+                        )
+                    await self._save_checkpoint(chain_id)
+
+                await asyncio.sleep(block_time)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                previous = self.ranges[chain_id]
+                self.ranges[chain_id] = max(1, previous // 2)
+                self._failed_ranges[chain_id] = min(
+                    previous, self._failed_ranges.get(chain_id, previous)
+                )
+                logger.warning(
+                    f"Burn scan on {target.network} failed ({e}); "
+                    f"range {previous} -> {self.ranges[chain_id]} blocks"
+                )
+                if previous == 1:
+                    # Not a range problem: back off before retrying
+                    await asyncio.sleep(max(block_time, 1.0))
+
+    async def _scan_range(
+        self, target: ScanTarget, web3: AsyncWeb3, from_block: int, to_block: int
+    ) -> int:
+        """Report our depositors' burns in [from_block, to_block]; returns the count"""
+        depositors = [_address_topic(address) for address in target.depositors]
+        # depositor is the third indexed topic in v1 and the second in v2, so
+        # each version needs its own filter
+        v1_logs, v2_logs = await asyncio.gather(
+            web3.eth.get_logs(
+                {
+                    "fromBlock": from_block,
+                    "toBlock": to_block,
+                    "address": target.token_messengers,
+                    "topics": [DEPOSIT_FOR_BURN_V1, None, None, depositors],
+                }
+            ),
+            web3.eth.get_logs(
+                {
+                    "fromBlock": from_block,
+                    "toBlock": to_block,
+                    "address": target.token_messengers,
+                    "topics": [DEPOSIT_FOR_BURN_V2, None, depositors],
+                }
+            ),
+        )
+
+        for log in [*v1_logs, *v2_logs]:
+            dest_domain = parse_deposit_for_burn(log).dest_domain
+            tx_hash = _hex(log["transactionHash"])
+            logger.info(
+                f"🔎 Discovered burn {tx_hash} on {target.network} (block "
+                f"{log['blockNumber']}) -> domain {dest_domain}"
+            )
+            await self._on_burn(tx_hash, target.domain, dest_domain)
+
+        found = len(v1_logs) + len(v2_logs)
+        self.discovered[target.chain_id] = (
+            self.discovered.get(target.chain_id, 0) + found
+        )
+        return found
+
+    async def _load_checkpoint(self, chain_id: int, head: int):
+        checkpoint = await self.store.get_checkpoint(chain_id) if self.store else None
+        if checkpoint is None:
+            checkpoint = max(0, head - self.start_lookback)
+        self.checkpoints[chain_id] = checkpoint
+        self._saved[chain_id] = checkpoint
+        logger.info(
+            f"Burn scan on chain {chain_id} resuming after block {checkpoint} (head "
+            f"{head})"
+        )
+
+    async def _save_checkpoint(self, chain_id: int, force: bool = False):
+        if not self.store or self._saved.get(chain_id) == self.checkpoints[chain_id]:
+            return
+        if (
+            not force
+            and time.time() - self._saved_at.get(chain_id, 0) < self.checkpoint_interval
+        ):
+            return
+        await self.store.save_checkpoint(chain_id, self.checkpoints[chain_id])
+        self._saved[chain_id] = self.checkpoints[chain_id]
+        self._saved_at[chain_id] = time.time()
+
+
+def _address_topic(address: str) -> str:
+    return "0x" + "00" * 12 + address[2:].lower()
+
+
+def _hex(value) -> str:
+    if isinstance(value, str):
+        return value if value.startswith("0x") else "0x" + value
+    return "0x" + bytes(value).hex()
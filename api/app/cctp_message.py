@@ -0,0 +1,192 @@
+"""
+CCTP message parsing
+Single-pass, zero-copy parser for CCTP v1 and v2 messages and their
+TokenMessenger burn-message bodies. Byte fields are memoryview slices of the
+original message, so parsing never copies the payload.
+
+Layouts (big-endian, offsets in bytes):
+
+    v1 header   version 0:4, sourceDomain 4:8, destinationDomain 8:12,
+                nonce (uint64) 12:20, sender 20:52, recipient 52:84,
+                destinationCaller 84:116, messageBody 116:
+    v2 header   version 0:4, sourceDomain 4:8, destinationDomain 8:12,
+                nonce (bytes32) 12:44, sender 44:76, recipient 76:108,
+                destinationCaller 108:140, minFinalityThreshold 140:144,
+                finalityThresholdExecuted 144:148, messageBody 148:
+    v1 burn     version 0:4, burnToken 4:36, mintRecipient 36:68,
+                amount 68:100, messageSender 100:132
+    v2 burn     v1 fields, then maxFee 132:164, feeExecuted 164:196,
+                expirationBlock 196:228, hookData 228:
+"""
+
+from typing import NamedTuple, Optional, Union
+
+from eth_utils import keccak
+
+# Message header version field: 0 for CCTP v1, 1 for CCTP v2
+MESSAGE_VERSION_V1 = 0
+MESSAGE_VERSION_V2 = 1
+
+V1_HEADER_LENGTH = 116
+V2_HEADER_LENGTH = 148
+V1_BURN_BODY_LENGTH = 132
+V2_BURN_BODY_LENGTH = 228
+
+_ZERO_BYTES32 = bytes(32)
+
+
+class BurnMessage(NamedTuple):
+    """TokenMessenger burn message carried in a CCTP message body"""
+
+    version: int
+    burn_token: memoryview
+    mint_recipient: memoryview
+    amount: int
+    message_sender: memoryview
+    # v2 only
+    max_fee: Optional[int] = None
+    fee_executed: Optional[int] = None
+    expiration_block: Optional[int] = None
+    hook_data: Optional[memoryview] = None
+
+    @property
+    def recipient_address(self) -> str:
+        return bytes32_to_address(self.mint_recipient)
+
+
+class CCTPMessage(NamedTuple):
+    """Decoded CCTP message header with an optional burn body"""
+
+    version: int
+    source_domain: int
+    destination_domain: int
+    # uint64 for v1; bytes32 (as int) for v2, assigned by Circle at attestation
+    nonce: int
+    sender: memoryview
+    recipient: memoryview
+    destination_caller: memoryview
+    body: memoryview
+    # v2 only
+    min_finality_threshold: Optional[int] = None
+    finality_threshold_executed: Optional[int] = None
+    burn: Optional[BurnMessage] = None
+
+    @property
+    def is_v2(self) -> bool:
+        return self.version == MESSAGE_VERSION_V2
+
+    @property
+    def has_destination_caller(self) -> bool:
+        """Whether only a specific address may call receiveMessage"""
+        return self.destination_caller != _ZERO_BYTES32
+
+
+def _uint(view: memoryview) -> int:
+    return int.from_bytes(view, "big")
+
+
+def bytes32_to_address(value: Union[bytes, memoryview]) -> str:
+    """Lower-case hex address from a left-padded bytes32"""
+    return "0x" + bytes(value[12:32]).hex()
+
+
+def to_bytes(value: Union[str, bytes, None]) -> Optional[bytes]:
+    """Raw bytes from a hex string (with or without 0x) as returned by Iris"""
+    if value is None or isinstance(value, bytes):
+        return value
+    return bytes.fromhex(value[2:] if value.startswith("0x") else value)
+
+
+def used_nonce_key(message: CCTPMessage) -> bytes:
+    """Key of a message in the destination MessageTransmitter's usedNonces mapping
+
+    v1 keys by keccak256(abi.encodePacked(uint32 sourceDomain, uint64 nonce));
+    v2 keys by the bytes32 nonce itself.
+    """
+    if message.is_v2:
+        return message.nonce.to_bytes(32, "big")
+    return keccak(
+        message.source_domain.to_bytes(4, "big") + message.nonce.to_bytes(8, "big")
+    )
+
+
+def parse_burn_message(body: memoryview, message_version: int) -> BurnMessage:
+    """Parse a TokenMessenger burn message body"""
+    v2 = message_version == MESSAGE_VERSION_V2
+    if len(body) < (V2_BURN_BODY_LENGTH if v2 else V1_BURN_BODY_LENGTH):
+        raise ValueError(f"Burn message body too short: {len(body)} bytes")
+    if not v2:
+        return BurnMessage(
+            version=_uint(body[0:4]),
+            burn_token=body[4:36],
+            mint_recipient=body[36:68],
+            amount=_uint(body[68:100]),
+            message_sender=body[100:132],
+        )
+    return BurnMessage(
+        version=_uint(body[0:4]),
+        burn_token=body[4:36],
+        mint_recipient=body[36:68],
+        amount=_uint(body[68:100]),
+        message_sender=body[100:132],
+        max_fee=_uint(body[132:164]),
+        fee_executed=_uint(body[164:196]),
+        expiration_block=_uint(body[196:228]),
+        hook_data=body[228:],
+    )
+
+
+def parse_message(message: Union[bytes, memoryview], burn: bool = True) -> CCTPMessage:
+    """Parse a CCTP v1 or v2 message
+
+    Args:
+        message: Raw message bytes (kept alive by the returned views)
+        burn: Also decode the body as a burn message when it is long enough
+
+    Raises:
+        ValueError: If the message is truncated or has an unknown version
+    """
+    view = memoryview(message)
+    if len(view) < 4:
+        raise ValueError("CCTP message too short")
+    version = _uint(view[0:4])
+
+    if version == MESSAGE_VERSION_V1:
+        if len(view) < V1_HEADER_LENGTH:
+            raise ValueError(f"CCTP v1 message too short: {len(view)} bytes")
+        body = view[116:]
+        return CCTPMessage(
+            version=version,
+            source_domain=_uint(view[4:8]),
+            destination_domain=_uint(view[8:12]),
+            nonce=_uint(view[12:20]),
+            sender=view[20:52],
+            recipient=view[52:84],
+            destination_caller=view[84:116],
+            body=body,
+            burn=parse_burn_message(body, version)
+            if burn and len(body) >= V1_BURN_BODY_LENGTH
+            else None,
+        )
+
+    if version == MESSAGE_VERSION_V2:
+        if len(view) < V2_HEADER_LENGTH:
+            raise ValueError(f"CCTP v2 message too short: {len(view)} bytes")
+        body = view[148:]
+        return CCTPMessage(
+            version=version,
+            source_domain=_uint(view[4:8]),
+            destination_domain=_uint(view[8:12]),
+            nonce=_uint(view[12:44]),
+            sender=view[44:76],
+            recipient=view[76:108],
+            destination_caller=view[108:140],
+            body=body,
+            min_finality_threshold=_uint(view[140:144]),
+            finality_threshold_executed=_uint(view[144:148]),
+            burn=parse_burn_message(body, version)
+            if burn and len(body) >= V2_BURN_BODY_LENGTH
+            else None,
+        )
+
+    raise ValueError(f"Unsupported CCTP message version: {version}")
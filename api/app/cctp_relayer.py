@@ -5,15 +5,37 @@ Monitors CCTP transfers and automatically completes them on destination chains
 
 import asyncio
 import logging
-from typing import Dict, Optional, List
+import time
+from typing import Dict, Optional, List, Sequence, Set, Tuple, Union
 from datetime import datetime, timedelta
-import aiohttp
-from web3 import Web3
+from web3 import AsyncWeb3, Web3
 from eth_account import Account
 import json
 from dataclasses import dataclass
 from enum import Enum
 
+from app import metrics
+from app.burn_scanner import BurnScanner
+from app.chain_clients import ChainClients
+from app.cctp_message import (
+    MESSAGE_VERSION_V2,
+    CCTPMessage,
+    parse_message,
+    to_bytes,
+    used_nonce_key,
+)
+from app.fee_oracle import FeeOracle
+from app.iris_client import IrisClient
+from app.nonce_manager import is_nonce_too_low
+from app.poll_scheduler import PollScheduler
+from app.receipt_tracker import ReceiptTracker
+from app.relayer_shards import LeaseLostError, SharedTransferState
+from app.signer_pool import Signer, SignerPool
+from app.status_stream import StatusStream
+from app.tx_manager import SentTransaction, TransactionManager
+from app.transfer_registry import SortKey, TransferRegistry, utc_datetime, utc_timestamp
+from app.transfer_store import TransferStore
+
 logger = logging.getLogger(__name__)
 
 class TransferStatus(Enum):
@@ -23,7 +45,7 @@ class TransferStatus(Enum):
     COMPLETED = "completed"
     FAILED = "failed"
 
-@dataclass
+@dataclass(slots=True)
 class CCTPTransfer:
     tx_hash: str
     source_domain: int
@@ -31,16 +53,34 @@ class CCTPTransfer:
     amount: int
     recipient: str
     status: TransferStatus
-    message: Optional[str] = None
-    attestation: Optional[str] = None
+    # Raw bytes, converted once from the Iris hex strings
+    message: Optional[bytes] = None
+    attestation: Optional[bytes] = None
     event_nonce: Optional[int] = None
+    completion_tx_hash: Optional[str] = None
     created_at: datetime = None
     completed_at: Optional[datetime] = None
+    next_poll_at: Optional[float] = None
+    # Position among the messages emitted by the source transaction
+    message_index: int = 0
+    # Wall-clock lifecycle marks for latency metrics (not persisted)
+    attested_at: Optional[float] = None
+    submitted_at: Optional[float] = None
     
     def __post_init__(self):
         if self.created_at is None:
             self.created_at = datetime.utcnow()
 
+    @property
+    def key(self) -> str:
+        return transfer_key(self.tx_hash, self.message_index)
+
+
+def transfer_key(tx_hash: str, message_index: int = 0) -> str:
+    """Registry key: the source tx hash, plus the message index past the first"""
+    return tx_hash if message_index == 0 else f"{tx_hash}:{message_index}"
+
+
 class CCTPRelayer:
     """Automated CCTP V2 attestation relayer"""
     
@@ -77,58 +117,549 @@ class CCTPRelayer:
     # MessageTransmitter addresses (same on all chains)
     MESSAGE_TRANSMITTER = "0xC30362313FBBA5cf9163F0bb16a0e01f01A896ca"
     MESSAGE_TRANSMITTER_V2 = "0x81D40F21F12A8F0E3252Bccb954D722d4c464B64"
-    
+
+    # receiveMessage ABI (matches Circle's official implementation)
+    MESSAGE_TRANSMITTER_ABI = [
+        {
+            "type": "function",
+            "name": "receiveMessage",
+            "stateMutability": "nonpayable",
+            "inputs": [
+                {"name": "message", "type": "bytes"},
+                {"name": "attestation", "type": "bytes"},
+            ],
+            "outputs": [],
+        }
+    ]
+
+    # MessageTransmitter.usedNonces(bytes32) selector; non-zero means received
+    USED_NONCES_SELECTOR = Web3.keccak(text="usedNonces(bytes32)")[:4]
+
+    # Multicall3 (same address on all chains), used to read usedNonces for a
+    # whole set of transfers in one eth_call
+    MULTICALL3 = "0xcA11bde05977b3631167028862bE2a173976CA11"
+    MULTICALL3_ABI = [
+        {
+            "type": "function",
+            "name": "aggregate3",
+            "stateMutability": "payable",
+            "inputs": [
+                {
+                    "name": "calls",
+                    "type": "tuple[]",
+                    "components": [
+                        {"name": "target", "type": "address"},
+                        {"name": "allowFailure", "type": "bool"},
+                        {"name": "callData", "type": "bytes"},
+                    ],
+                }
+            ],
+            "outputs": [
+                {
+                    "name": "returnData",
+                    "type": "tuple[]",
+                    "components": [
+                        {"name": "success", "type": "bool"},
+                        {"name": "returnData", "type": "bytes"},
+                    ],
+                }
+            ],
+        }
+    ]
+
+    # CCTPBatchRelayer ABI (contracts/contracts/CCTPBatchRelayer.sol)
+    BATCH_RELAYER_ABI = [
+        {
+            "type": "function",
+            "name": "receiveMessages",
+            "stateMutability": "nonpayable",
+            "inputs": [
+                {"name": "messages", "type": "bytes[]"},
+                {"name": "attestations", "type": "bytes[]"},
+            ],
+            "outputs": [],
+        },
+        {
+            "type": "function",
+            "name": "messageTransmitter",
+            "stateMutability": "view",
+            "inputs": [],
+            "outputs": [{"name": "", "type": "address"}],
+        },
+    ]
+
     # Circle API endpoints
     CIRCLE_API_BASE = "https://iris-api.circle.com"
-    
-    def __init__(self, private_key: str, network: str = "mainnet"):
+
+    # Attempts per completion when the chain reports "nonce too low"
+    MAX_SEND_ATTEMPTS = 3
+
+    # Nonce gap detection: how often to check, and how long a released or
+    # broadcast nonce may sit before it is treated as a gap and filled
+    NONCE_GAP_CHECK_INTERVAL = 15
+    NONCE_GAP_STALE_AFTER = 60
+
+    # Seconds between health and metrics reports to Redis (shared state
+    # only), where API processes read them
+    REPORT_INTERVAL = 10
+
+    def __init__(
+        self,
+        private_key: str,
+        network: str = "mainnet",
+        max_concurrent_polls: int = 64,
+        max_inflight_requests: int = 16,
+        poll_scheduler: Optional[PollScheduler] = None,
+        max_inflight_mints: int = 256,
+        batch_relayers: Optional[Dict[str, Union[str, Sequence[str]]]] = None,
+        batch_window: float = 1.0,
+        batch_max_size: int = 20,
+        store: Optional[TransferStore] = None,
+        terminal_ttl: float = 3600,
+        max_terminal_transfers: int = 10_000,
+        iris_client: Optional[IrisClient] = None,
+        burn_scanner: Optional[BurnScanner] = None,
+        rpc_urls: Optional[Dict[str, List[str]]] = None,
+        chain_clients: Optional[ChainClients] = None,
+        shared_state: Optional[SharedTransferState] = None,
+        signer_keys: Optional[List[str]] = None,
+        min_signer_balance: int = 10**15,
+        confirmations: Optional[Dict[str, int]] = None,
+        status_stream: Optional[StatusStream] = None,
+    ):
         """
         Initialize the CCTP relayer
-        
+
         Args:
             private_key: Private key for signing transactions
             network: Network to operate on (mainnet/testnet)
+            max_concurrent_polls: Maximum transfers polled concurrently by the
+                monitor loop
+            max_inflight_requests: Connection pool size for the default Iris client
+            poll_scheduler: Deadline scheduler for attestation polls (defaults to
+                PollScheduler())
+            max_inflight_mints: Maximum completions (submitted or confirming) in
+                flight at once
+            batch_relayers: CCTPBatchRelayer address, or list of addresses, per
+                chain name; enables batched receiveMessage submission on those
+                chains. Each contract only relays messages of the version its
+                MessageTransmitter handles (one contract per version)
+            batch_window: Seconds to collect attested messages before relaying a batch
+            batch_max_size: Relay a batch as soon as it reaches this many messages
+            store: Durable transfer store; active transfers are restored from it on
+                start
+            terminal_ttl: Seconds a completed/failed transfer stays in memory before
+                archiving
+            max_terminal_transfers: Cap on completed/failed transfers kept in memory
+            iris_client: Circle Iris API client (defaults to
+                IrisClient(CIRCLE_API_BASE))
+            burn_scanner: Source-chain log scanner; burns it finds are monitored
+                without a client calling add_transfer
+            rpc_urls: RPC endpoints per chain name (defaults to RPC_URLS); chains
+                with several endpoints are served by a latency-ranked pool
+            chain_clients: Existing chain clients to share (e.g. with the API
+                routes); overrides rpc_urls
+            shared_state: Redis-backed transfer state and shard leases; when set,
+                this worker only relays transfers for the destination domains
+                it holds a lease on, and hands the rest to their owners
+            signer_keys: Additional hot wallet keys; completions on each chain
+                are spread over every key, least-loaded first
+            min_signer_balance: Native balance in wei below which a signer is
+                taken out of rotation on a chain
+            confirmations: Blocks (counting the one it is in) a completion
+                needs per chain name before it counts; 1 where not given
+            status_stream: Receives every status change, for clients
+                streaming transfer status instead of polling
         """
         self.private_key = private_key
         self.account = Account.from_key(private_key)
+        self.accounts = [self.account]
+        for key in signer_keys or []:
+            account = Account.from_key(key)
+            if account.address not in {a.address for a in self.accounts}:
+                self.accounts.append(account)
+        self.min_signer_balance = min_signer_balance
         self.network = network
-        self.transfers: Dict[str, CCTPTransfer] = {}
-        self.web3_instances: Dict[str, Web3] = {}
-        self.session: Optional[aiohttp.ClientSession] = None
-        
-        # Initialize Web3 instances for each chain
-        self._init_web3_instances()
+        self.transfers = TransferRegistry(
+            statuses=TransferStatus,
+            terminal_statuses=(TransferStatus.COMPLETED, TransferStatus.FAILED),
+            attested_status=TransferStatus.ATTESTED,
+            terminal_ttl=terminal_ttl,
+            max_terminal=max_terminal_transfers,
+        )
+        self.store = store
+        self.shared = shared_state
+        self.status_stream = status_stream
+        self.burn_scanner = burn_scanner
+        self._domain_names = {domain: chain for chain, domain in self.DOMAINS.items()}
+        # Chain clients are created on first use and probed in the background,
+        # so startup does not wait on any RPC endpoint
+        self.web3_instances = chain_clients or ChainClients(rpc_urls or self.RPC_URLS)
+        self.iris = iris_client
+        self.max_inflight_requests = max_inflight_requests
+        self._tasks: List[asyncio.Task] = []
+
+        # Attestation polling: due transfers are polled concurrently, while the
+        # Iris client's rate limiter and connection pool pace the actual requests
+        self.max_concurrent_polls = max_concurrent_polls
+        self.poll_scheduler = poll_scheduler or PollScheduler()
+        self._poll_tasks: Set[asyncio.Task] = set()
+        # In-flight Iris lookups by (source_domain, tx_hash), shared by every
+        # caller asking about the same transaction at the same time
+        self._lookups: Dict[Tuple[int, str], asyncio.Future] = {}
+
+        # Completion pipeline: mints are submitted and confirmed as independent
+        # tasks, with nonces handed out locally per chain and signer so
+        # submissions to the same chain are pipelined rather than serialized
+        # on RPC round-trips
+        self.max_inflight_mints = max_inflight_mints
+        self._mint_tasks: Set[asyncio.Task] = set()
+        self.signer_pools: Dict[str, SignerPool] = {}
+        # Fee data and chain IDs per destination chain, refreshed in the background
+        self.fee_oracles: Dict[str, FeeOracle] = {}
+        # Confirmation of sent transactions, with fee-bumped replacement when
+        # stuck; receipts for all of a chain's transactions come from one poller
+        self.confirmations = confirmations or {}
+        self.receipt_trackers: Dict[str, ReceiptTracker] = {}
+        self.tx_managers: Dict[str, TransactionManager] = {}
+
+        # Batching: attested transfers for chains with a batch relayer are
+        # collected per destination and relayed in one transaction
+        self.batch_relayers: Dict[str, List[str]] = {
+            chain: [addresses] if isinstance(addresses, str) else list(addresses)
+            for chain, addresses in (batch_relayers or {}).items()
+        }
+        self.batch_window = batch_window
+        self.batch_max_size = batch_max_size
+        # Per chain: batch relayer by the MessageTransmitter it calls
+        self._batch_transmitters: Dict[str, Dict[str, str]] = {}
+        # Queues and flush timers per (chain, batch relayer)
+        self._batch_queues: Dict[Tuple[str, str], List[CCTPTransfer]] = {}
+        self._batch_timers: Dict[Tuple[str, str], asyncio.Task] = {}
         
         logger.info(f"CCTP Relayer initialized for {network}")
         logger.info(f"Relayer address: {self.account.address}")
-    
-    def _init_web3_instances(self):
-        """Initialize Web3 instances for all supported chains"""
-        for chain_name, rpc_url in self.RPC_URLS.items():
-            self.web3_instances[chain_name] = Web3(Web3.HTTPProvider(rpc_url))
-            logger.info(f"Connected to {chain_name}: {self.web3_instances[chain_name].is_connected()}")
+        if len(self.accounts) > 1:
+            logger.info(f"Signing with {len(self.accounts)} hot wallets")
     
     async def start(self):
         """Start the relayer service"""
-        self.session = aiohttp.ClientSession()
+        if self.iris is None:
+            self.iris = IrisClient(
+                self.CIRCLE_API_BASE, max_connections=self.max_inflight_requests
+            )
+        await self.iris.start()
+        self._register_metrics()
+        self.web3_instances.start()
+        if self.store:
+            await self.store.start()
+            await self._load_history()
+            if not self.shared:
+                await self._restore_transfers()
+        if self.status_stream:
+            await self.status_stream.start()
+        if self.shared:
+            # Shard owners restore their transfers from Redis as leases are acquired
+            self.shared.start()
+            await self.shared.leases.start(self._on_shard_acquired, self._on_shard_lost)
+            self._tasks.append(asyncio.create_task(self._inbox_loop()))
+            self._tasks.append(asyncio.create_task(self._report_loop()))
+        if self.burn_scanner:
+            await self.burn_scanner.start(
+                self.track_burn,
+                {
+                    chain_id: self.web3_instances[chain]
+                    for chain_id, chain in self.CHAIN_IDS.items()
+                    if chain_id in self.burn_scanner.targets
+                    and chain in self.web3_instances
+                },
+            )
         logger.info("CCTP Relayer service started")
         
         # Start monitoring loop
-        asyncio.create_task(self._monitor_loop())
+        self._tasks.append(asyncio.create_task(self._monitor_loop()))
         
         # Start completion loop
-        asyncio.create_task(self._completion_loop())
+        self._tasks.append(asyncio.create_task(self._completion_loop()))
+
+        # Start nonce gap detection
+        self._tasks.append(asyncio.create_task(self._nonce_gap_loop()))
     
     async def stop(self):
         """Stop the relayer service"""
-        if self.session:
-            await self.session.close()
+        for task in [
+            *self._tasks,
+            *self._poll_tasks,
+            *self._mint_tasks,
+            *self._batch_timers.values(),
+        ]:
+            task.cancel()
+        self._tasks.clear()
+        if self.shared:
+            await self.shared.leases.stop()
+            await self.shared.stop()
+        if self.burn_scanner:
+            await self.burn_scanner.stop()
+        if self.status_stream:
+            await self.status_stream.stop()
+        await asyncio.gather(*(oracle.stop() for oracle in self.fee_oracles.values()))
+        await asyncio.gather(*(pool.stop() for pool in self.signer_pools.values()))
+        await asyncio.gather(
+            *(tracker.stop() for tracker in self.receipt_trackers.values())
+        )
+        await self.web3_instances.stop()
+        if self.iris:
+            await self.iris.close()
+        if self.store:
+            await self.store.stop()
         logger.info("CCTP Relayer service stopped")
-    
-    async def add_transfer(self, tx_hash: str, source_chain: str, dest_chain: str) -> CCTPTransfer:
+
+    async def _load_history(self):
+        """Count transfers finished in previous runs towards the stats totals"""
+        totals = await self.store.totals()
+        for status in (TransferStatus.COMPLETED, TransferStatus.FAILED):
+            count, amount = totals.get(status.value, (0, 0))
+            self.transfers.add_history(status, count, amount)
+        if self.shared:
+            # Cluster-wide counters read by the API start from the same history
+            completed, volume = totals.get(TransferStatus.COMPLETED.value, (0, 0))
+            await self.shared.seed_stats(
+                {
+                    TransferStatus.COMPLETED.value: completed,
+                    TransferStatus.FAILED.value: totals.get(
+                        TransferStatus.FAILED.value, (0, 0)
+                    )[0],
+                    "volume": volume,
+                }
+            )
+
+    async def _restore_transfers(self):
+        """Resume active transfers persisted by a previous run"""
+        restored = 0
+
+        for row in await self.store.due_pending(until=float("inf"), limit=None):
+            transfer = self._transfer_from_row(row)
+            self.transfers.add(transfer)
+            self.poll_scheduler.schedule_at(
+                transfer.tx_hash, transfer.next_poll_at or 0
+            )
+            restored += 1
+
+        for domain in self.DOMAINS.values():
+            for row in await self.store.attested_for_domain(domain):
+                transfer = self._transfer_from_row(row)
+                self.transfers.add(transfer)
+                self._set_status(transfer, TransferStatus.ATTESTED)
+                restored += 1
+
+        # A completion may or may not have been broadcast before the restart;
+        # retry it - receiveMessage is idempotent on chain (a replay reverts)
+        for row in await self.store.by_status(TransferStatus.COMPLETING.value):
+            transfer = self._transfer_from_row(row)
+            self.transfers.add(transfer)
+            self._set_status(transfer, TransferStatus.ATTESTED)
+            restored += 1
+
+        if restored:
+            logger.info(f"Restored {restored} active transfers from store")
+
+    @staticmethod
+    def _transfer_from_row(row: Dict) -> CCTPTransfer:
+        return CCTPTransfer(
+            tx_hash=row["tx_hash"],
+            source_domain=row["source_domain"],
+            dest_domain=row["dest_domain"],
+            amount=row["amount"],
+            recipient=row["recipient"],
+            status=TransferStatus(row["status"]),
+            message=to_bytes(row["message"]),
+            attestation=to_bytes(row["attestation"]),
+            event_nonce=row["event_nonce"],
+            completion_tx_hash=row["completion_tx_hash"],
+            created_at=row["created_at"],
+            completed_at=row["completed_at"],
+            next_poll_at=row["next_poll_at"],
+            message_index=row["message_index"],
+        )
+
+    def _set_status(self, transfer: CCTPTransfer, status: TransferStatus):
+        """Record a status transition, keeping indexes and the store in sync"""
+        previous = transfer.status
+        self.transfers.set_status(transfer, status)
+        self._persist(transfer)
+        self._publish(transfer)
+
+        if status == TransferStatus.ATTESTED and previous == TransferStatus.PENDING:
+            transfer.attested_at = time.time()
+            metrics.ATTESTATION_SECONDS.observe(
+                self._age(transfer), self._route(transfer)
+            )
+        elif (
+            status == TransferStatus.COMPLETED and previous != TransferStatus.COMPLETED
+        ):
+            route = self._route(transfer)
+            metrics.TRANSFER_SECONDS.observe(self._age(transfer), route)
+            if transfer.submitted_at is not None:
+                metrics.CONFIRM_SECONDS.observe(
+                    time.time() - transfer.submitted_at, route
+                )
+
+    def _record_submitted(self, transfer: CCTPTransfer, tx_hash: bytes):
+        """Record that the completion transaction for a transfer was sent"""
+        transfer.completion_tx_hash = tx_hash.hex()
+        transfer.submitted_at = time.time()
+        if transfer.attested_at is not None:
+            metrics.SUBMIT_SECONDS.observe(
+                transfer.submitted_at - transfer.attested_at, self._route(transfer)
+            )
+        self._persist(transfer)
+        self._publish(transfer)
+
+    def _publish(self, transfer: CCTPTransfer):
+        """Push the transfer's current status to streaming clients"""
+        if self.status_stream:
+            self.status_stream.emit(self._transfer_status(transfer))
+
+    @staticmethod
+    def _age(transfer: CCTPTransfer) -> float:
+        return (datetime.utcnow() - transfer.created_at).total_seconds()
+
+    def _route(self, transfer: CCTPTransfer) -> str:
+        """Metrics label for a transfer's source and destination chains"""
+        names = self._domain_names
+        source = names.get(transfer.source_domain, transfer.source_domain)
+        dest = names.get(transfer.dest_domain, transfer.dest_domain)
+        return f"{source}->{dest}"
+
+    def _queue_depths(self) -> Dict[Tuple[str, ...], float]:
+        return {
+            ("polls",): len(self.poll_scheduler),
+            ("attested",): self.transfers.count(TransferStatus.ATTESTED),
+            ("batched",): sum(len(queue) for queue in self._batch_queues.values()),
+            ("mint_tasks",): len(self._mint_tasks),
+            ("receipts",): sum(
+                tracker.pending for tracker in self.receipt_trackers.values()
+            ),
+        }
+
+    def _register_metrics(self):
+        """Point the scrape-time gauges at this relayer's state"""
+        metrics.TRANSFERS.set_function(
+            lambda: {
+                (status.value,): self.transfers.count(status)
+                for status in TransferStatus
+            }
+        )
+        metrics.INFLIGHT_TRANSACTIONS.set_function(
+            lambda: {
+                (chain,): pool.in_flight for chain, pool in self.signer_pools.items()
+            }
+        )
+        metrics.QUEUE_DEPTH.set_function(self._queue_depths)
+
+    def _persist(self, transfer: CCTPTransfer):
+        if self.store:
+            self.store.mark_dirty(transfer)
+        if self.shared and self._owns(transfer.dest_domain):
+            self.shared.mark_dirty(transfer, str(transfer.dest_domain))
+
+    def _owns(self, dest_domain: int) -> bool:
+        """Whether this worker relays transfers to ``dest_domain`` (always unsharded)"""
+        return not self.shared or self.shared.leases.owns(str(dest_domain))
+
+    async def _hand_off(self, transfer: CCTPTransfer):
+        """Give a transfer to the worker owning its destination shard"""
+        await self.shared.submit(transfer, str(transfer.dest_domain))
+        logger.debug(f"Handed off {transfer.key} to shard {transfer.dest_domain}")
+
+    async def _on_shard_acquired(self, shard: str):
+        """Take over a shard's unfinished transfers from Redis"""
+        adopted = self._adopt(await self.shared.load_shard(shard))
+        if adopted:
+            logger.info(f"Resumed {adopted} transfers for shard {shard}")
+
+    async def _on_shard_lost(self, shard: str):
+        """Write back a shard's state and stop working on it"""
+        try:
+            await self.shared.flush(shard)
+        except Exception as e:
+            logger.error(f"Error flushing shard {shard}: {e}")
+        dest_domain = int(shard)
+        dropped = [t for t in self.transfers.values() if t.dest_domain == dest_domain]
+        for transfer in dropped:
+            self.transfers.remove(transfer.key)
+            self.poll_scheduler.discard(transfer.tx_hash)
+        try:
+            dest_chain = self._get_dest_chain(dest_domain)
+        except ValueError:
+            dest_chain = None
+        for batch in [batch for batch in self._batch_queues if batch[0] == dest_chain]:
+            self._batch_queues.pop(batch)
+        logger.info(f"Dropped {len(dropped)} transfers for shard {shard}")
+
+    def _leave_to_owner(self, transfers: List[CCTPTransfer], reason: Exception):
+        """Stop working on transfers of a shard this worker lost mid-completion
+
+        Nothing is recorded or published: the shard's new owner resumes them
+        from Redis, so a status set here would only contradict its outcome.
+        """
+        for transfer in transfers:
+            self.transfers.remove(transfer.key)
+            self.poll_scheduler.discard(transfer.tx_hash)
+        logger.warning(
+            f"{reason}; leaving {len(transfers)} transfers to the shard's new owner"
+        )
+
+    def _adopt(self, rows: List[Dict]) -> int:
+        """Track shared transfers this worker does not have yet"""
+        adopted = 0
+        for row in rows:
+            transfer = self._transfer_from_row(row)
+            if transfer.key in self.transfers or not self._owns(transfer.dest_domain):
+                continue
+            self.transfers.add(transfer)
+            if transfer.status == TransferStatus.PENDING:
+                self.poll_scheduler.schedule_at(
+                    transfer.tx_hash, transfer.next_poll_at or 0
+                )
+            elif transfer.status == TransferStatus.COMPLETING:
+                # The previous owner may have broadcast it; the pre-flight
+                # usedNonces check skips it if it landed
+                self._set_status(transfer, TransferStatus.ATTESTED)
+            adopted += 1
+        return adopted
+
+    async def _inbox_loop(self):
+        """Pick up transfers other workers submitted to this worker's shards"""
+        while True:
+            try:
+                for shard in list(self.shared.leases.owned):
+                    self._adopt(await self.shared.take_inbox(shard))
+            except Exception as e:
+                logger.error(f"Error reading shard inbox: {e}")
+            await asyncio.sleep(1)
+
+    async def _report_loop(self):
+        """Publish this worker's health and metrics for the API to serve"""
+        while True:
+            try:
+                await self.shared.publish_report(
+                    {"health": self.health(), "metrics": metrics.render()},
+                    ttl=self.REPORT_INTERVAL * 3,
+                )
+            except Exception as e:
+                logger.warning(f"Error publishing worker report: {e}")
+            await asyncio.sleep(self.REPORT_INTERVAL)
+
+    async def add_transfer(
+        self, tx_hash: str, source_chain: str, dest_chain: str
+    ) -> Optional[CCTPTransfer]:
         """
         Add a transfer to monitor
-        
+
+        Re-adding a known transaction is a no-op. Every CCTP message the
+        transaction emitted is tracked as its own transfer (see transfer_key).
+
         Args:
             tx_hash: Transaction hash on source chain
             source_chain: Source chain name
@@ -139,7 +670,74 @@ class CCTPRelayer:
         
         if source_domain is None or dest_domain is None:
             raise ValueError(f"Invalid chain names: {source_chain} -> {dest_chain}")
-        
+
+        if not self._owns(dest_domain):
+            return await self._submit_transfer(tx_hash, source_domain, dest_domain)
+
+        transfer = self._register_transfer(tx_hash, source_domain, dest_domain)
+        if transfer is None:
+            logger.debug(f"Transfer already monitored: {tx_hash}")
+            return self.transfers.get(tx_hash)
+
+        # Immediately check status, then hand off to the poll scheduler
+        await self._check_transfer_status(transfer)
+        self._schedule_poll(tx_hash, backoff=False)
+
+        return transfer
+
+    async def track_burn(self, tx_hash: str, source_domain: int, dest_domain: int):
+        """Monitor a burn found on chain by the burn scanner
+
+        The burn was just mined, so there is no immediate lookup: the first
+        poll is scheduled after the usual initial delay.
+        """
+        if dest_domain not in self.DOMAINS.values():
+            logger.debug(f"Ignoring burn {tx_hash} to unsupported domain {dest_domain}")
+            return
+        if not self._owns(dest_domain):
+            await self._submit_transfer(tx_hash, source_domain, dest_domain)
+            return
+        if (
+            self.store
+            and tx_hash not in self.transfers
+            and await self.store.get(tx_hash)
+        ):
+            # Finished before a restart (the scan checkpoint lags the store)
+            return
+        if (
+            self.shared
+            and tx_hash not in self.transfers
+            and await self.shared.get(transfer_key(tx_hash))
+        ):
+            return
+        if self._register_transfer(tx_hash, source_domain, dest_domain):
+            self._schedule_poll(tx_hash, backoff=False)
+
+    async def _submit_transfer(
+        self, tx_hash: str, source_domain: int, dest_domain: int
+    ) -> CCTPTransfer:
+        """Queue a transfer for the worker owning its destination shard"""
+        existing = await self.shared.get(transfer_key(tx_hash))
+        if existing:
+            return self._transfer_from_row(existing)
+        transfer = CCTPTransfer(
+            tx_hash=tx_hash,
+            source_domain=source_domain,
+            dest_domain=dest_domain,
+            amount=0,
+            recipient="",
+            status=TransferStatus.PENDING,
+        )
+        await self._hand_off(transfer)
+        return transfer
+
+    def _register_transfer(
+        self, tx_hash: str, source_domain: int, dest_domain: int
+    ) -> Optional[CCTPTransfer]:
+        """Start tracking a source transaction; returns None if it is already known"""
+        if tx_hash in self.transfers or self.transfers.get_archived(tx_hash):
+            return None
+
         transfer = CCTPTransfer(
             tx_hash=tx_hash,
             source_domain=source_domain,
@@ -148,135 +746,228 @@ class CCTPRelayer:
             recipient="",  # Will be updated from API
             status=TransferStatus.PENDING
         )
-        
-        self.transfers[tx_hash] = transfer
+
+        self.transfers.add(transfer)
+        self._persist(transfer)
         logger.info(f"Added transfer to monitor: {tx_hash}")
-        
-        # Immediately check status
-        await self._check_transfer_status(transfer)
-        
         return transfer
     
     async def _monitor_loop(self):
-        """Main monitoring loop"""
+        """Main monitoring loop: polls transfers as their deadlines come due"""
         while True:
             try:
-                # Check all pending transfers
-                pending_transfers = [
-                    t for t in self.transfers.values() 
-                    if t.status in [TransferStatus.PENDING, TransferStatus.ATTESTED]
-                ]
-                
-                for transfer in pending_transfers:
-                    await self._check_transfer_status(transfer)
-                
-                # Wait before next check
-                await asyncio.sleep(5)  # Check every 5 seconds for v2 fast transfers
+                free_slots = self.max_concurrent_polls - len(self._poll_tasks)
+                if free_slots > 0:
+                    # Polls are scheduled per source transaction, not per message
+                    for tx_hash in self.poll_scheduler.pop_due(free_slots):
+                        task = asyncio.create_task(self._poll_transfer(tx_hash))
+                        self._poll_tasks.add(task)
+                        task.add_done_callback(self._on_poll_done)
+
+                # Sleep until the next deadline, new work or a freed slot
+                await self.poll_scheduler.wait(
+                    max_wait=5,
+                    slots_free=len(self._poll_tasks) < self.max_concurrent_polls,
+                )
                 
             except Exception as e:
                 logger.error(f"Error in monitor loop: {e}")
                 await asyncio.sleep(10)
-    
+
+    async def _poll_transfer(self, tx_hash: str):
+        """Poll a due source transaction; back off while any is pending"""
+        pending = self._pending_for_tx(tx_hash)
+        if not pending:
+            self.poll_scheduler.discard(tx_hash)
+            return
+
+        try:
+            await self._check_transfer_status(pending[0])
+        finally:
+            self._schedule_poll(tx_hash)
+
+    def _schedule_poll(self, tx_hash: str, backoff: bool = True):
+        """Schedule a source transaction's next poll, or stop once nothing is pending"""
+        pending = self._pending_for_tx(tx_hash)
+        if not pending:
+            self.poll_scheduler.discard(tx_hash)
+            return
+
+        if backoff:
+            next_poll_at = self.poll_scheduler.reschedule(tx_hash)
+        else:
+            next_poll_at = self.poll_scheduler.schedule(tx_hash)
+        for transfer in pending:
+            transfer.next_poll_at = next_poll_at
+            self._persist(transfer)
+
+    def _transfers_for_tx(self, tx_hash: str) -> List[CCTPTransfer]:
+        """Live transfers for every message emitted by a source transaction"""
+        transfers = []
+        index = 0
+        while True:
+            key = transfer_key(tx_hash, index)
+            transfer = self.transfers.get(key)
+            if transfer is not None:
+                transfers.append(transfer)
+            elif not self.transfers.get_archived(key):
+                break
+            index += 1
+        return transfers
+
+    def _pending_for_tx(self, tx_hash: str) -> List[CCTPTransfer]:
+        return [
+            t
+            for t in self._transfers_for_tx(tx_hash)
+            if t.status == TransferStatus.PENDING
+        ]
+
+    def _on_poll_done(self, task: asyncio.Task):
+        self._poll_tasks.discard(task)
+        self.poll_scheduler.wake()
+
     async def _completion_loop(self):
         """Loop to complete attested transfers"""
         while True:
             try:
-                # Find transfers ready to complete
-                ready_transfers = [
-                    t for t in self.transfers.values()
-                    if t.status == TransferStatus.ATTESTED
-                ]
-                
-                for transfer in ready_transfers:
-                    await self._complete_transfer(transfer)
+                # Archive finished transfers so memory tracks active volume
+                self.transfers.evict()
+
+                # Transfers ready to complete, from the per-domain ATTESTED index
+                ready_transfers = self.transfers.attested()
+
+                # Group by destination: each chain gets one usedNonces
+                # pre-flight, then every completion runs as its own task; the
+                # loop never waits on a receipt, so one slow chain cannot hold
+                # up the others
+                by_chain: Dict[str, List[CCTPTransfer]] = {}
+                capacity = self.max_inflight_mints - len(self._mint_tasks)
+                for transfer in ready_transfers[: max(capacity, 0)]:
+                    self._set_status(transfer, TransferStatus.COMPLETING)
+                    try:
+                        dest_chain = self._get_dest_chain(transfer.dest_domain)
+                    except ValueError:
+                        # _complete_transfer reports the unknown domain
+                        self._launch_mint(self._complete_transfer(transfer))
+                        continue
+                    by_chain.setdefault(dest_chain, []).append(transfer)
+
+                for dest_chain, transfers in by_chain.items():
+                    self._launch_mint(self._preflight(dest_chain, transfers))
                 
                 await asyncio.sleep(2)  # Check every 2 seconds
                 
             except Exception as e:
                 logger.error(f"Error in completion loop: {e}")
                 await asyncio.sleep(5)
-    
+
+    async def _lookup_messages(
+        self, source_domain: int, tx_hash: str
+    ) -> Optional[List[Dict]]:
+        """Fetch a transaction's messages, joining an identical lookup in flight"""
+        key = (source_domain, tx_hash)
+        lookup = self._lookups.get(key)
+        if lookup is None:
+            lookup = asyncio.ensure_future(
+                self.iris.get_messages(source_domain, tx_hash)
+            )
+            self._lookups[key] = lookup
+            lookup.add_done_callback(lambda _: self._lookups.pop(key, None))
+        # Shielded so one caller being cancelled does not cancel the others' lookup
+        return await asyncio.shield(lookup)
+
     async def _check_transfer_status(self, transfer: CCTPTransfer):
-        """Check transfer status from Circle API using v2 endpoint"""
-        if not self.session:
+        """Check a transfer's source transaction on the Circle API (v2 endpoint)
+
+        One response updates every message the transaction emitted; messages
+        beyond those already tracked become new transfers.
+        """
+        if not self.iris:
             return
         
         try:
-            # Use v2 API endpoint with transaction hash query parameter
-            # This matches Circle's official implementation
-            url = f"{self.CIRCLE_API_BASE}/v2/messages/{transfer.source_domain}?transactionHash={transfer.tx_hash}"
-            
-            async with self.session.get(url) as response:
-                if response.status == 404:
-                    logger.debug(f"Transfer {transfer.tx_hash} not found in API yet")
-                    logger.debug("Waiting for attestation...")
-                    return
-                
-                if response.status != 200:
-                    logger.error(f"API error {response.status} for {transfer.tx_hash}")
-                    return
-                
-                data = await response.json()
-                
-                # Check if messages exist
-                if not data.get("messages"):
-                    logger.debug("Waiting for attestation...")
-                    return
-                
-                message_data = data["messages"][0]
-                
-                # Update transfer details
-                transfer.message = message_data.get("message")
-                transfer.event_nonce = message_data.get("eventNonce")
-                
-                # Decode message to get recipient and amount
-                if transfer.message:
-                    self._decode_message(transfer)
-                
-                # Check attestation status (v2 uses 'status' field)
-                status = message_data.get("status")
-                attestation = message_data.get("attestation")
-                
-                if status == "complete" and attestation:
-                    transfer.attestation = attestation
-                    transfer.status = TransferStatus.ATTESTED
-                    logger.info(f"✅ Attestation retrieved successfully!")
-                    logger.info(f"   TX: {transfer.tx_hash}")
-                    logger.info(f"   Nonce: {transfer.event_nonce}")
-                    logger.info(f"   Ready to mint on destination chain")
-                else:
-                    logger.debug(f"⏳ Waiting for attestation: {transfer.tx_hash}")
-                    logger.debug(f"   Status: {status}")
+            messages = await self._lookup_messages(
+                transfer.source_domain, transfer.tx_hash
+            )
+            if not messages:
+                logger.debug(f"Transfer {transfer.tx_hash} not found in API yet")
+                logger.debug("Waiting for attestation...")
+                return
+
+            for index, message_data in enumerate(messages):
+                key = transfer_key(transfer.tx_hash, index)
+                message_transfer = self.transfers.get(key)
+                if message_transfer is None:
+                    if self.transfers.get_archived(key):
+                        continue
+                    message_transfer = CCTPTransfer(
+                        tx_hash=transfer.tx_hash,
+                        source_domain=transfer.source_domain,
+                        dest_domain=transfer.dest_domain,
+                        amount=0,
+                        recipient="",
+                        status=TransferStatus.PENDING,
+                        message_index=index,
+                    )
+                    self.transfers.add(message_transfer)
+                    logger.info(
+                        f"Tracking message {index} of {transfer.tx_hash} as {key}"
+                    )
+
+                if message_transfer.status == TransferStatus.PENDING:
+                    previous_domain = message_transfer.dest_domain
+                    self._apply_message(message_transfer, message_data)
+                    if not self._owns(message_transfer.dest_domain):
+                        # The message names another destination than the request
+                        self.transfers.remove(message_transfer.key)
+                        await self.shared.move(message_transfer, str(previous_domain))
                     
         except Exception as e:
             logger.error(f"Error fetching attestation: {e}")
-    
+
+    def _apply_message(self, transfer: CCTPTransfer, message_data: Dict):
+        """Update a pending transfer from its Iris message entry"""
+        # Update transfer details
+        transfer.message = to_bytes(message_data.get("message"))
+        transfer.event_nonce = message_data.get("eventNonce")
+
+        # Decode message to get recipient and amount
+        if transfer.message:
+            self._decode_message(transfer)
+
+        # Check attestation status (v2 uses 'status' field)
+        status = message_data.get("status")
+        attestation = message_data.get("attestation")
+
+        if status == "complete" and attestation:
+            transfer.attestation = to_bytes(attestation)
+            transfer.next_poll_at = None
+            self._set_status(transfer, TransferStatus.ATTESTED)
+            logger.info("✅ Attestation retrieved successfully!")
+            logger.info(f"   TX: {transfer.key}")
+            logger.info(f"   Nonce: {transfer.event_nonce}")
+            logger.info("   Ready to mint on destination chain")
+        else:
+            self._persist(transfer)
+            logger.debug(f"⏳ Waiting for attestation: {transfer.key}")
+            logger.debug(f"   Status: {status}")
+
     def _decode_message(self, transfer: CCTPTransfer):
-        """Decode CCTP message to extract details"""
+        """Decode CCTP message to extract recipient and amount"""
         try:
             if not transfer.message:
                 return
-            
-            # Remove 0x prefix if present
-            message_hex = transfer.message.replace("0x", "")
-            message_bytes = bytes.fromhex(message_hex)
-            
-            # CCTP message format (simplified):
-            # First 4 bytes: version
-            # Next 4 bytes: source domain
-            # Next 4 bytes: destination domain
-            # Next 32 bytes: nonce
-            # Next 32 bytes: sender
-            # Next 32 bytes: recipient
-            # Next 32 bytes: amount
-            
-            # Extract recipient (bytes 76-108)
-            recipient_bytes = message_bytes[76:108]
-            transfer.recipient = "0x" + recipient_bytes.hex()[-40:]  # Last 20 bytes as address
-            
-            # Extract amount (bytes 108-140)
-            amount_bytes = message_bytes[108:140]
-            transfer.amount = int.from_bytes(amount_bytes, 'big')
+
+            message = parse_message(transfer.message)
+            transfer.dest_domain = message.destination_domain
+
+            burn = message.burn
+            if burn is None:
+                logger.debug(f"Message for {transfer.tx_hash} has no burn body")
+                return
+
+            transfer.recipient = burn.recipient_address
+            transfer.amount = burn.amount
             
             logger.debug(f"Decoded message for {transfer.tx_hash}")
             logger.debug(f"  Recipient: {transfer.recipient}")
@@ -284,153 +975,748 @@ class CCTPRelayer:
             
         except Exception as e:
             logger.error(f"Error decoding message: {e}")
-    
+
+    def _get_dest_chain(self, dest_domain: int) -> str:
+        """Resolve a CCTP domain to a configured chain name"""
+        for chain, domain in self.DOMAINS.items():
+            if domain == dest_domain:
+                return chain
+        raise ValueError(f"Unknown destination domain: {dest_domain}")
+
+    def _launch_mint(self, coro):
+        task = asyncio.create_task(coro)
+        self._mint_tasks.add(task)
+        task.add_done_callback(self._mint_tasks.discard)
+
+    def _transmitter_for(self, message: CCTPMessage) -> str:
+        """MessageTransmitter for the message version (same address on all chains)"""
+        return (
+            self.MESSAGE_TRANSMITTER_V2
+            if message.version == MESSAGE_VERSION_V2
+            else self.MESSAGE_TRANSMITTER
+        )
+
+    async def _preflight(self, dest_chain: str, transfers: List[CCTPTransfer]):
+        """Skip transfers already received on the destination, then relay the rest"""
+        received = await self._received_on_chain(dest_chain, transfers)
+        batch_relayers = await self._batch_relayers_on(dest_chain)
+        for transfer in transfers:
+            if transfer.key in received:
+                self._mark_received(transfer)
+                continue
+            batch_relayer = self._batch_relayer_for(transfer, batch_relayers)
+            if batch_relayer:
+                self._enqueue_batch(dest_chain, batch_relayer, transfer)
+            else:
+                self._launch_mint(self._complete_transfer(transfer))
+
+    async def _received_on_chain(
+        self, dest_chain: str, transfers: List[CCTPTransfer]
+    ) -> Set[str]:
+        """Keys of transfers whose message the destination has already received
+
+        Reads usedNonces for all of them in one Multicall3 eth_call. On any
+        error nothing is reported as received, so the transfers are relayed
+        as if the check had not run.
+        """
+        web3 = self.web3_instances.get(dest_chain)
+        calls = []
+        keys = []
+        for transfer in transfers:
+            if not transfer.message:
+                continue
+            try:
+                message = parse_message(transfer.message, burn=False)
+            except ValueError:
+                continue
+            calls.append(
+                (
+                    Web3.to_checksum_address(self._transmitter_for(message)),
+                    True,
+                    self.USED_NONCES_SELECTOR + used_nonce_key(message),
+                )
+            )
+            keys.append(transfer.key)
+        if not web3 or not calls:
+            return set()
+
+        try:
+            multicall = web3.eth.contract(
+                address=Web3.to_checksum_address(self.MULTICALL3),
+                abi=self.MULTICALL3_ABI,
+            )
+            results = await multicall.functions.aggregate3(calls).call()
+        except Exception as e:
+            logger.warning(
+                f"usedNonces pre-flight failed on {dest_chain}, relaying without it: "
+                f"{e}"
+            )
+            return set()
+
+        return {
+            key
+            for key, (success, data) in zip(keys, results, strict=True)
+            if success and len(data) >= 32 and int.from_bytes(data[:32], "big") != 0
+        }
+
+    def _mark_received(self, transfer: CCTPTransfer):
+        """Complete a transfer whose message was already received on the
+        destination (by another relayer or the user), without sending anything"""
+        transfer.completed_at = datetime.utcnow()
+        self._set_status(transfer, TransferStatus.COMPLETED)
+        logger.info(
+            f"⏭️ Transfer {transfer.key} already received on destination, skipping mint"
+        )
+
     async def _complete_transfer(self, transfer: CCTPTransfer):
         """Complete the transfer on destination chain (mint USDC)"""
-        if transfer.status != TransferStatus.ATTESTED:
+        if transfer.status not in (TransferStatus.ATTESTED, TransferStatus.COMPLETING):
             return
         
         if not transfer.message or not transfer.attestation:
             logger.error(f"Missing message or attestation for {transfer.tx_hash}")
+            self._set_status(transfer, TransferStatus.FAILED)
             return
         
         try:
-            transfer.status = TransferStatus.COMPLETING
-            logger.info(f"🔄 Minting USDC on destination chain...")
-            
-            # Get destination chain name
-            dest_chain = None
-            for chain, domain in self.DOMAINS.items():
-                if domain == transfer.dest_domain:
-                    dest_chain = chain
-                    break
-            
-            if not dest_chain:
-                raise ValueError(f"Unknown destination domain: {transfer.dest_domain}")
+            self._set_status(transfer, TransferStatus.COMPLETING)
+            logger.info("🔄 Minting USDC on destination chain...")
             
+            dest_chain = self._get_dest_chain(transfer.dest_domain)
             logger.info(f"   Destination: {dest_chain}")
             
             # Get Web3 instance for destination chain
             web3 = self.web3_instances.get(dest_chain)
             if not web3:
                 raise ValueError(f"No Web3 instance for {dest_chain}")
-            
-            # Prepare MessageTransmitter contract with receiveMessage function
-            # This matches Circle's official implementation
-            message_transmitter_abi = [
-                {
-                    "type": "function",
-                    "name": "receiveMessage",
-                    "stateMutability": "nonpayable",
-                    "inputs": [
-                        {"name": "message", "type": "bytes"},
-                        {"name": "attestation", "type": "bytes"}
-                    ],
-                    "outputs": []
-                }
-            ]
-            
-            # Use MessageTransmitter address for the destination chain
-            # Same address on all chains for v1 and v2
-            transmitter_address = self.MESSAGE_TRANSMITTER
+
+            transmitter = self._transmitter_for(
+                parse_message(transfer.message, burn=False)
+            )
             contract = web3.eth.contract(
-                address=Web3.to_checksum_address(transmitter_address),
-                abi=message_transmitter_abi
+                address=Web3.to_checksum_address(transmitter),
+                abi=self.MESSAGE_TRANSMITTER_ABI,
             )
-            
-            # Build transaction
-            nonce = web3.eth.get_transaction_count(self.account.address)
-            
-            # Estimate gas
-            try:
-                gas_estimate = contract.functions.receiveMessage(
-                    bytes.fromhex(transfer.message.replace("0x", "")),
-                    bytes.fromhex(transfer.attestation.replace("0x", ""))
-                ).estimate_gas({'from': self.account.address})
-            except Exception as e:
-                logger.error(f"Gas estimation failed: {e}")
-                gas_estimate = 300000  # Default gas limit
-            
-            # Get gas price
-            gas_price = web3.eth.gas_price
-            
-            # Build transaction
-            tx = contract.functions.receiveMessage(
-                bytes.fromhex(transfer.message.replace("0x", "")),
-                bytes.fromhex(transfer.attestation.replace("0x", ""))
-            ).build_transaction({
-                'from': self.account.address,
-                'nonce': nonce,
-                'gas': int(gas_estimate * 1.2),  # Add 20% buffer
-                'gasPrice': gas_price,
-                'chainId': web3.eth.chain_id
-            })
-            
-            # Sign and send transaction
-            signed_tx = self.account.sign_transaction(tx)
-            tx_hash = web3.eth.send_raw_transaction(signed_tx.rawTransaction)
-            
-            logger.info(f"📤 Completion TX sent: {tx_hash.hex()}")
+            receive_call = contract.functions.receiveMessage(
+                transfer.message, transfer.attestation
+            )
+
+            sent = await self._send_transaction(
+                dest_chain, web3, receive_call, default_gas=300000
+            )
+            self._record_submitted(transfer, sent.tx_hash)
+            logger.info(f"📤 Completion TX sent: {sent.tx_hash.hex()}")
             logger.info(f"   Chain: {dest_chain}")
-            logger.info(f"   Waiting for confirmation...")
-            
-            # Wait for confirmation
-            receipt = web3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
+            logger.info("   Waiting for confirmation...")
             
+            receipt = await self._wait_for_receipt(dest_chain, sent)
             if receipt['status'] == 1:
-                transfer.status = TransferStatus.COMPLETED
-                transfer.completed_at = datetime.utcnow()
-                
-                elapsed = (transfer.completed_at - transfer.created_at).total_seconds()
-                
-                logger.info(f"✅ Transfer completed successfully!")
-                logger.info(f"   Source TX: {transfer.tx_hash}")
-                logger.info(f"   Completion TX: {receipt['transactionHash'].hex()}")
-                logger.info(f"   Total time: {elapsed:.1f} seconds")
-                logger.info(f"   Recipient: {transfer.recipient}")
-                logger.info(f"   Amount: {transfer.amount / 10**6} USDC")
-            else:
-                transfer.status = TransferStatus.FAILED
-                logger.error(f"❌ Completion transaction failed for {transfer.tx_hash}")
-                
+                self._mark_completed(transfer, receipt)
+                return
+            logger.error(f"❌ Completion transaction failed for {transfer.tx_hash}")
+            # Usually someone else minted first; that is a completion, not a failure
+            transfer.completion_tx_hash = None
+
+        except LeaseLostError as e:
+            self._leave_to_owner([transfer], e)
+            return
         except Exception as e:
-            transfer.status = TransferStatus.FAILED
             logger.error(f"Error completing transfer {transfer.tx_hash}: {e}")
+
+        try:
+            dest_chain = self._get_dest_chain(transfer.dest_domain)
+        except ValueError:
+            dest_chain = None
+        if dest_chain and transfer.key in await self._received_on_chain(
+            dest_chain, [transfer]
+        ):
+            self._mark_received(transfer)
+        else:
+            self._set_status(transfer, TransferStatus.FAILED)
+
+    async def _batch_relayers_on(self, dest_chain: str) -> Dict[str, str]:
+        """The chain's batch relayers by the MessageTransmitter each one calls
+
+        Read from the contracts on first use. If any cannot be read, nothing is
+        batched on the chain until a later attempt succeeds.
+        """
+        known = self._batch_transmitters.get(dest_chain)
+        addresses = self.batch_relayers.get(dest_chain)
+        if known is not None or not addresses:
+            return known or {}
+        web3 = self.web3_instances[dest_chain]
+        transmitters = await asyncio.gather(
+            *(
+                web3.eth.contract(
+                    address=Web3.to_checksum_address(address),
+                    abi=self.BATCH_RELAYER_ABI,
+                )
+                .functions.messageTransmitter()
+                .call()
+                for address in addresses
+            ),
+            return_exceptions=True,
+        )
+        relayers = {}
+        for address, transmitter in zip(addresses, transmitters, strict=True):
+            if isinstance(transmitter, Exception):
+                logger.warning(
+                    f"Could not read the MessageTransmitter of batch relayer "
+                    f"{address} on {dest_chain}, relaying individually: {transmitter}"
+                )
+                return {}
+            relayers[Web3.to_checksum_address(transmitter)] = Web3.to_checksum_address(
+                address
+            )
+        self._batch_transmitters[dest_chain] = relayers
+        return relayers
+
+    def _batch_relayer_for(
+        self, transfer: CCTPTransfer, batch_relayers: Dict[str, str]
+    ) -> Optional[str]:
+        """The batch relayer that can deliver a transfer's message, if any"""
+        if not batch_relayers or not transfer.message:
+            return None
+        try:
+            message = parse_message(transfer.message, burn=False)
+        except ValueError:
+            return None
+        # The MessageTransmitter sees the batch relayer as the caller, so only
+        # messages without a destinationCaller restriction can be batched
+        if message.has_destination_caller:
+            return None
+        # A batch relayer calls one MessageTransmitter, which only accepts
+        # messages of its own version
+        return batch_relayers.get(
+            Web3.to_checksum_address(self._transmitter_for(message))
+        )
+
+    def _enqueue_batch(
+        self, dest_chain: str, batch_relayer: str, transfer: CCTPTransfer
+    ):
+        """Add a transfer to a batch relayer's queue, flushing on size or window"""
+        batch = (dest_chain, batch_relayer)
+        queue = self._batch_queues.setdefault(batch, [])
+        queue.append(transfer)
+
+        if len(queue) >= self.batch_max_size:
+            self._flush_batch(batch)
+        elif batch not in self._batch_timers:
+            self._batch_timers[batch] = asyncio.create_task(self._batch_timer(batch))
+
+    async def _batch_timer(self, batch: Tuple[str, str]):
+        await asyncio.sleep(self.batch_window)
+        self._batch_timers.pop(batch, None)
+        self._flush_batch(batch)
+
+    def _flush_batch(self, batch: Tuple[str, str]):
+        timer = self._batch_timers.pop(batch, None)
+        if timer and timer is not asyncio.current_task():
+            timer.cancel()
+
+        transfers = self._batch_queues.pop(batch, [])
+        if len(transfers) == 1:
+            self._launch_mint(self._complete_transfer(transfers[0]))
+        elif transfers:
+            self._launch_mint(self._complete_batch(*batch, transfers))
+
+    async def _complete_batch(
+        self, dest_chain: str, batch_relayer: str, transfers: List[CCTPTransfer]
+    ):
+        """Relay several transfers in one CCTPBatchRelayer transaction
+
+        Falls back to individual submission if the batch cannot be sent (gas
+        estimation reverts because a message fails) or the batch reverts.
+        """
+        logger.info(
+            f"🔄 Minting {len(transfers)} transfers on {dest_chain} in one batch..."
+        )
+        web3 = self.web3_instances[dest_chain]
+        try:
+            contract = web3.eth.contract(
+                address=batch_relayer,
+                abi=self.BATCH_RELAYER_ABI,
+            )
+            batch_call = contract.functions.receiveMessages(
+                [t.message for t in transfers], [t.attestation for t in transfers]
+            )
+            sent = await self._send_transaction(dest_chain, web3, batch_call)
+        except LeaseLostError as e:
+            self._leave_to_owner(transfers, e)
+            return
+        except Exception as e:
+            logger.warning(
+                f"Batch submission on {dest_chain} failed, relaying individually: {e}"
+            )
+            await self._complete_unreceived(dest_chain, transfers)
+            return
+
+        tx_hash = sent.tx_hash
+        for transfer in transfers:
+            self._record_submitted(transfer, tx_hash)
+        logger.info(
+            f"📤 Batch completion TX sent: {tx_hash.hex()} ({len(transfers)} messages)"
+        )
+
+        try:
+            receipt = await self._wait_for_receipt(dest_chain, sent)
+        except Exception as e:
+            logger.error(f"Error confirming batch {tx_hash.hex()} on {dest_chain}: {e}")
+            # The batch (or someone else) may still have delivered them
+            received = await self._received_on_chain(dest_chain, transfers)
+            for transfer in transfers:
+                if transfer.key in received:
+                    self._mark_received(transfer)
+                else:
+                    self._set_status(transfer, TransferStatus.FAILED)
+            return
+
+        if receipt["status"] == 1:
+            for transfer in transfers:
+                self._mark_completed(transfer, receipt)
+        else:
+            logger.warning(
+                f"Batch {tx_hash.hex()} reverted on {dest_chain}, relaying individually"
+            )
+            for transfer in transfers:
+                transfer.completion_tx_hash = None
+            await self._complete_unreceived(dest_chain, transfers)
+
+    async def _complete_unreceived(
+        self, dest_chain: str, transfers: List[CCTPTransfer]
+    ):
+        """Batch fallback: relay one by one the messages nobody has received yet"""
+        received = await self._received_on_chain(dest_chain, transfers)
+        for transfer in transfers:
+            if transfer.key in received:
+                self._mark_received(transfer)
+        await asyncio.gather(
+            *(self._complete_transfer(t) for t in transfers if t.key not in received)
+        )
+
+    def _get_signer_pool(self, chain: str) -> SignerPool:
+        """Get (or create and start) a chain's signers, each with a nonce allocator"""
+        pool = self.signer_pools.get(chain)
+        if pool is None:
+            pool = SignerPool(
+                chain,
+                self.web3_instances[chain],
+                self.accounts,
+                min_balance=self.min_signer_balance,
+            )
+            pool.start()
+            self.signer_pools[chain] = pool
+        return pool
+
+    def _get_fee_oracle(self, chain: str) -> FeeOracle:
+        """Get (or create and start) the fee oracle for a chain"""
+        oracle = self.fee_oracles.get(chain)
+        if oracle is None:
+            oracle = FeeOracle(chain, self.web3_instances[chain])
+            oracle.start()
+            self.fee_oracles[chain] = oracle
+        return oracle
+
+    def _get_tx_manager(self, chain: str) -> TransactionManager:
+        """Get (or create) the transaction confirmation manager for a chain"""
+        manager = self.tx_managers.get(chain)
+        if manager is None:
+            web3 = self.web3_instances[chain]
+            tracker = ReceiptTracker(
+                chain, web3, confirmations=self.confirmations.get(chain, 1)
+            )
+            self.receipt_trackers[chain] = tracker
+            manager = TransactionManager(
+                chain, web3, self._get_fee_oracle(chain), tracker
+            )
+            self.tx_managers[chain] = manager
+        return manager
+
+    async def _send_transaction(
+        self,
+        dest_chain: str,
+        web3: AsyncWeb3,
+        contract_call,
+        default_gas: Optional[int] = None,
+    ) -> SentTransaction:
+        """Build, sign and broadcast a contract call
+
+        The call is signed by the chain's least-loaded funded signer, which
+        stays assigned until ``_wait_for_receipt`` returns. If gas estimation
+        fails the call is sent with ``default_gas``, or the estimation error is
+        raised when no default is given.
+        """
+        pool = self._get_signer_pool(dest_chain)
+        signer = pool.acquire()
+        try:
+            return await self._sign_and_send(
+                dest_chain, web3, signer, contract_call, default_gas
+            )
+        except BaseException:
+            pool.release(signer)
+            raise
+
+    async def _sign_and_send(
+        self,
+        dest_chain: str,
+        web3: AsyncWeb3,
+        signer: Signer,
+        contract_call,
+        default_gas: Optional[int],
+    ) -> SentTransaction:
+        """Sign and broadcast with ``signer``"""
+
+        # Gas estimate is the only RPC before sending; fees and chain ID come
+        # from the oracle's cache (fetched here only on a chain's first use)
+        async def estimate_gas() -> int:
+            try:
+                return await contract_call.estimate_gas({"from": signer.address})
+            except Exception as e:
+                if default_gas is None:
+                    raise
+                logger.error(f"Gas estimation failed: {e}")
+                return default_gas
+
+        oracle = self._get_fee_oracle(dest_chain)
+        gas_estimate, fees, chain_id = await asyncio.gather(
+            estimate_gas(), oracle.quote(), oracle.get_chain_id()
+        )
+
+        await self._check_lease(dest_chain)
+        nonces = signer.nonces
+        for attempt in range(self.MAX_SEND_ATTEMPTS):
+            nonce = await nonces.allocate()
+            try:
+                tx = await contract_call.build_transaction(
+                    {
+                        "from": signer.address,
+                        "nonce": nonce,
+                        "gas": int(gas_estimate * 1.2),  # Add 20% buffer
+                        "chainId": chain_id,
+                        **fees.tx_params(),
+                    }
+                )
+
+                # Sign and send transaction
+                signed_tx = signer.account.sign_transaction(tx)
+                tx_hash = await web3.eth.send_raw_transaction(signed_tx.rawTransaction)
+            except Exception as e:
+                if not is_nonce_too_low(e):
+                    nonces.release(nonce)
+                    raise
+                # Nonce consumed outside our allocator: resync and retry
+                logger.warning(
+                    f"Nonce {nonce} too low on {dest_chain} for {signer.address}, "
+                    "resyncing"
+                )
+                await nonces.resync()
+                if attempt + 1 == self.MAX_SEND_ATTEMPTS:
+                    raise
+                continue
+            nonces.mark_sent(nonce)
+            return SentTransaction(
+                chain=dest_chain, signer=signer, tx=tx, hashes=[tx_hash]
+            )
+
+    async def _check_lease(self, chain: str):
+        """Confirm with Redis that this worker still owns the chain's shard"""
+        if self.shared and not await self.shared.leases.verify(
+            str(self.DOMAINS[chain])
+        ):
+            raise LeaseLostError(f"Lease on {chain} shard lost, not sending")
+
+    async def _wait_for_receipt(self, dest_chain: str, sent: SentTransaction):
+        """Wait for whichever version of a transaction is mined (replacing it
+        with higher fees while it is stuck), then free the signer"""
+        receipt = None
+        try:
+            receipt = await self._get_tx_manager(dest_chain).confirm(sent)
+            sent.signer.nonces.mark_mined(sent.nonce)
+            return receipt
+        finally:
+            self._get_signer_pool(dest_chain).release(sent.signer, receipt)
+
+    def _mark_completed(self, transfer: CCTPTransfer, receipt):
+        # The version that was mined, if the transaction was replaced
+        transfer.completion_tx_hash = receipt["transactionHash"].hex()
+        transfer.completed_at = datetime.utcnow()
+        self._set_status(transfer, TransferStatus.COMPLETED)
+
+        elapsed = (transfer.completed_at - transfer.created_at).total_seconds()
+
+        logger.info("✅ Transfer completed successfully!")
+        logger.info(f"   Source TX: {transfer.tx_hash}")
+        logger.info(f"   Completion TX: {receipt['transactionHash'].hex()}")
+        logger.info(f"   Total time: {elapsed:.1f} seconds")
+        logger.info(f"   Recipient: {transfer.recipient}")
+        logger.info(f"   Amount: {transfer.amount / 10**6} USDC")
+
+    async def _nonce_gap_loop(self):
+        """Detect nonces left unfilled by failed or dropped sends and fill them"""
+        while True:
+            await asyncio.sleep(self.NONCE_GAP_CHECK_INTERVAL)
+            for chain, pool in list(self.signer_pools.items()):
+                manager = self.tx_managers.get(chain)
+                for signer in pool:
+                    try:
+                        # Nonces still being confirmed are rebroadcast by their
+                        # TransactionManager
+                        owned = manager.watching(signer.address) if manager else ()
+                        for nonce in await signer.nonces.find_gaps(
+                            self.NONCE_GAP_STALE_AFTER, owned=owned
+                        ):
+                            await self._fill_nonce_gap(chain, signer, nonce)
+                    except Exception as e:
+                        logger.error(
+                            f"Error checking nonce gaps on {chain} for "
+                            f"{signer.address}: {e}"
+                        )
+
+    async def _fill_nonce_gap(self, chain: str, signer: Signer, nonce: int):
+        """Send a zero-value self-transfer at ``nonce`` to unblock later transactions"""
+        web3 = self.web3_instances[chain]
+        nonces = signer.nonces
+        try:
+            await self._check_lease(chain)
+            oracle = self._get_fee_oracle(chain)
+            fees, chain_id = await asyncio.gather(oracle.quote(), oracle.get_chain_id())
+            tx = {
+                "from": signer.address,
+                "to": signer.address,
+                "value": 0,
+                "nonce": nonce,
+                "gas": 21000,
+                "chainId": chain_id,
+                **fees.tx_params(
+                    bump=1.25
+                ),  # Outbid a dropped tx still lingering in a mempool
+            }
+            signed_tx = signer.account.sign_transaction(tx)
+            tx_hash = await web3.eth.send_raw_transaction(signed_tx.rawTransaction)
+            nonces.mark_sent(nonce)
+            logger.info(f"🩹 Filled nonce gap {nonce} on {chain}: {tx_hash.hex()}")
+        except Exception as e:
+            if not is_nonce_too_low(e):
+                nonces.release(nonce)
+            logger.error(f"Failed to fill nonce gap {nonce} on {chain}: {e}")
     
     def get_transfer_status(self, tx_hash: str) -> Optional[Dict]:
-        """Get status of a monitored transfer"""
+        """Get status of a monitored transfer by key
+
+        The key is the tx hash, or "<tx hash>:<index>" for later messages.
+        """
         transfer = self.transfers.get(tx_hash)
         if not transfer:
-            return None
-        
+            archived = self.transfers.get_archived(tx_hash)
+            return self._archived_status(archived) if archived else None
+        return self._transfer_status(transfer)
+
+    async def lookup_transfer_status(self, tx_hash: str) -> Optional[Dict]:
+        """Like get_transfer_status, falling back to shared state (other workers)"""
+        status = self.get_transfer_status(tx_hash)
+        if status is None and self.shared:
+            row = await self.shared.get(tx_hash)
+            if row:
+                return self._transfer_status(self._transfer_from_row(row))
+        return status
+
+    @staticmethod
+    def _transfer_status(transfer: CCTPTransfer) -> Dict:
         return {
             "tx_hash": transfer.tx_hash,
+            "message_index": transfer.message_index,
             "status": transfer.status.value,
             "source_domain": transfer.source_domain,
             "dest_domain": transfer.dest_domain,
             "amount": transfer.amount / 10**6 if transfer.amount else 0,
             "recipient": transfer.recipient,
-            "event_nonce": transfer.event_nonce,
+            "event_nonce": str(transfer.event_nonce)
+            if transfer.event_nonce is not None
+            else None,
             "created_at": transfer.created_at.isoformat(),
-            "completed_at": transfer.completed_at.isoformat() if transfer.completed_at else None,
-            "has_attestation": bool(transfer.attestation)
+            "completed_at": transfer.completed_at.isoformat()
+            if transfer.completed_at
+            else None,
+            "has_attestation": bool(transfer.attestation),
+            "completion_tx_hash": transfer.completion_tx_hash,
+        }
+
+    @staticmethod
+    def _archived_status(archived) -> Dict:
+        return {
+            "tx_hash": archived.tx_hash,
+            "message_index": archived.message_index,
+            "status": archived.status,
+            "source_domain": archived.source_domain,
+            "dest_domain": archived.dest_domain,
+            "amount": archived.amount / 10**6 if archived.amount else 0,
+            "recipient": archived.recipient,
+            "event_nonce": archived.event_nonce,
+            "created_at": utc_datetime(archived.created_at).isoformat(),
+            "completed_at": utc_datetime(archived.completed_at).isoformat()
+            if archived.completed_at
+            else None,
+            "has_attestation": archived.status == TransferStatus.COMPLETED.value,
+            "completion_tx_hash": archived.completion_tx_hash,
+        }
+
+    async def list_transfers(
+        self,
+        limit: int = 50,
+        cursor: Optional[SortKey] = None,
+        status: Optional[str] = None,
+        source_domain: Optional[int] = None,
+        dest_domain: Optional[int] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> Tuple[List[Dict], Optional[SortKey]]:
+        """
+        One page of transfers, newest first
+
+        Reads the store when there is one (all history, through its indexes)
+        and the registry's creation-time index otherwise. The registry has no
+        per-filter index: filtered pages walk the creation-time index newest
+        first and skip what does not match, so a rare status or route costs a
+        scan over the transfers held in memory. Times are naive UTC.
+
+        Returns:
+            The page, and the cursor to pass for the next one (None after the
+            last page)
+        """
+        if self.store:
+            before = (utc_datetime(cursor[0]), cursor[1], cursor[2]) if cursor else None
+            rows = await self.store.page(
+                before,
+                limit,
+                status=status,
+                source_domain=source_domain,
+                dest_domain=dest_domain,
+                since=since,
+                until=until,
+            )
+            page = []
+            for row in rows:
+                # Rows are written behind: live transfers have the latest status
+                transfer = self.transfers.get(
+                    transfer_key(row["tx_hash"], row["message_index"])
+                )
+                if transfer is None:
+                    transfer = self._transfer_from_row(row)
+                if status is None or transfer.status.value == status:
+                    page.append(self._transfer_status(transfer))
+            if len(rows) < limit:
+                return page, None
+            last = rows[-1]
+            return page, (
+                utc_timestamp(last["created_at"]),
+                last["tx_hash"],
+                last["message_index"],
+            )
+
+        before = cursor
+        if until is not None:
+            before = (
+                min(before, (utc_timestamp(until),))
+                if before
+                else (utc_timestamp(until),)
+            )
+        page, position = [], None
+        for position, record in self.transfers.newest(
+            before, utc_timestamp(since) if since else None
+        ):
+            if (
+                (
+                    status is not None
+                    and getattr(record.status, "value", record.status) != status
+                )
+                or (source_domain is not None and record.source_domain != source_domain)
+                or (dest_domain is not None and record.dest_domain != dest_domain)
+            ):
+                continue
+            if isinstance(record, CCTPTransfer):
+                page.append(self._transfer_status(record))
+            else:
+                page.append(self._archived_status(record))
+            if len(page) == limit:
+                return page, position
+        return page, None
+
+    def get_stats(self) -> Dict:
+        """Transfer counts per status and completed volume, kept on every transition"""
+        totals = self.transfers.totals
+        return {
+            "total_transfers": sum(totals.values()),
+            **{status.value: count for status, count in totals.items()},
+            "total_volume_usdc": self.transfers.volumes[TransferStatus.COMPLETED]
+            / 10**6,
+        }
+
+    def health(self) -> Dict:
+        """Relayer address, dependencies, signers and shards, for /relayer/health"""
+        return {
+            "relayer_address": self.account.address,
+            "monitored_transfers": len(self.transfers),
+            "iris": self.iris.stats.as_dict() if self.iris else None,
+            # Per-chain readiness from the background RPC probes, plus latency,
+            # error rate and breaker state per endpoint
+            "chains": self.web3_instances.health(),
+            # Hot wallets per chain: balance, whether in rotation, work in flight
+            "signers": {
+                chain: [signer.as_dict() for signer in pool]
+                for chain, pool in self.signer_pools.items()
+            },
+            # Shards (destination domains) this worker holds leases on, with their
+            # fencing tokens
+            "shards": self.shared.leases.as_dict() if self.shared else None,
+            "fee_data_age": {
+                chain: round(oracle.age, 1) if oracle.age is not None else None
+                for chain, oracle in self.fee_oracles.items()
+            },
         }
     
     def get_all_transfers(self) -> List[Dict]:
-        """Get all monitored transfers"""
-        return [self.get_transfer_status(tx_hash) for tx_hash in self.transfers.keys()]
+        """Get all monitored transfers (live, then archived)"""
+        return [
+            *(self.get_transfer_status(tx_hash) for tx_hash in self.transfers.keys()),
+            *(
+                self._archived_status(archived)
+                for archived in self.transfers.archive.values()
+            ),
+        ]
 
 
 # Singleton instance
 _relayer_instance: Optional[CCTPRelayer] = None
 
-def get_relayer(private_key: Optional[str] = None) -> CCTPRelayer:
+def get_relayer(
+    private_key: Optional[str] = None,
+    network: str = "mainnet",
+    batch_relayers: Optional[Dict[str, List[str]]] = None,
+    store: Optional[TransferStore] = None,
+    burn_scanner: Optional[BurnScanner] = None,
+    rpc_urls: Optional[Dict[str, List[str]]] = None,
+    chain_clients: Optional[ChainClients] = None,
+    shared_state: Optional[SharedTransferState] = None,
+    signer_keys: Optional[List[str]] = None,
+    status_stream: Optional[StatusStream] = None,
+) -> CCTPRelayer:
     """Get or create the relayer instance"""
     global _relayer_instance
     
     if _relayer_instance is None:
         if not private_key:
             raise ValueError("Private key required to initialize relayer")
-        _relayer_instance = CCTPRelayer(private_key)
+        _relayer_instance = CCTPRelayer(
+            private_key,
+            network=network,
+            batch_relayers=batch_relayers,
+            store=store,
+            burn_scanner=burn_scanner,
+            rpc_urls=rpc_urls,
+            chain_clients=chain_clients,
+            shared_state=shared_state,
+            signer_keys=signer_keys,
+            status_stream=status_stream,
+        )
     
     return _relayer_instance
\ No newline at end of file
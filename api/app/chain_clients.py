@@ -0,0 +1,184 @@
+"""
+Lazy chain clients with background connectivity probes
+A client is built the first time a chain is used, and probes run concurrently
+in a background task, so relayer startup never waits on an RPC endpoint and
+one hung provider cannot stall the others.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence, Union
+
+from web3 import AsyncWeb3
+
+from app.config import settings
+from app.rpc_pool import RPCPool
+
+logger = logging.getLogger(__name__)
+
+# Chain names by EVM chain ID
+CHAIN_NAMES = {
+    1: "ethereum",
+    42161: "arbitrum",
+    8453: "base",
+    10: "optimism",
+    137: "polygon",
+    43114: "avalanche",
+}
+
+
+@dataclass
+class ChainStatus:
+    """Result of the latest connectivity probe for a chain"""
+
+    # None until the first probe finishes
+    ready: Optional[bool] = None
+    block_number: Optional[int] = None
+    latency_ms: Optional[float] = None
+    error: Optional[str] = None
+    checked_at: Optional[float] = None
+
+    def as_dict(self) -> Dict:
+        return dict(self.__dict__)
+
+
+class ChainClients:
+    """AsyncWeb3 clients by chain name, created on first access
+
+    Behaves like a read-only mapping over the configured chains. Each client
+    talks to the chain through an RPCPool over its endpoints.
+    """
+
+    def __init__(
+        self,
+        rpc_urls: Dict[str, Union[str, Sequence[str]]],
+        probe_interval: float = 30.0,
+        probe_timeout: float = 5.0,
+    ):
+        """
+        Args:
+            rpc_urls: RPC endpoint, or list of endpoints, per chain name
+            probe_interval: Seconds between connectivity probes
+            probe_timeout: Seconds before a probe counts the chain as unreachable
+        """
+        self.rpc_urls: Dict[str, List[str]] = {
+            chain: [urls] if isinstance(urls, str) else list(urls)
+            for chain, urls in rpc_urls.items()
+        }
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        self.status: Dict[str, ChainStatus] = {
+            chain: ChainStatus() for chain in self.rpc_urls
+        }
+        self._clients: Dict[str, AsyncWeb3] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def __getitem__(self, chain: str) -> AsyncWeb3:
+        client = self._clients.get(chain)
+        if client is None:
+            client = self._create(chain)
+        return client
+
+    def get(self, chain: str) -> Optional[AsyncWeb3]:
+        if chain not in self.rpc_urls:
+            return None
+        return self[chain]
+
+    def __contains__(self, chain: object) -> bool:
+        return chain in self.rpc_urls
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.rpc_urls)
+
+    def __len__(self) -> int:
+        return len(self.rpc_urls)
+
+    def _create(self, chain: str) -> AsyncWeb3:
+        web3 = AsyncWeb3(RPCPool(self.rpc_urls[chain], name=chain))
+        # The validation middleware fetches eth_chainId before every
+        # estimate/send; transactions carry the fee oracle's cached chain ID
+        web3.middleware_onion.remove("validation")
+        self._clients[chain] = web3
+        return web3
+
+    def ready(self, chain: str) -> Optional[bool]:
+        """Whether the chain answered its last probe (None if not probed yet)"""
+        status = self.status.get(chain)
+        return status.ready if status else None
+
+    def health(self) -> Dict[str, Dict]:
+        """Probe status per chain, with endpoint stats for chains in use"""
+        health = {}
+        for chain, status in self.status.items():
+            health[chain] = status.as_dict()
+            client = self._clients.get(chain)
+            if client is not None:
+                health[chain].update(client.provider.stats())
+        return health
+
+    def start(self):
+        """Start probing in the background; returns immediately"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._probe_loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await asyncio.gather(
+            *(client.provider.disconnect() for client in self._clients.values())
+        )
+
+    async def probe_all(self):
+        """Probe every chain concurrently"""
+        await asyncio.gather(*(self.probe(chain) for chain in self.rpc_urls))
+
+    async def probe(self, chain: str) -> ChainStatus:
+        """Fetch the head block, bounded by ``probe_timeout``"""
+        status = self.status[chain]
+        was_ready = status.ready
+        started = time.monotonic()
+        try:
+            block_number = await asyncio.wait_for(
+                self[chain].eth.block_number, self.probe_timeout
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            status.ready = False
+            status.error = str(e) or type(e).__name__
+            status.latency_ms = None
+            if was_ready is not False:
+                logger.warning(f"⚠️ {chain} RPC unreachable: {status.error}")
+        else:
+            status.ready = True
+            status.error = None
+            status.block_number = block_number
+            status.latency_ms = round((time.monotonic() - started) * 1000, 1)
+            if was_ready is not True:
+                logger.info(
+                    f"Connected to {chain} (block {block_number}, "
+                    f"{status.latency_ms:.0f}ms)"
+                )
+        status.checked_at = time.time()
+        return status
+
+    async def _probe_loop(self):
+        while True:
+            await self.probe_all()
+            await asyncio.sleep(self.probe_interval)
+
+
+_shared_clients: Optional[ChainClients] = None
+
+
+def get_chain_clients() -> ChainClients:
+    """Process-wide clients from settings, shared by the API routes and the relayer
+    so their concurrent reads to a chain are batched together"""
+    global _shared_clients
+    if _shared_clients is None:
+        _shared_clients = ChainClients(settings.rpc_urls())
+    return _shared_clients
@@ -3,7 +3,7 @@ Configuration for the API
 """
 
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List, Literal
 
 
 class Settings(BaseSettings):
@@ -27,8 +27,44 @@ class Settings(BaseSettings):
     
     # Redis
     REDIS_URL: str = "redis://localhost:6379"
-    
-    # Blockchain RPC URLs
+
+    # Relayer transfer store (SQLite WAL by default; point at Postgres with
+    # postgresql+asyncpg://... to share it). Empty disables persistence.
+    # API processes in front of relayer workers only read it, and only when it
+    # is set explicitly (to the database the workers write to); otherwise they
+    # serve status from Redis alone.
+    RELAYER_DATABASE_URL: str = "sqlite+aiosqlite:///./relayer.db"
+
+    # Deployment exports (directory or file) listing the router and CCTP
+    # contracts to scan for burns, e.g. ../contracts/deployments/exported.
+    # Only deployments on RELAYER_NETWORK are scanned.
+    # Empty disables on-chain discovery.
+    RELAYER_DEPLOYMENTS_PATH: str = ""
+
+    # Network the relayer operates on. Testnets share their mainnet's CCTP
+    # domains, so burns are only discovered on chains of this network.
+    RELAYER_NETWORK: Literal["mainnet", "testnet"] = "mainnet"
+
+    # CCTPBatchRelayer contracts (contracts/scripts/deploy-batch-relayer.js)
+    # as comma-separated chain=address pairs, e.g. "base=0x...,arbitrum=0x...".
+    # Each is bound to one MessageTransmitter; list a chain twice to batch
+    # both v1 and v2 messages. Empty relays every message on its own.
+    RELAYER_BATCH_RELAYERS: str = ""
+
+    # Redis shared by relayer workers and API processes: each destination
+    # domain is a shard leased to one worker, transfer state and status
+    # updates go through Redis, and the API queues new transfers there.
+    # Empty runs a single worker on its own, unreachable from the API.
+    RELAYER_REDIS_URL: str = ""
+
+    # The relayer runs as its own worker process (run_relayer.py) and API
+    # processes queue transfers and read status through RELAYER_REDIS_URL.
+    # True runs the relayer inside the API process instead (single uvicorn
+    # worker only, for development).
+    RELAYER_EMBEDDED: bool = False
+
+    # Blockchain RPC URLs (comma-separated for several endpoints per chain;
+    # the relayer ranks them by latency and fails over between them)
     ETHEREUM_RPC: str = "https://eth.llamarpc.com"
     ARBITRUM_RPC: str = "https://arb1.arbitrum.io/rpc"
     OPTIMISM_RPC: str = "https://mainnet.optimism.io"
@@ -53,7 +89,31 @@ class Settings(BaseSettings):
     # API Keys
     COINGECKO_API_KEY: str = ""
     CHAINLINK_API_KEY: str = ""
-    
+
+    def rpc_urls(self) -> Dict[str, List[str]]:
+        """RPC endpoints per chain name"""
+        configured = {
+            "ethereum": self.ETHEREUM_RPC,
+            "arbitrum": self.ARBITRUM_RPC,
+            "base": self.BASE_RPC,
+            "optimism": self.OPTIMISM_RPC,
+            "polygon": self.POLYGON_RPC,
+            "avalanche": self.AVALANCHE_RPC,
+        }
+        return {
+            chain: [url.strip() for url in value.split(",") if url.strip()]
+            for chain, value in configured.items()
+        }
+
+    def batch_relayers(self) -> Dict[str, List[str]]:
+        """CCTPBatchRelayer addresses per chain name"""
+        relayers: Dict[str, List[str]] = {}
+        for entry in self.RELAYER_BATCH_RELAYERS.split(","):
+            chain, _, address = entry.partition("=")
+            if address.strip():
+                relayers.setdefault(chain.strip(), []).append(address.strip())
+        return relayers
+
     class Config:
         env_file = ".env"
         case_sensitive = True
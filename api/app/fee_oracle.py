@@ -0,0 +1,185 @@
+"""
+Background fee oracle for relayer transactions
+Refreshes EIP-1559 fee data from eth_feeHistory off the hot path, so a
+completion can be built with ready-made type-2 fee parameters and the cached
+chain ID without any extra RPC round-trip.
+"""
+
+import asyncio
+import logging
+import statistics
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence
+
+from web3 import AsyncWeb3
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class FeeQuote:
+    """Fee parameters for the next block"""
+
+    base_fee: Optional[int]
+    max_priority_fee_per_gas: Optional[int]
+    max_fee_per_gas: Optional[int]
+    # Set instead of the EIP-1559 fields on chains without a base fee
+    gas_price: Optional[int]
+    updated_at: float
+
+    @property
+    def age(self) -> float:
+        """Seconds since the data was fetched"""
+        return time.time() - self.updated_at
+
+    def tx_params(self, bump: float = 1.0) -> Dict[str, int]:
+        """Transaction fee fields, scaled by ``bump`` to replace a transaction"""
+        if self.gas_price is not None:
+            return {"gasPrice": int(self.gas_price * bump)}
+        return {
+            "type": 2,
+            "maxFeePerGas": int(self.max_fee_per_gas * bump),
+            "maxPriorityFeePerGas": int(self.max_priority_fee_per_gas * bump),
+        }
+
+
+class FeeOracle:
+    """Per-chain fee cache refreshed from eth_feeHistory in the background
+
+    The priority fee is the median of the ``priority_percentile`` reward over
+    the last ``history_blocks`` blocks; the fee cap leaves room for the base
+    fee to rise ``base_fee_multiplier`` times before the transaction stalls.
+    """
+
+    def __init__(
+        self,
+        chain: str,
+        web3: AsyncWeb3,
+        refresh_interval: float = 3.0,
+        history_blocks: int = 10,
+        priority_percentile: float = 50,
+        base_fee_multiplier: float = 2.0,
+        min_priority_fee: int = 0,
+        max_age: float = 30.0,
+    ):
+        """
+        Args:
+            chain: Chain name (for logging)
+            web3: Client for the chain
+            refresh_interval: Seconds between background refreshes
+            history_blocks: Blocks of fee history to sample
+            priority_percentile: Reward percentile used for the priority fee
+            base_fee_multiplier: Fee cap as a multiple of the next base fee, plus
+                the tip
+            min_priority_fee: Floor for the priority fee in wei
+            max_age: Quotes older than this are refreshed synchronously before use
+        """
+        self.chain = chain
+        self.web3 = web3
+        self.refresh_interval = refresh_interval
+        self.history_blocks = history_blocks
+        self.priority_percentile = priority_percentile
+        self.base_fee_multiplier = base_fee_multiplier
+        self.min_priority_fee = min_priority_fee
+        self.max_age = max_age
+
+        self.chain_id: Optional[int] = None
+        self.latest: Optional[FeeQuote] = None
+        self.errors = 0
+        self._task: Optional[asyncio.Task] = None
+        self._refresh_lock = asyncio.Lock()
+
+    @property
+    def age(self) -> Optional[float]:
+        return self.latest.age if self.latest else None
+
+    @property
+    def stale(self) -> bool:
+        return self.latest is None or self.latest.age > self.max_age
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def quote(self) -> FeeQuote:
+        """Latest fee quote; only waits on RPC when there is none or it is stale"""
+        if self.stale:
+            if self.latest is not None:
+                logger.warning(
+                    f"Fee data for {self.chain} is {self.latest.age:.0f}s old, "
+                    "refreshing inline"
+                )
+            await self.refresh()
+        return self.latest
+
+    async def get_chain_id(self) -> int:
+        """Chain ID, fetched once"""
+        if self.chain_id is None:
+            async with self._refresh_lock:
+                if self.chain_id is None:
+                    self.chain_id = await self.web3.eth.chain_id
+        return self.chain_id
+
+    async def refresh(self):
+        async with self._refresh_lock:
+            if self.latest is not None and self.latest.age < self.refresh_interval / 2:
+                # Another caller refreshed while we waited for the lock
+                return
+            if self.chain_id is None:
+                self.chain_id = await self.web3.eth.chain_id
+            quote = None
+            try:
+                history = await self.web3.eth.fee_history(
+                    self.history_blocks, "latest", [self.priority_percentile]
+                )
+                quote = self._build_quote(history)
+            except Exception as e:
+                logger.debug(f"eth_feeHistory unavailable on {self.chain}: {e}")
+            # No usable fee history (pre-London chain or node): legacy gas price
+            self.latest = quote or await self._legacy_quote()
+
+    def _build_quote(self, history) -> Optional[FeeQuote]:
+        base_fees: Sequence[int] = history.get("baseFeePerGas") or []
+        # The last entry is the base fee of the block after the newest one
+        next_base_fee = int(base_fees[-1] or 0) if base_fees else 0
+        if next_base_fee <= 0:
+            return None
+        rewards = [int(block[0]) for block in history.get("reward") or [] if block]
+        priority_fee = max(
+            int(statistics.median(rewards)) if rewards else 0, self.min_priority_fee
+        )
+        return FeeQuote(
+            base_fee=next_base_fee,
+            max_priority_fee_per_gas=priority_fee,
+            max_fee_per_gas=int(next_base_fee * self.base_fee_multiplier)
+            + priority_fee,
+            gas_price=None,
+            updated_at=time.time(),
+        )
+
+    async def _legacy_quote(self) -> FeeQuote:
+        return FeeQuote(
+            base_fee=None,
+            max_priority_fee_per_gas=None,
+            max_fee_per_gas=None,
+            gas_price=await self.web3.eth.gas_price,
+            updated_at=time.time(),
+        )
+
+    async def _refresh_loop(self):
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"Fee refresh failed on {self.chain}: {e}")
+            await asyncio.sleep(self.refresh_interval)
@@ -0,0 +1,257 @@
+"""
+Circle Iris API client
+Pooled keep-alive session with a token-bucket limiter sized to Circle's
+published limit, Retry-After-aware throttling, per-request timeouts and
+jittered retries, so a burst of polls degrades into queueing instead of a
+wall of 429s.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional
+
+import aiohttp
+
+from app import metrics
+
+logger = logging.getLogger(__name__)
+
+# Circle allows 35 requests/second per client; going over it blocks all
+# requests for 5 minutes (answered with 429 and a Retry-After)
+CIRCLE_RATE_LIMIT = 35
+CIRCLE_BLOCK_SECONDS = 300
+
+
+class IrisError(Exception):
+    """An Iris request failed after all retries"""
+
+
+class TokenBucket:
+    """Async token bucket: ``rate`` tokens per second, up to ``capacity``"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until a token is available and take it (FIFO across callers)"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def drain(self):
+        """Drop accumulated burst capacity (after the server throttled us)"""
+        self._tokens = 0
+        self._updated = time.monotonic()
+
+
+@dataclass
+class IrisStats:
+    """Counters for Iris calls"""
+
+    requests: int = 0
+    succeeded: int = 0
+    not_found: int = 0
+    throttled: int = 0
+    retried: int = 0
+    timeouts: int = 0
+    failed: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return dict(self.__dict__)
+
+
+class IrisClient:
+    """Rate-limited client for Circle's attestation (Iris) API"""
+
+    def __init__(
+        self,
+        base_url: str = "https://iris-api.circle.com",
+        rate_limit: float = CIRCLE_RATE_LIMIT - 5,
+        burst: Optional[float] = None,
+        max_connections: int = 16,
+        request_timeout: float = 10.0,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+    ):
+        """
+        Args:
+            base_url: Iris API base URL (point at a local fake in tests)
+            rate_limit: Requests per second; kept below Circle's limit of 35
+            burst: Token bucket capacity; defaults to the headroom below Circle's
+                limit so a full burst plus a second of refill stays under it
+            max_connections: Keep-alive connection pool size (also caps
+                in-flight requests)
+            request_timeout: Total timeout per HTTP request in seconds
+            max_retries: Retries after the first attempt for throttling, 5xx and
+                network errors
+            backoff_base: First retry delay in seconds (doubles per attempt, with
+                full jitter)
+            backoff_max: Upper bound for a retry delay
+        """
+        self.base_url = base_url.rstrip("/")
+        self.max_connections = max_connections
+        self.request_timeout = request_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        if burst is None:
+            burst = max(1.0, CIRCLE_RATE_LIMIT - rate_limit)
+        self.bucket = TokenBucket(rate_limit, burst)
+        self.stats = IrisStats()
+        self.session: Optional[aiohttp.ClientSession] = None
+        # Wall-clock time until which Circle has asked us to back off
+        self._blocked_until = 0.0
+
+    async def start(self):
+        if self.session is None:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                keepalive_timeout=60,
+                ttl_dns_cache=300,
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.request_timeout),
+                headers={"Accept": "application/json"},
+            )
+
+    async def close(self):
+        if self.session:
+            await self.session.close()
+            self.session = None
+
+    @property
+    def throttled(self) -> bool:
+        return time.time() < self._blocked_until
+
+    async def get_messages(
+        self, source_domain: int, tx_hash: str
+    ) -> Optional[List[Dict]]:
+        """CCTP v2 messages emitted by ``tx_hash`` on ``source_domain``
+
+        Returns None while Circle has not indexed the transaction yet (404).
+
+        Raises:
+            IrisError: If the request still fails after retries
+        """
+        data = await self._get(
+            f"/v2/messages/{source_domain}", {"transactionHash": tx_hash}
+        )
+        if data is None:
+            return None
+        return data.get("messages") or []
+
+    async def _get(self, path: str, params: Dict[str, str]) -> Optional[Dict]:
+        if self.session is None:
+            await self.start()
+        url = self.base_url + path
+
+        for attempt in range(self.max_retries + 1):
+            await self._wait_until_unblocked()
+            await self.bucket.acquire()
+            self.stats.requests += 1
+            delay: Optional[float] = None
+            outcome = "network_error"
+            started = time.monotonic()
+            try:
+                async with self.session.get(url, params=params) as response:
+                    if response.status == 200:
+                        outcome = "ok"
+                        self.stats.succeeded += 1
+                        return await response.json()
+                    if response.status == 404:
+                        outcome = "not_found"
+                        self.stats.not_found += 1
+                        return None
+                    if response.status == 429:
+                        outcome = "throttled"
+                        self.stats.throttled += 1
+                        delay = self._retry_after(response.headers.get("Retry-After"))
+                        if self._block(delay):
+                            logger.warning(
+                                f"Iris API throttled, backing off {delay:.0f}s"
+                            )
+                    elif response.status >= 500:
+                        outcome = "server_error"
+                        error = f"HTTP {response.status}"
+                    else:
+                        # Other client errors will not succeed on retry
+                        outcome = "client_error"
+                        self.stats.failed += 1
+                        raise IrisError(f"Iris API error {response.status} for {url}")
+            except asyncio.TimeoutError:
+                outcome = "timeout"
+                self.stats.timeouts += 1
+                error = "timeout"
+            except aiohttp.ClientError as e:
+                error = str(e) or type(e).__name__
+            finally:
+                metrics.IRIS_REQUEST_SECONDS.observe(
+                    time.monotonic() - started, outcome
+                )
+
+            if attempt == self.max_retries:
+                break
+            self.stats.retried += 1
+            if delay is None:
+                delay = self._backoff(attempt)
+                logger.debug(f"Iris request failed ({error}), retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+        self.stats.failed += 1
+        raise IrisError(
+            f"Iris request to {url} failed after {self.max_retries + 1} attempts"
+        )
+
+    async def _wait_until_unblocked(self):
+        while True:
+            remaining = self._blocked_until - time.time()
+            if remaining <= 0:
+                return
+            await asyncio.sleep(remaining)
+
+    def _block(self, seconds: float) -> bool:
+        """Pause every caller: Circle throttles the client, not a single request
+
+        Returns whether this started a new block (rather than extending one).
+        """
+        now = time.time()
+        started = now >= self._blocked_until
+        self._blocked_until = max(self._blocked_until, now + seconds)
+        self.bucket.drain()
+        return started
+
+    def _backoff(self, attempt: int) -> float:
+        """Exponential backoff with full jitter"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+    @staticmethod
+    def _retry_after(value: Optional[str]) -> float:
+        """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+        if value:
+            try:
+                return max(0.0, float(value))
+            except ValueError:
+                pass
+            try:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+        return CIRCLE_BLOCK_SECONDS
@@ -3,10 +3,12 @@ Stable Router API - FastAPI backend for cross-chain stablecoin routing
 """
 
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import logging
 
+from app import metrics, relayer_routes
 from app.config import settings
 from app.routes import router
 from app.relayer_routes import router as relayer_router
@@ -63,4 +65,14 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Relayer metrics in Prometheus text format (every relayer worker's included)"""
+    client = relayer_routes.relayer_client
+    text = await client.metrics() if client else metrics.render()
+    return PlainTextResponse(
+        text, media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
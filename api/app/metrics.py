@@ -0,0 +1,300 @@
+"""
+Relayer metrics in Prometheus text format
+Lightweight counters, gauges and histograms: recording is a dict lookup and
+a couple of additions, and gauges that mirror existing state (transfers per
+status, in-flight transactions) are read only when /metrics is scraped.
+"""
+
+import math
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+
+Labels = Tuple[str, ...]
+
+# Seconds; covers sub-second RPC calls up to multi-minute attestations
+DEFAULT_BUCKETS = (
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    20,
+    30,
+    60,
+    120,
+    300,
+    600,
+    1800,
+)
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Labels, extra: str = "") -> str:
+    pairs = [
+        f'{name}="{_escape(value)}"' for name, value in zip(names, values, strict=True)
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def endpoint_label(url: str) -> str:
+    """Host of an RPC URL, without paths or credentials that may hold API keys"""
+    return urlparse(url).hostname or url
+
+
+class Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        header = (
+            f"# HELP {self.name} {self.documentation}\n"
+            f"# TYPE {self.name} {self.type_name}\n"
+        )
+        return header + "".join(line + "\n" for line in self.samples())
+
+
+class Counter(Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} "
+            f"{_format_value(value)}"
+            for labels, value in self._values.items()
+        ]
+
+
+class Gauge(Metric):
+    """Gauge set directly, or computed at scrape time by ``set_function``"""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Labels, float] = {}
+        self._function: Optional[Callable[[], Dict[Labels, float]]] = None
+
+    def set(self, value: float, *labels: str):
+        self._values[labels] = value
+
+    def set_function(self, function: Optional[Callable[[], Dict[Labels, float]]]):
+        """Compute values from ``function`` (label tuple -> value) on each scrape"""
+        self._function = function
+
+    def samples(self) -> List[str]:
+        values = dict(self._values)
+        if self._function is not None:
+            values.update(self._function())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} "
+            f"{_format_value(value)}"
+            for labels, value in values.items()
+        ]
+
+
+class Histogram(Metric):
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (non-cumulative, +Inf last), sum]
+        self._series: Dict[Labels, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *labels: str):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1][0] += value
+
+    def samples(self) -> List[str]:
+        lines = []
+        for labels, (counts, total) in self._series.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts, strict=True):
+                cumulative += count
+                le = f'le="{_format_value(float(bound))}"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} "
+                    f"{cumulative}"
+                )
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total[0])}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "".join(metric.render() for metric in self.metrics)
+
+
+REGISTRY = Registry()
+
+# Transfer lifecycle, per route ("<source chain>-><dest chain>")
+ATTESTATION_SECONDS = REGISTRY.register(
+    Histogram(
+        "relayer_attestation_seconds",
+        "Time from transfer creation to attestation",
+        ["route"],
+    )
+)
+SUBMIT_SECONDS = REGISTRY.register(
+    Histogram(
+        "relayer_submit_seconds",
+        "Time from attestation to the completion transaction being sent",
+        ["route"],
+    )
+)
+CONFIRM_SECONDS = REGISTRY.register(
+    Histogram(
+        "relayer_confirm_seconds",
+        "Time from sending the completion transaction to its receipt",
+        ["route"],
+    )
+)
+TRANSFER_SECONDS = REGISTRY.register(
+    Histogram(
+        "relayer_transfer_seconds",
+        "End-to-end time from transfer creation to completion",
+        ["route"],
+    )
+)
+
+# State, read at scrape time
+TRANSFERS = REGISTRY.register(
+    Gauge("relayer_transfers", "Live (not archived) transfers by status", ["status"])
+)
+INFLIGHT_TRANSACTIONS = REGISTRY.register(
+    Gauge(
+        "relayer_inflight_transactions",
+        "Relayer transactions sent and not yet mined, by chain",
+        ["chain"],
+    )
+)
+QUEUE_DEPTH = REGISTRY.register(
+    Gauge("relayer_queue_depth", "Work waiting in relayer queues", ["queue"])
+)
+
+TX_REPLACEMENTS = REGISTRY.register(
+    Counter(
+        "relayer_tx_replacements_total",
+        "Stuck relayer transactions re-sent with higher fees, by chain",
+        ["chain"],
+    )
+)
+
+# Dependencies
+RPC_REQUEST_SECONDS = REGISTRY.register(
+    Histogram(
+        "relayer_rpc_request_seconds",
+        "JSON-RPC call latency by chain and endpoint host",
+        ["chain", "endpoint"],
+        REQUEST_BUCKETS,
+    )
+)
+RPC_ERRORS = REGISTRY.register(
+    Counter(
+        "relayer_rpc_errors_total",
+        "Failed JSON-RPC calls by chain and endpoint host",
+        ["chain", "endpoint"],
+    )
+)
+IRIS_REQUEST_SECONDS = REGISTRY.register(
+    Histogram(
+        "relayer_iris_request_seconds",
+        "Circle Iris API request latency by outcome",
+        ["outcome"],
+        REQUEST_BUCKETS,
+    )
+)
+
+
+def render() -> str:
+    """All metrics in Prometheus text exposition format (version 0.0.4)"""
+    return REGISTRY.render()
+
+
+def _with_labels(line: str, extra: str) -> str:
+    """A sample line with ``extra`` (rendered label pairs) added to its labels"""
+    if not extra:
+        return line
+    name_end = min(i for i in (line.find("{"), line.find(" ")) if i >= 0)
+    if line[name_end] == "{":
+        close = line.rfind("}")
+        return f"{line[:close]},{extra}{line[close:]}"
+    return f"{line[:name_end]}{{{extra}}}{line[name_end:]}"
+
+
+def merge(sources: Sequence[Tuple[Dict[str, str], str]]) -> str:
+    """Combine expositions from several processes into one
+
+    Each source is (labels, text): ``labels`` (e.g. the worker id) are added
+    to every sample of ``text``, and each metric keeps a single HELP/TYPE
+    header with the samples of all sources under it.
+    """
+    headers: Dict[str, Dict[str, str]] = {}
+    samples: Dict[str, List[str]] = {}
+    for labels, text in sources:
+        extra = ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+        family = None
+        for line in text.splitlines():
+            if line.startswith("# "):
+                _, kind, family, _ = line.split(" ", 3)
+                headers.setdefault(family, {}).setdefault(kind, line)
+                samples.setdefault(family, [])
+            elif line and family is not None:
+                samples[family].append(_with_labels(line, extra))
+    return "".join(
+        "".join(header[kind] + "\n" for kind in ("HELP", "TYPE") if kind in header)
+        + "".join(line + "\n" for line in samples[family])
+        for family, header in headers.items()
+    )
@@ -0,0 +1,160 @@
+"""
+Local nonce allocation for relayer transactions
+Syncs once from the chain and then hands out nonces without an RPC round-trip,
+so many receiveMessage transactions can be pipelined per destination chain
+"""
+
+import asyncio
+import heapq
+import logging
+import time
+from typing import Awaitable, Callable, Collection, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Error fragments returned by geth, erigon, nethermind and the L2 sequencers
+NONCE_TOO_LOW_ERRORS = ("nonce too low", "nonce is too low", "oldnonce")
+
+
+def is_nonce_too_low(error: Exception) -> bool:
+    """Whether a send failed because the nonce was already consumed on chain"""
+    message = str(error).lower()
+    return any(fragment in message for fragment in NONCE_TOO_LOW_ERRORS)
+
+
+class NonceManager:
+    """Per-chain, per-signer nonce allocator
+
+    Nonces that were allocated but never broadcast are ``release``d and handed
+    out again before fresh ones, so a failed send does not leave a gap that
+    stalls every later transaction. ``find_gaps`` reports released nonces that
+    nobody reused and broadcast transactions the node has dropped, so the
+    caller can fill them.
+    """
+
+    def __init__(self, chain: str, fetch_nonce: Callable[[str], Awaitable[int]]):
+        """
+        Args:
+            chain: Chain name (for logging)
+            fetch_nonce: Coroutine returning the signer's transaction count
+                for a block identifier ("pending" or "latest")
+        """
+        self.chain = chain
+        self._fetch_nonce = fetch_nonce
+        self._next: Optional[int] = None
+        self._released: List[int] = []
+        self._released_at: Dict[int, float] = {}
+        self._sent_at: Dict[int, float] = {}
+        self._lock = asyncio.Lock()
+
+    @property
+    def synced(self) -> bool:
+        return self._next is not None
+
+    @property
+    def in_flight(self) -> int:
+        """Broadcast transactions that have not been mined yet"""
+        return len(self._sent_at)
+
+    async def allocate(self) -> int:
+        """Hand out the lowest free nonce, syncing from the chain on first use"""
+        async with self._lock:
+            if self._next is None:
+                await self._sync()
+            if self._released:
+                nonce = heapq.heappop(self._released)
+                self._released_at.pop(nonce, None)
+                return nonce
+            nonce = self._next
+            self._next += 1
+            return nonce
+
+    def release(self, nonce: int):
+        """Return a nonce whose transaction was never broadcast"""
+        if self._next is None or nonce >= self._next or nonce in self._released_at:
+            return
+        heapq.heappush(self._released, nonce)
+        self._released_at[nonce] = time.time()
+
+    def mark_sent(self, nonce: int):
+        """Record that a transaction with ``nonce`` was accepted by the node"""
+        self._sent_at[nonce] = time.time()
+
+    def mark_mined(self, nonce: int):
+        """Record that the transaction with ``nonce`` was included in a block"""
+        self._sent_at.pop(nonce, None)
+
+    async def resync(self):
+        """Re-read the chain's pending count (e.g. after "nonce too low")"""
+        async with self._lock:
+            await self._sync()
+
+    async def find_gaps(
+        self, stale_after: float, owned: Collection[int] = ()
+    ) -> List[int]:
+        """Nonces that must be filled before later transactions can be mined
+
+        A gap is a released nonce nobody reused within ``stale_after`` seconds
+        while higher nonces wait behind it, or the chain's next expected nonce
+        when our transaction for it was broadcast more than ``stale_after``
+        seconds ago and the node has since dropped it - unless it is in
+        ``owned``, nonces whose transactions are still being confirmed (and
+        rebroadcast if dropped) elsewhere. Returned nonces are reserved for
+        the caller, which must ``mark_sent`` or ``release`` each.
+        """
+        if self._next is None or (not self._released and not self._sent_at):
+            return []
+
+        chain_pending = await self._fetch_nonce("pending")
+        cutoff = time.time() - stale_after
+        gaps: List[int] = []
+
+        async with self._lock:
+            for nonce in [n for n in self._released_at if n < chain_pending]:
+                # Consumed on chain in the meantime; nothing to fill
+                self._drop_released(nonce)
+            for nonce in [
+                n for n, t in self._sent_at.items() if n < chain_pending and t <= cutoff
+            ]:
+                # Known to the node for a while; no longer a gap candidate
+                del self._sent_at[nonce]
+
+            highest_sent = max(self._sent_at, default=-1)
+            for nonce, released_at in list(self._released_at.items()):
+                if released_at <= cutoff and nonce < highest_sent:
+                    self._drop_released(nonce)
+                    gaps.append(nonce)
+
+            sent_at = self._sent_at.get(chain_pending)
+            if sent_at is not None and sent_at <= cutoff and chain_pending not in owned:
+                del self._sent_at[chain_pending]
+                gaps.append(chain_pending)
+
+        if gaps:
+            gaps.sort()
+            logger.warning(
+                f"Nonce gaps on {self.chain}: {gaps} (chain pending: {chain_pending}, "
+                f"local next: {self._next})"
+            )
+        return gaps
+
+    async def _sync(self):
+        chain_pending = await self._fetch_nonce("pending")
+        if self._next is None:
+            self._next = chain_pending
+        elif chain_pending > self._next:
+            # Nonces were consumed outside this process; skip past them. A lower
+            # chain count is not trusted here since our own sends may still be
+            # propagating - find_gaps handles transactions that were dropped.
+            logger.warning(
+                f"Nonce resync on {self.chain}: local {self._next} -> chain "
+                f"{chain_pending}"
+            )
+            self._next = chain_pending
+        for nonce in [n for n in self._released_at if n < chain_pending]:
+            self._drop_released(nonce)
+
+    def _drop_released(self, nonce: int):
+        self._released_at.pop(nonce, None)
+        self._released = [n for n in self._released if n != nonce]
+        heapq.heapify(self._released)
@@ -0,0 +1,134 @@
+"""
+Deadline scheduler for Circle attestation polling
+Keeps each transfer's next poll time in a min-heap so the monitor loop only
+touches transfers that are actually due
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+class PollScheduler:
+    """Priority queue of poll deadlines with per-transfer backoff
+
+    Transfers are polled every ``initial_delay`` seconds for the first
+    ``fast_attempts`` polls (v2 fast transfers attest within seconds), after
+    which the interval grows by ``backoff_factor`` up to ``max_delay`` so
+    standard-finality transfers do not hammer the Iris API.
+    """
+
+    def __init__(
+        self,
+        initial_delay: float = 1.0,
+        max_delay: float = 30.0,
+        backoff_factor: float = 1.5,
+        fast_attempts: int = 10,
+    ):
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.backoff_factor = backoff_factor
+        self.fast_attempts = fast_attempts
+
+        self._heap: List[Tuple[float, int, str]] = []
+        self._deadlines: Dict[str, float] = {}
+        self._attempts: Dict[str, int] = {}
+        self._counter = itertools.count()
+        self._wakeup = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._deadlines
+
+    def backoff_delay(self, attempts: int) -> float:
+        """Delay before the next poll after ``attempts`` unsuccessful polls"""
+        if attempts < self.fast_attempts:
+            return self.initial_delay
+        exponent = attempts - self.fast_attempts + 1
+        return min(self.initial_delay * self.backoff_factor**exponent, self.max_delay)
+
+    def schedule(self, key: str, delay: Optional[float] = None) -> float:
+        """Schedule (or reschedule) a poll for ``key``; returns the deadline"""
+        if delay is None:
+            delay = self.backoff_delay(self._attempts.get(key, 0))
+        deadline = time.time() + delay
+        self._push(key, deadline)
+        return deadline
+
+    def schedule_at(self, key: str, deadline: float):
+        """Schedule a poll for ``key`` at an absolute wall-clock deadline"""
+        self._push(key, deadline)
+
+    def reschedule(self, key: str) -> float:
+        """Record an unsuccessful poll and schedule the next one with backoff"""
+        self._attempts[key] = self._attempts.get(key, 0) + 1
+        return self.schedule(key)
+
+    def discard(self, key: str):
+        """Stop polling ``key``; stale heap entries are skipped lazily"""
+        self._deadlines.pop(key, None)
+        self._attempts.pop(key, None)
+
+    def attempts(self, key: str) -> int:
+        return self._attempts.get(key, 0)
+
+    def pop_due(self, limit: int, now: Optional[float] = None) -> List[str]:
+        """Pop up to ``limit`` keys whose deadline has passed, earliest first"""
+        if now is None:
+            now = time.time()
+        due: List[str] = []
+        while self._heap and len(due) < limit:
+            deadline, _, key = self._heap[0]
+            if self._deadlines.get(key) != deadline:
+                heapq.heappop(self._heap)
+                continue
+            if deadline > now:
+                break
+            heapq.heappop(self._heap)
+            del self._deadlines[key]
+            due.append(key)
+        return due
+
+    def time_until_next(self, now: Optional[float] = None) -> Optional[float]:
+        """Seconds until the earliest live deadline, or None if nothing is scheduled"""
+        while self._heap:
+            deadline, _, key = self._heap[0]
+            if self._deadlines.get(key) == deadline:
+                if now is None:
+                    now = time.time()
+                return max(0.0, deadline - now)
+            heapq.heappop(self._heap)
+        return None
+
+    def wake(self):
+        """Interrupt a pending ``wait`` (new work or a free poll slot)"""
+        self._wakeup.set()
+
+    async def wait(self, max_wait: float, slots_free: bool = True):
+        """Sleep until the next deadline, a wakeup, or ``max_wait`` seconds
+
+        When the caller has no free poll slots, due deadlines cannot be acted
+        on, so only a wakeup (a poll finishing) or ``max_wait`` ends the wait.
+        """
+        timeout = self.time_until_next() if slots_free else None
+        if timeout is None or timeout > max_wait:
+            timeout = max_wait
+        if timeout > 0:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        else:
+            await asyncio.sleep(0)
+        self._wakeup.clear()
+
+    def _push(self, key: str, deadline: float):
+        previous = self._deadlines.get(key)
+        self._deadlines[key] = deadline
+        heapq.heappush(self._heap, (deadline, next(self._counter), key))
+        if previous is None or deadline < previous:
+            self._wakeup.set()
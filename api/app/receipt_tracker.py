@@ -0,0 +1,215 @@
+"""
+Shared receipt polling per chain
+One loop per chain checks the head block and, only when a new block arrives,
+looks up receipts for every transaction anyone is waiting on - as one JSON-RPC
+batch, or one eth_getBlockReceipts per new block when many are pending - so
+RPC load follows the block rate rather than the number of transactions in
+flight. With more than one confirmation required, receipts are re-fetched
+once deep enough, so one a reorg dropped or moved is never returned.
+"""
+
+import asyncio
+import logging
+from typing import Dict, Iterable, List, Optional, Sequence, Set
+
+from hexbytes import HexBytes
+from web3 import AsyncWeb3
+from web3._utils.method_formatters import receipt_formatter
+from web3.exceptions import TransactionNotFound
+
+logger = logging.getLogger(__name__)
+
+
+class _Waiter:
+    def __init__(self, hashes: Sequence[bytes], future: asyncio.Future):
+        # The caller's list: versions appended while waiting are picked up
+        self.hashes = hashes
+        self.future = future
+
+
+class ReceiptTracker:
+    """Resolves receipt waits for one chain from a single polling loop"""
+
+    def __init__(
+        self,
+        chain: str,
+        web3: AsyncWeb3,
+        confirmations: int = 1,
+        poll_interval: float = 1.0,
+        block_receipts_threshold: int = 20,
+        max_block_span: int = 5,
+    ):
+        """
+        Args:
+            chain: Chain name (for logging)
+            web3: Client for the chain
+            confirmations: Blocks, counting the one holding the transaction,
+                before a receipt is returned
+            poll_interval: Seconds between head block checks
+            block_receipts_threshold: Pending transactions from which new
+                blocks are read whole with eth_getBlockReceipts instead of
+                looking up each hash
+            max_block_span: Most new blocks read with eth_getBlockReceipts in
+                one round; after a longer gap each hash is looked up
+        """
+        self.chain = chain
+        self.web3 = web3
+        self.confirmations = max(1, confirmations)
+        self.poll_interval = poll_interval
+        self.block_receipts_threshold = block_receipts_threshold
+        self.max_block_span = max_block_span
+        # Cleared if the node does not serve eth_getBlockReceipts
+        self.block_receipts = True
+        self._head: Optional[int] = None
+        self._waiters: Set[_Waiter] = set()
+        # Mined receipts still short of the confirmation depth, by hash
+        self._found: Dict[bytes, Dict] = {}
+        # Hashes looked up individually at least once (later ones are found
+        # by scanning new blocks)
+        self._checked: Set[bytes] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._waiters)
+
+    async def wait(self, hashes: Sequence[bytes], timeout: Optional[float] = None):
+        """Receipt of whichever of ``hashes`` is mined first (None after ``timeout``)"""
+        waiter = _Waiter(hashes, asyncio.get_running_loop().create_future())
+        self._waiters.add(waiter)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        try:
+            done, _ = await asyncio.wait({waiter.future}, timeout=timeout)
+            return waiter.future.result() if done else None
+        finally:
+            self._waiters.discard(waiter)
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        while self._waiters:
+            try:
+                await self._poll()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Receipt polling on {self.chain} failed: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    async def _poll(self):
+        head = await self.web3.eth.block_number
+        tracked = {
+            bytes(HexBytes(h)) for waiter in self._waiters for h in waiter.hashes
+        }
+        fresh = tracked - self._checked
+        previous, self._head = self._head, head
+        new_blocks = range(previous + 1, head + 1) if previous is not None else range(0)
+
+        if new_blocks or fresh:
+            unknown = tracked - self._found.keys()
+            if (
+                self.block_receipts
+                and 0 < len(new_blocks) <= self.max_block_span
+                and len(unknown - fresh) >= self.block_receipts_threshold
+            ):
+                found = await self._from_blocks(new_blocks, unknown)
+                if found is not None:
+                    self._found.update(found)
+                    unknown = fresh - found.keys()
+            elif not new_blocks:
+                unknown = fresh - self._found.keys()
+            self._found.update(await self._lookup(unknown))
+            self._checked = tracked
+        self._found = {h: r for h, r in self._found.items() if h in tracked}
+        if self.confirmations > 1:
+            await self._recheck(head)
+
+        for waiter in list(self._waiters):
+            for tx_hash in waiter.hashes:
+                receipt = self._found.get(bytes(HexBytes(tx_hash)))
+                if (
+                    receipt is not None
+                    and head - receipt["blockNumber"] + 1 >= self.confirmations
+                ):
+                    if not waiter.future.done():
+                        waiter.future.set_result(receipt)
+                    break
+
+    async def _recheck(self, head: int):
+        """Re-fetch receipts reaching the confirmation depth, dropping any a
+        reorg removed so they are looked up again rather than returned"""
+        deep = [
+            h
+            for h, r in self._found.items()
+            if head - r["blockNumber"] + 1 >= self.confirmations
+        ]
+        if not deep:
+            return
+        current = await self._lookup(deep)
+        for tx_hash in deep:
+            receipt = current.get(tx_hash)
+            if (
+                receipt is not None
+                and receipt["blockHash"] == self._found[tx_hash]["blockHash"]
+            ):
+                continue
+            if receipt is not None:
+                logger.info(
+                    f"Transaction {tx_hash.hex()} on {self.chain} moved to block "
+                    f"{receipt['blockNumber']} by a reorg"
+                )
+                self._found[tx_hash] = receipt
+            else:
+                logger.info(
+                    f"Receipt of {tx_hash.hex()} on {self.chain} is gone, looking it "
+                    "up again"
+                )
+                del self._found[tx_hash]
+                self._checked.discard(tx_hash)
+
+    async def _lookup(self, hashes: Iterable[bytes]) -> Dict[bytes, Dict]:
+        """Receipts by hash, fetched concurrently (one batch through the RPC pool)"""
+        hashes = list(hashes)
+        results = await asyncio.gather(
+            *(self.web3.eth.get_transaction_receipt(tx_hash) for tx_hash in hashes),
+            return_exceptions=True,
+        )
+        found = {}
+        for tx_hash, result in zip(hashes, results, strict=True):
+            if isinstance(result, TransactionNotFound) or result is None:
+                continue
+            if isinstance(result, Exception):
+                logger.debug(f"Receipt lookup on {self.chain} failed: {result}")
+                continue
+            found[tx_hash] = result
+        return found
+
+    async def _from_blocks(
+        self, blocks: range, hashes: Set[bytes]
+    ) -> Optional[Dict[bytes, Dict]]:
+        """Receipts of ``hashes`` in ``blocks``; None without eth_getBlockReceipts"""
+        responses: List[Dict] = await asyncio.gather(
+            *(
+                self.web3.provider.make_request("eth_getBlockReceipts", [hex(block)])
+                for block in blocks
+            )
+        )
+        found = {}
+        for response in responses:
+            if "error" in response:
+                logger.info(
+                    f"eth_getBlockReceipts unavailable on {self.chain}, looking up "
+                    "receipts by hash"
+                )
+                self.block_receipts = False
+                return None
+            for raw in response.get("result") or []:
+                tx_hash = bytes(HexBytes(raw["transactionHash"]))
+                if tx_hash in hashes:
+                    found[tx_hash] = receipt_formatter(raw)
+        return found
@@ -0,0 +1,292 @@
+"""
+Relayer access for API processes
+The relayer runs as its own worker process (run_relayer.py), which owns the
+polling and completion loops and the signing keys. API processes hold no
+relayer state: RedisRelayerClient queues new transfers on the destination
+shard's inbox in Redis and reads status from the shared transfer rows, the
+transfer store and the counters the workers keep, so the API can run any
+number of uvicorn workers. The transfer store is the workers' database
+(RELAYER_DATABASE_URL), opened read-only; without it only the Redis rows are
+served. LocalRelayerClient serves the same calls from a relayer running
+inside the API process (RELAYER_EMBEDDED, for development).
+"""
+
+import logging
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from app import metrics
+from app.cctp_relayer import CCTPRelayer, CCTPTransfer, TransferStatus, transfer_key
+from app.config import settings
+from app.relayer_shards import SharedTransferState, create_shared_state
+from app.status_stream import TERMINAL_STATUSES
+from app.transfer_registry import SortKey, utc_datetime, utc_timestamp
+from app.transfer_store import TransferStore
+
+logger = logging.getLogger(__name__)
+
+
+class RelayerUnavailableError(Exception):
+    """The request needs something this deployment does not have"""
+
+
+class RelayerClient(ABC):
+    """What the API needs from the relayer"""
+
+    @abstractmethod
+    async def start(self):
+        """Connect (and start the relayer, if it runs in this process)"""
+
+    @abstractmethod
+    async def stop(self):
+        """Release connections (and stop an in-process relayer)"""
+
+    @abstractmethod
+    async def add_transfer(
+        self, tx_hash: str, source_chain: str, dest_chain: str
+    ) -> Optional[Dict]:
+        """Monitor a transfer; returns its current status"""
+
+    @abstractmethod
+    async def lookup_transfer_status(self, tx_hash: str) -> Optional[Dict]:
+        """Status by key (tx hash, or "<tx hash>:<index>" for later messages)"""
+
+    @abstractmethod
+    async def list_transfers(
+        self, limit: int = 50, cursor: Optional[SortKey] = None, **filters
+    ) -> Tuple[List[Dict], Optional[SortKey]]:
+        """One page of transfers, newest first (see CCTPRelayer.list_transfers)"""
+
+    @abstractmethod
+    async def get_stats(self) -> Dict:
+        """Transfer counts per status and total volume"""
+
+    @abstractmethod
+    async def health(self) -> Dict:
+        """Relayer health (see CCTPRelayer.health)"""
+
+    @abstractmethod
+    async def metrics(self) -> str:
+        """Relayer metrics in Prometheus text format"""
+
+
+class LocalRelayerClient(RelayerClient):
+    """A relayer running in this process"""
+
+    def __init__(self, relayer: CCTPRelayer):
+        self.relayer = relayer
+
+    async def start(self):
+        await self.relayer.start()
+
+    async def stop(self):
+        await self.relayer.stop()
+
+    async def add_transfer(
+        self, tx_hash: str, source_chain: str, dest_chain: str
+    ) -> Optional[Dict]:
+        await self.relayer.add_transfer(tx_hash, source_chain, dest_chain)
+        return await self.relayer.lookup_transfer_status(tx_hash)
+
+    async def lookup_transfer_status(self, tx_hash: str) -> Optional[Dict]:
+        return await self.relayer.lookup_transfer_status(tx_hash)
+
+    async def list_transfers(
+        self, limit: int = 50, cursor: Optional[SortKey] = None, **filters
+    ) -> Tuple[List[Dict], Optional[SortKey]]:
+        return await self.relayer.list_transfers(limit=limit, cursor=cursor, **filters)
+
+    async def get_stats(self) -> Dict:
+        return {
+            **self.relayer.get_stats(),
+            "relayer_address": self.relayer.account.address,
+            "network": self.relayer.network,
+        }
+
+    async def health(self) -> Dict:
+        return {"status": "healthy", "mode": "embedded", **self.relayer.health()}
+
+    async def metrics(self) -> str:
+        return metrics.render()
+
+
+class RedisRelayerClient(RelayerClient):
+    """Relayer workers reached through Redis, with history from the transfer store"""
+
+    def __init__(
+        self, shared: SharedTransferState, store: Optional[TransferStore] = None
+    ):
+        """
+        Args:
+            shared: Shared transfer state of the workers (its leases are never started)
+            store: Read-only transfer store the workers write to, for history
+                past the Redis rows' TTL and for listing; listing is
+                unavailable without it
+        """
+        self.shared = shared
+        self.store = store
+
+    async def start(self):
+        if self.store:
+            await self.store.start()
+
+    async def stop(self):
+        if self.store:
+            await self.store.stop()
+        await self.shared.redis.aclose()
+
+    async def add_transfer(
+        self, tx_hash: str, source_chain: str, dest_chain: str
+    ) -> Optional[Dict]:
+        source_domain = CCTPRelayer.DOMAINS.get(source_chain)
+        dest_domain = CCTPRelayer.DOMAINS.get(dest_chain)
+        if source_domain is None or dest_domain is None:
+            raise ValueError(f"Invalid chain names: {source_chain} -> {dest_chain}")
+
+        status = await self.lookup_transfer_status(tx_hash)
+        if status:
+            return status
+        transfer = CCTPTransfer(
+            tx_hash=tx_hash,
+            source_domain=source_domain,
+            dest_domain=dest_domain,
+            amount=0,
+            recipient="",
+            status=TransferStatus.PENDING,
+        )
+        if await self.shared.submit(transfer, str(dest_domain)):
+            logger.info(f"Queued transfer {tx_hash} for shard {dest_domain}")
+            return CCTPRelayer._transfer_status(transfer)
+        # Submitted concurrently through another API process
+        return await self.lookup_transfer_status(tx_hash)
+
+    async def lookup_transfer_status(self, tx_hash: str) -> Optional[Dict]:
+        row = await self.shared.get(tx_hash)
+        if row is None and self.store:
+            source_tx, _, index = tx_hash.partition(":")
+            row = await self.store.get(source_tx, int(index) if index.isdigit() else 0)
+        return (
+            CCTPRelayer._transfer_status(CCTPRelayer._transfer_from_row(row))
+            if row
+            else None
+        )
+
+    async def list_transfers(
+        self,
+        limit: int = 50,
+        cursor: Optional[SortKey] = None,
+        status: Optional[str] = None,
+        source_domain: Optional[int] = None,
+        dest_domain: Optional[int] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> Tuple[List[Dict], Optional[SortKey]]:
+        if not self.store:
+            raise RelayerUnavailableError(
+                "Listing transfers needs RELAYER_DATABASE_URL"
+            )
+        before = (utc_datetime(cursor[0]), cursor[1], cursor[2]) if cursor else None
+        rows = await self.store.page(
+            before,
+            limit,
+            status=status,
+            source_domain=source_domain,
+            dest_domain=dest_domain,
+            since=since,
+            until=until,
+        )
+        # Rows are written behind: unfinished ones may be newer in Redis
+        live = [
+            transfer_key(row["tx_hash"], row["message_index"])
+            for row in rows
+            if row["status"] not in TERMINAL_STATUSES
+        ]
+        latest = {
+            transfer_key(row["tx_hash"], row["message_index"]): row
+            for row in await self.shared.get_many(live)
+            if row
+        }
+        page = []
+        for row in rows:
+            row = latest.get(transfer_key(row["tx_hash"], row["message_index"]), row)
+            if status is None or row["status"] == status:
+                page.append(
+                    CCTPRelayer._transfer_status(CCTPRelayer._transfer_from_row(row))
+                )
+        if len(rows) < limit:
+            return page, None
+        last = rows[-1]
+        return page, (
+            utc_timestamp(last["created_at"]),
+            last["tx_hash"],
+            last["message_index"],
+        )
+
+    async def get_stats(self) -> Dict:
+        """Counts across every worker, maintained in Redis as rows are written"""
+        counts = await self.shared.stats()
+        totals = {
+            status.value: max(0, counts.get(status.value, 0))
+            for status in TransferStatus
+        }
+        return {
+            "total_transfers": sum(totals.values()),
+            **totals,
+            "total_volume_usdc": counts.get("volume", 0) / 10**6,
+            "relayer_address": None,
+            "network": None,
+        }
+
+    async def health(self) -> Dict:
+        leases = self.shared.leases
+        workers = await leases.workers()
+        reports = await self.shared.reports(workers)
+        return {
+            "status": "healthy" if workers else "no_workers",
+            "mode": "worker",
+            # Each live worker's latest report (see CCTPRelayer.health), at
+            # most REPORT_INTERVAL seconds old; None until its first one
+            "workers": {
+                worker: reports.get(worker, {}).get("health") for worker in workers
+            },
+            # Worker holding each shard (destination domain)
+            "shards": await leases.holders(),
+        }
+
+    async def metrics(self) -> str:
+        """This process's metrics and each live worker's latest, labelled by worker"""
+        reports = await self.shared.reports(await self.shared.leases.workers())
+        return metrics.merge(
+            [
+                ({}, metrics.render()),
+                *(
+                    ({"worker": worker}, report["metrics"])
+                    for worker, report in reports.items()
+                ),
+            ]
+        )
+
+
+def create_relayer_client() -> Optional[RedisRelayerClient]:
+    """Client for relayer workers sharing RELAYER_REDIS_URL, if set
+
+    The transfer store is only used when RELAYER_DATABASE_URL is set
+    explicitly: its default is a SQLite file on this host, not the workers'
+    database.
+    """
+    shared = create_shared_state(CCTPRelayer.DOMAINS.values())
+    if shared is None:
+        return None
+    if (
+        "RELAYER_DATABASE_URL" not in settings.model_fields_set
+        or not settings.RELAYER_DATABASE_URL
+    ):
+        logger.warning(
+            "⚠️ RELAYER_DATABASE_URL not set - serving transfer status from Redis only "
+            "(no listing, and finished transfers are forgotten once their rows expire)"
+        )
+        return RedisRelayerClient(shared)
+    return RedisRelayerClient(
+        shared, TransferStore(settings.RELAYER_DATABASE_URL, read_only=True)
+    )
@@ -2,13 +2,39 @@
 API routes for CCTP attestation relayer
 """
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import (
+    APIRouter,
+    HTTPException,
+    BackgroundTasks,
+    Query,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, List
+from datetime import datetime, timezone
+from typing import Dict, Optional, List
+import asyncio
+import base64
+import binascii
+import json
 import logging
 import os
 
+from app.burn_scanner import BurnScanner, load_scan_targets
 from app.cctp_relayer import get_relayer, CCTPRelayer
+from app.chain_clients import get_chain_clients
+from app.config import settings
+from app.relayer_client import (
+    LocalRelayerClient,
+    RelayerClient,
+    RelayerUnavailableError,
+    create_relayer_client,
+)
+from app.relayer_shards import create_shared_state
+from app.signer_pool import signer_keys_from_env
+from app.status_stream import TERMINAL_STATUSES, StatusStream, create_status_stream
+from app.transfer_store import TransferStore
 
 logger = logging.getLogger(__name__)
 
@@ -23,46 +49,113 @@ class TransferRequest(BaseModel):
 class TransferResponse(BaseModel):
     """Transfer status response"""
     tx_hash: str
+    message_index: int = 0
     status: str
     source_domain: int
     dest_domain: int
     amount: float
     recipient: Optional[str]
-    event_nonce: Optional[int]
+    event_nonce: Optional[str]
     created_at: str
     completed_at: Optional[str]
     has_attestation: bool
+    completion_tx_hash: Optional[str] = None
 
-# Initialize relayer on startup
+class TransferPage(BaseModel):
+    """One page of transfers, newest first"""
+
+    transfers: List[TransferResponse]
+    # Pass as ?cursor= for the next page; null after the last one
+    next_cursor: Optional[str] = None
+
+
+# Seconds between keep-alives on idle status streams
+STREAM_HEARTBEAT = 15
+
+# Most transfers one WebSocket client may follow at once
+MAX_WS_SUBSCRIPTIONS = 100
+
+# Relayer workers reached through Redis, or an embedded relayer
+relayer_client: Optional[RelayerClient] = None
+# Only set when the relayer runs inside this process (RELAYER_EMBEDDED)
 relayer: Optional[CCTPRelayer] = None
+status_stream: Optional[StatusStream] = None
 
 async def init_relayer():
-    """Initialize the relayer service"""
-    global relayer
+    """Connect to the relayer workers (or start the embedded relayer)"""
+    global relayer, relayer_client, status_stream
+
+    status_stream = create_status_stream()
+
+    if not settings.RELAYER_EMBEDDED:
+        # The relayer runs in its own process (run_relayer.py); this process
+        # only queues transfers and reads status, so it can be scaled freely
+        relayer_client = create_relayer_client()
+        if relayer_client is None:
+            logger.warning(
+                "RELAYER_REDIS_URL not set - relayer endpoints are unavailable (set "
+                "it to reach the relayer worker, or RELAYER_EMBEDDED=true)"
+            )
+        else:
+            await relayer_client.start()
+            logger.info("Relaying through relayer workers on RELAYER_REDIS_URL")
+        # Status published by relayer workers through Redis can still be streamed
+        await status_stream.start()
+        return
     
     # Get private key from environment
     private_key = os.getenv("RELAYER_PRIVATE_KEY")
     if not private_key:
         logger.warning("RELAYER_PRIVATE_KEY not set - relayer will not be initialized")
+        await status_stream.start()
         return
     
     try:
-        relayer = get_relayer(private_key)
-        await relayer.start()
-        logger.info("CCTP Relayer initialized and started")
+        store = (
+            TransferStore(settings.RELAYER_DATABASE_URL)
+            if settings.RELAYER_DATABASE_URL
+            else None
+        )
+        burn_scanner = None
+        if settings.RELAYER_DEPLOYMENTS_PATH:
+            burn_scanner = BurnScanner(
+                load_scan_targets(
+                    settings.RELAYER_DEPLOYMENTS_PATH, network=settings.RELAYER_NETWORK
+                ),
+                store=store,
+            )
+        relayer = get_relayer(
+            private_key,
+            network=settings.RELAYER_NETWORK,
+            batch_relayers=settings.batch_relayers(),
+            store=store,
+            burn_scanner=burn_scanner,
+            chain_clients=get_chain_clients(),
+            shared_state=create_shared_state(CCTPRelayer.DOMAINS.values()),
+            signer_keys=signer_keys_from_env(),
+            status_stream=status_stream,
+        )
+        relayer_client = LocalRelayerClient(relayer)
+        await relayer_client.start()
+        logger.warning(
+            "CCTP Relayer running inside the API process (RELAYER_EMBEDDED) - run "
+            "a single API worker"
+        )
     except Exception as e:
         logger.error(f"Failed to initialize relayer: {e}")
 
 @router.on_event("startup")
 async def startup_event():
-    """Initialize relayer on API startup"""
+    """Connect to the relayer on API startup"""
     await init_relayer()
 
 @router.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on API shutdown"""
-    if relayer:
-        await relayer.stop()
+    if relayer_client:
+        await relayer_client.stop()
+    if status_stream and not relayer:
+        await status_stream.stop()
 
 @router.post("/monitor", response_model=TransferResponse)
 async def monitor_transfer(request: TransferRequest, background_tasks: BackgroundTasks):
@@ -74,74 +167,195 @@ async def monitor_transfer(request: TransferRequest, background_tasks: Backgroun
     2. Automatically submit the attestation to the destination chain
     3. Complete the transfer without manual intervention
     """
-    if not relayer:
+    if not relayer_client:
         raise HTTPException(status_code=503, detail="Relayer service not available")
     
     try:
-        # Add transfer to monitoring
-        transfer = await relayer.add_transfer(
+        # Add transfer to monitoring; returns its current status
+        status = await relayer_client.add_transfer(
             request.tx_hash,
             request.source_chain,
             request.dest_chain
         )
-        
-        # Return current status
-        status = relayer.get_transfer_status(request.tx_hash)
         if not status:
             raise HTTPException(status_code=404, detail="Transfer not found")
         
         return TransferResponse(**status)
-        
+
+    except HTTPException:
+        raise
     except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        raise HTTPException(status_code=400, detail=str(e)) from e
     except Exception as e:
         logger.error(f"Error monitoring transfer: {e}")
-        raise HTTPException(status_code=500, detail="Internal server error")
+        raise HTTPException(status_code=500, detail="Internal server error") from e
 
 @router.get("/status/{tx_hash}", response_model=TransferResponse)
 async def get_transfer_status(tx_hash: str):
     """Get the current status of a monitored transfer"""
-    if not relayer:
+    if not relayer_client:
         raise HTTPException(status_code=503, detail="Relayer service not available")
     
-    status = relayer.get_transfer_status(tx_hash)
+    status = await relayer_client.lookup_transfer_status(tx_hash)
     if not status:
         raise HTTPException(status_code=404, detail="Transfer not found")
     
     return TransferResponse(**status)
 
-@router.get("/transfers", response_model=List[TransferResponse])
-async def get_all_transfers():
-    """Get all monitored transfers"""
-    if not relayer:
+async def _current_status(tx_hash: str) -> Optional[Dict]:
+    return (
+        await relayer_client.lookup_transfer_status(tx_hash) if relayer_client else None
+    )
+
+
+@router.get("/stream/{tx_hash}")
+async def stream_transfer_status(tx_hash: str):
+    """
+    Stream status changes of a transfer as Server-Sent Events
+
+    The current status (if the transfer is known) is sent first, then every
+    transition as the relayer records it. The stream ends once the transfer
+    is completed or failed. Keys of later messages ("<tx hash>:<index>") are
+    accepted as for /status.
+    """
+    if not status_stream:
         raise HTTPException(status_code=503, detail="Relayer service not available")
-    
-    transfers = relayer.get_all_transfers()
-    return [TransferResponse(**t) for t in transfers]
+
+    source_tx, _, index = tx_hash.partition(":")
+    message_index = int(index) if index.isdigit() else 0
+
+    async def events():
+        # Subscribe before reading the current status so no transition is missed
+        with status_stream.subscribe(source_tx) as subscription:
+            status = await _current_status(tx_hash)
+            while True:
+                if status is None:
+                    yield ": keep-alive\n\n"
+                elif status["message_index"] == message_index:
+                    yield f"event: status\ndata: {json.dumps(status)}\n\n"
+                    if status["status"] in TERMINAL_STATUSES:
+                        return
+                status = await subscription.get(timeout=STREAM_HEARTBEAT)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/ws")
+async def stream_transfer_statuses(websocket: WebSocket):
+    """
+    Stream status changes of any number of transfers over one WebSocket
+
+    Clients send {"subscribe": "<tx hash>"} or {"unsubscribe": "<tx hash>"};
+    the server replies with the current status of a newly subscribed transfer
+    (if known) and then every status change of the transfers subscribed to.
+    """
+    await websocket.accept()
+    if not status_stream:
+        await websocket.close(code=1013, reason="Relayer service not available")
+        return
+
+    with status_stream.subscribe() as subscription:
+
+        async def send_statuses():
+            while True:
+                status = await subscription.get(timeout=STREAM_HEARTBEAT)
+                await websocket.send_json(
+                    status if status is not None else {"type": "ping"}
+                )
+
+        sender = asyncio.create_task(send_statuses())
+        try:
+            while True:
+                message = await websocket.receive_json()
+                if not isinstance(message, dict):
+                    continue
+                if message.get("subscribe"):
+                    tx_hash = str(message["subscribe"])
+                    if len(subscription.tx_hashes) >= MAX_WS_SUBSCRIPTIONS:
+                        await websocket.send_json(
+                            {"type": "error", "detail": "Too many subscriptions"}
+                        )
+                        continue
+                    subscription.add(tx_hash.partition(":")[0])
+                    status = await _current_status(tx_hash)
+                    if status:
+                        subscription.push(status)
+                elif message.get("unsubscribe"):
+                    subscription.remove(str(message["unsubscribe"]).partition(":")[0])
+        except (WebSocketDisconnect, ValueError):
+            pass
+        finally:
+            sender.cancel()
+
+
+def _encode_cursor(position) -> str:
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str):
+    try:
+        created_at, tx_hash, message_index = json.loads(
+            base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        )
+        return float(created_at), str(tx_hash), int(message_index)
+    except (binascii.Error, ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from e
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+@router.get("/transfers", response_model=TransferPage)
+async def get_all_transfers(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    source_domain: Optional[int] = None,
+    dest_domain: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+):
+    """
+    List monitored transfers, newest first, one page at a time
+
+    Filter by status, source/destination domain and creation time (since is
+    inclusive, until exclusive), and pass the returned next_cursor to get the
+    following page.
+    """
+    if not relayer_client:
+        raise HTTPException(status_code=503, detail="Relayer service not available")
+
+    try:
+        transfers, position = await relayer_client.list_transfers(
+            limit=limit,
+            cursor=_decode_cursor(cursor) if cursor else None,
+            status=status,
+            source_domain=source_domain,
+            dest_domain=dest_domain,
+            since=_naive_utc(since),
+            until=_naive_utc(until),
+        )
+    except RelayerUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
+    return TransferPage(
+        transfers=[TransferResponse(**t) for t in transfers],
+        next_cursor=_encode_cursor(position) if position else None,
+    )
 
 @router.get("/stats")
 async def get_relayer_stats():
     """Get relayer statistics"""
-    if not relayer:
+    if not relayer_client:
         raise HTTPException(status_code=503, detail="Relayer service not available")
     
-    transfers = relayer.get_all_transfers()
-    
-    completed = sum(1 for t in transfers if t["status"] == "completed")
-    pending = sum(1 for t in transfers if t["status"] == "pending")
-    failed = sum(1 for t in transfers if t["status"] == "failed")
-    
-    total_volume = sum(t["amount"] for t in transfers if t["status"] == "completed")
-    
-    return {
-        "total_transfers": len(transfers),
-        "completed": completed,
-        "pending": pending,
-        "failed": failed,
-        "total_volume_usdc": total_volume,
-        "relayer_address": relayer.account.address if relayer else None,
-        "network": relayer.network if relayer else None
-    }
+    return await relayer_client.get_stats()
 
 @router.post("/relay-manual")
 async def manually_relay_attestation(
@@ -156,7 +370,7 @@ async def manually_relay_attestation(
     This endpoint allows manual submission of attestations
     in case automatic monitoring fails
     """
-    if not relayer:
+    if not relayer_client:
         raise HTTPException(status_code=503, detail="Relayer service not available")
     
     # Implementation for manual relay
@@ -171,8 +385,14 @@ async def manually_relay_attestation(
 @router.get("/health")
 async def health_check():
     """Check if relayer service is healthy"""
+    if not relayer_client:
+        return {
+            "status": "not_initialized",
+            "relayer_address": None,
+            "status_subscribers": status_stream.subscribers if status_stream else 0,
+        }
+
     return {
-        "status": "healthy" if relayer else "not_initialized",
-        "relayer_address": relayer.account.address if relayer else None,
-        "monitored_transfers": len(relayer.transfers) if relayer else 0
+        **await relayer_client.health(),
+        "status_subscribers": status_stream.subscribers if status_stream else 0,
     }
\ No newline at end of file
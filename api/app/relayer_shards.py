@@ -0,0 +1,600 @@
+"""
+Sharded multi-worker relaying over Redis
+Transfers are partitioned into shards (one per destination domain, so a
+chain's signer nonce is only ever used by one worker). Workers hold renewable
+Redis leases on a fair share of the shards; each acquisition increments the
+shard's fencing token, and every write to shared transfer state is checked
+against it, so a worker that lost its lease (paused, partitioned) can no
+longer change anything. Any worker can read any transfer's status.
+
+Keys (``prefix`` defaults to "relayer"):
+
+    {prefix}:workers              zset  worker id -> heartbeat expiry (ms)
+    {prefix}:lease:{shard}        str   worker id holding the shard (PX ttl)
+    {prefix}:fence:{shard}        int   fencing token, incremented per acquisition
+    {prefix}:active:{shard}       set   keys of the shard's unfinished transfers
+    {prefix}:inbox:{shard}        list  keys submitted by other workers
+    {prefix}:transfer:{key}       str   transfer row (JSON); expires once terminal
+    {prefix}:stats                hash  transfers per status and completed volume
+    {prefix}:report:{worker id}   str   worker's health and metrics (JSON; short TTL)
+
+API processes use the same keys without holding leases: they submit
+transfers to a shard's inbox and read rows and counters (see relayer_client).
+"""
+
+import asyncio
+import json
+import logging
+import math
+import os
+import random
+import socket
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence
+
+from redis.asyncio import Redis
+
+from app.config import settings
+from app.transfer_store import transfer_row
+
+logger = logging.getLogger(__name__)
+
+# SET NX the lease and bump the fencing token in one step; returns the new
+# token, or nil if another worker holds the lease
+_ACQUIRE = """
+if redis.call('SET', KEYS[1], ARGV[1], 'NX', 'PX', ARGV[2]) then
+    return redis.call('INCR', KEYS[2])
+end
+return nil
+"""
+
+# Extend the lease only while this worker still holds it
+_RENEW = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+_RELEASE = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# Keeps {prefix}:stats in step with the rows: a row written with a new status
+# moves one count from its previous status (decoded from the row it replaces)
+_COUNT = """
+local function count(stats, old, status, amount)
+    local previous = old and cjson.decode(old).status
+    if previous == status then
+        return
+    end
+    if previous then
+        redis.call('HINCRBY', stats, previous, -1)
+    end
+    redis.call('HINCRBY', stats, status, 1)
+    if status == 'completed' then
+        redis.call('HINCRBY', stats, 'volume', amount)
+    end
+end
+"""
+
+# Fenced write of transfer rows: KEYS = fence, active set, stats; ARGV = token,
+# key prefix, terminal TTL, then (key, row JSON, status, amount) quadruples
+_WRITE = (
+    _COUNT
+    + """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+for i = 4, #ARGV, 4 do
+    local key, status = ARGV[i], ARGV[i + 2]
+    count(KEYS[3], redis.call('GET', ARGV[2] .. key), status, ARGV[i + 3])
+    if status == 'completed' or status == 'failed' then
+        redis.call('SET', ARGV[2] .. key, ARGV[i + 1], 'EX', ARGV[3])
+        redis.call('SREM', KEYS[2], key)
+    else
+        redis.call('SET', ARGV[2] .. key, ARGV[i + 1])
+        redis.call('SADD', KEYS[2], key)
+    end
+end
+return 1
+"""
+)
+
+# Create a transfer row unless it exists and queue it for the shard's owner:
+# KEYS = row, active set, inbox, stats; ARGV = row JSON, key, status
+_SUBMIT = """
+if not redis.call('SET', KEYS[1], ARGV[1], 'NX') then
+    return 0
+end
+redis.call('SADD', KEYS[2], ARGV[2])
+redis.call('RPUSH', KEYS[3], ARGV[2])
+redis.call('HINCRBY', KEYS[4], ARGV[3], 1)
+return 1
+"""
+
+# Fenced re-home of a transfer: KEYS = old shard's fence, row, old active set,
+# new active set, new inbox, stats; ARGV = token, row JSON, key, status, amount
+_MOVE = (
+    _COUNT
+    + """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+count(KEYS[6], redis.call('GET', KEYS[2]), ARGV[4], ARGV[5])
+redis.call('SET', KEYS[2], ARGV[2])
+redis.call('SREM', KEYS[3], ARGV[3])
+redis.call('SADD', KEYS[4], ARGV[3])
+redis.call('RPUSH', KEYS[5], ARGV[3])
+return 1
+"""
+)
+
+# Add totals from before the counters existed, once: KEYS = stats;
+# ARGV = (field, increment) pairs
+_SEED = """
+if redis.call('HSETNX', KEYS[1], 'seeded', 1) == 0 then
+    return 0
+end
+for i = 1, #ARGV, 2 do
+    redis.call('HINCRBY', KEYS[1], ARGV[i], ARGV[i + 1])
+end
+return 1
+"""
+
+
+class LeaseLostError(Exception):
+    """This worker no longer holds the shard it was about to act for"""
+
+
+OnAcquired = Callable[[str], Awaitable[None]]
+OnLost = Callable[[str], Awaitable[None]]
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+@dataclass
+class Lease:
+    token: int
+    # Local deadline (monotonic): past it the lease may have been taken over
+    # even if Redis was unreachable to tell us
+    expires_at: float
+
+
+class ShardLeases:
+    """Acquires, renews and rebalances this worker's shard leases"""
+
+    def __init__(
+        self,
+        redis: Redis,
+        shards: Sequence[str],
+        worker_id: Optional[str] = None,
+        lease_ttl: float = 15.0,
+        prefix: str = "relayer",
+    ):
+        """
+        Args:
+            redis: Redis client (redis.asyncio)
+            shards: All shard ids
+            worker_id: Unique id for this worker (defaults to host:pid:random)
+            lease_ttl: Seconds a lease lasts without renewal; renewed every third of it
+            prefix: Redis key prefix
+        """
+        self.redis = redis
+        self.shards = list(shards)
+        self.worker_id = worker_id or default_worker_id()
+        self.lease_ttl = lease_ttl
+        self.prefix = prefix
+        self.owned: Dict[str, Lease] = {}
+        self.live_workers = 1
+        self._on_acquired: Optional[OnAcquired] = None
+        self._on_lost: Optional[OnLost] = None
+        self._task: Optional[asyncio.Task] = None
+        self._acquire = redis.register_script(_ACQUIRE)
+        self._renew = redis.register_script(_RENEW)
+        self._release = redis.register_script(_RELEASE)
+
+    def lease_key(self, shard: str) -> str:
+        return f"{self.prefix}:lease:{shard}"
+
+    def fence_key(self, shard: str) -> str:
+        return f"{self.prefix}:fence:{shard}"
+
+    def owns(self, shard: str) -> bool:
+        lease = self.owned.get(shard)
+        return lease is not None and time.monotonic() < lease.expires_at
+
+    def token(self, shard: str) -> Optional[int]:
+        lease = self.owned.get(shard)
+        return lease.token if lease else None
+
+    def as_dict(self) -> Dict:
+        return {
+            "worker_id": self.worker_id,
+            "live_workers": self.live_workers,
+            "owned": {shard: lease.token for shard, lease in self.owned.items()},
+        }
+
+    async def verify(self, shard: str) -> bool:
+        """Check with Redis that the shard is still ours (before a side effect)"""
+        if not self.owns(shard):
+            return False
+        holder, fence = await self.redis.mget(
+            self.lease_key(shard), self.fence_key(shard)
+        )
+        return _text(holder) == self.worker_id and _text(fence) == str(
+            self.owned[shard].token
+        )
+
+    async def holders(self) -> Dict[str, Optional[str]]:
+        """Worker currently holding each shard (None if unleased)"""
+        held = await self.redis.mget([self.lease_key(shard) for shard in self.shards])
+        return {
+            shard: _text(holder) if holder else None
+            for shard, holder in zip(self.shards, held, strict=True)
+        }
+
+    async def workers(self) -> List[str]:
+        """Workers whose heartbeat has not expired"""
+        live = await self.redis.zrangebyscore(
+            self._workers_key, int(time.time() * 1000), "+inf"
+        )
+        return [_text(worker) for worker in live]
+
+    async def start(self, on_acquired: OnAcquired, on_lost: OnLost):
+        """Start the lease loop; shards are acquired in the background"""
+        self._on_acquired = on_acquired
+        self._on_lost = on_lost
+        if self._task is None:
+            self._task = asyncio.create_task(self._lease_loop())
+
+    async def stop(self):
+        """Hand every shard back, once its state is flushed, so others take over"""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        for shard in list(self.owned):
+            await self._give_up(shard)
+        await self.redis.zrem(self._workers_key, self.worker_id)
+
+    @property
+    def _workers_key(self) -> str:
+        return f"{self.prefix}:workers"
+
+    async def _lease_loop(self):
+        interval = self.lease_ttl / 3
+        while True:
+            try:
+                await self.rebalance()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Shard lease update failed: {e}")
+                await self._drop_expired()
+            await asyncio.sleep(interval * random.uniform(0.8, 1.0))
+
+    async def rebalance(self):
+        """Heartbeat, renew leases, then shed or acquire shards toward a fair share"""
+        ttl_ms = int(self.lease_ttl * 1000)
+        now_ms = int(time.time() * 1000)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.zadd(self._workers_key, {self.worker_id: now_ms + ttl_ms})
+            pipe.zremrangebyscore(self._workers_key, "-inf", now_ms)
+            pipe.zcard(self._workers_key)
+            _, _, live = await pipe.execute()
+        self.live_workers = max(1, live)
+
+        for shard in list(self.owned):
+            renewed_at = time.monotonic()
+            if await self._renew(
+                keys=[self.lease_key(shard)], args=[self.worker_id, ttl_ms]
+            ):
+                self.owned[shard].expires_at = renewed_at + self.lease_ttl
+            else:
+                logger.warning(f"Lost lease on shard {shard}")
+                del self.owned[shard]
+                await self._on_lost(shard)
+
+        target = math.ceil(len(self.shards) / self.live_workers)
+        # Shed extras so a new worker can pick them up
+        for shard in sorted(self.owned)[target:]:
+            await self._give_up(shard)
+
+        if len(self.owned) < target:
+            free = [shard for shard in self.shards if shard not in self.owned]
+            random.shuffle(free)
+            for shard in free:
+                if len(self.owned) >= target:
+                    break
+                acquired_at = time.monotonic()
+                token = await self._acquire(
+                    keys=[self.lease_key(shard), self.fence_key(shard)],
+                    args=[self.worker_id, ttl_ms],
+                )
+                if token is None:
+                    continue
+                self.owned[shard] = Lease(
+                    token=int(token), expires_at=acquired_at + self.lease_ttl
+                )
+                logger.info(f"Acquired shard {shard} (fencing token {token})")
+                await self._on_acquired(shard)
+
+    async def _give_up(self, shard: str):
+        await self._on_lost(shard)
+        self.owned.pop(shard, None)
+        await self._release(keys=[self.lease_key(shard)], args=[self.worker_id])
+        logger.info(f"Released shard {shard}")
+
+    async def _drop_expired(self):
+        """Without Redis, stop working on shards whose lease may have lapsed"""
+        for shard in [s for s in self.owned if not self.owns(s)]:
+            del self.owned[shard]
+            await self._on_lost(shard)
+
+
+class SharedTransferState:
+    """Transfer rows in Redis, written only under the shard's fencing token"""
+
+    def __init__(
+        self,
+        redis: Redis,
+        leases: ShardLeases,
+        terminal_ttl: float = 7 * 86400,
+        flush_interval: float = 0.5,
+    ):
+        """
+        Args:
+            redis: Redis client (redis.asyncio)
+            leases: This worker's shard leases (supplies fencing tokens); API
+                processes pass leases they never start, and only submit and read
+            terminal_ttl: Seconds completed/failed transfers stay readable
+            flush_interval: Seconds between batched writes
+        """
+        self.redis = redis
+        self.leases = leases
+        self.prefix = leases.prefix
+        self.terminal_ttl = int(terminal_ttl)
+        self.flush_interval = flush_interval
+        # shard -> key -> transfer
+        self._dirty: Dict[str, Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._write = redis.register_script(_WRITE)
+        self._submit = redis.register_script(_SUBMIT)
+        self._move = redis.register_script(_MOVE)
+        self._seed = redis.register_script(_SEED)
+
+    def transfer_key(self, key: str) -> str:
+        return f"{self.prefix}:transfer:{key}"
+
+    @property
+    def stats_key(self) -> str:
+        return f"{self.prefix}:stats"
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    def mark_dirty(self, transfer: Any, shard: str):
+        self._dirty.setdefault(shard, {})[transfer.key] = transfer
+
+    async def flush(self, shard: Optional[str] = None) -> bool:
+        """Write dirty rows; returns False if a shard's token was rejected"""
+        ok = True
+        for name in [shard] if shard is not None else list(self._dirty):
+            dirty = self._dirty.pop(name, None)
+            if not dirty:
+                continue
+            token = self.leases.token(name)
+            if token is None:
+                logger.warning(
+                    f"Dropping {len(dirty)} updates for shard {name}: lease not held"
+                )
+                ok = False
+                continue
+            args: List[Any] = [token, f"{self.prefix}:transfer:", self.terminal_ttl]
+            for key, transfer in dirty.items():
+                args += [
+                    key,
+                    encode_row(transfer),
+                    transfer.status.value,
+                    transfer.amount or 0,
+                ]
+            try:
+                written = await self._write(
+                    keys=[
+                        self.leases.fence_key(name),
+                        f"{self.prefix}:active:{name}",
+                        self.stats_key,
+                    ],
+                    args=args,
+                )
+            except BaseException:
+                # Keep the updates for the next flush unless newer ones have been
+                # queued since; only a lost lease or stale token drops them
+                pending = self._dirty.setdefault(name, {})
+                for key, transfer in dirty.items():
+                    pending.setdefault(key, transfer)
+                raise
+            if not written:
+                logger.warning(
+                    f"Fencing token {token} for shard {name} is stale, updates rejected"
+                )
+                ok = False
+        return ok
+
+    async def submit(self, transfer: Any, shard: str) -> bool:
+        """Hand a new transfer to the shard's owner; False if it already exists"""
+        key = transfer.key
+        created = await self._submit(
+            keys=[
+                self.transfer_key(key),
+                f"{self.prefix}:active:{shard}",
+                f"{self.prefix}:inbox:{shard}",
+                self.stats_key,
+            ],
+            args=[encode_row(transfer), key, transfer.status.value],
+        )
+        return bool(created)
+
+    async def move(self, transfer: Any, from_shard: str) -> bool:
+        """Re-home a transfer whose destination turned out to be another shard
+
+        Fenced like writes: returns False, leaving the row alone, if this worker
+        no longer holds ``from_shard``.
+        """
+        key, shard = transfer.key, str(transfer.dest_domain)
+        self._dirty.get(from_shard, {}).pop(key, None)
+        token = self.leases.token(from_shard)
+        if token is None:
+            logger.warning(
+                f"Not moving {key} out of shard {from_shard}: lease not held"
+            )
+            return False
+        moved = await self._move(
+            keys=[
+                self.leases.fence_key(from_shard),
+                self.transfer_key(key),
+                f"{self.prefix}:active:{from_shard}",
+                f"{self.prefix}:active:{shard}",
+                f"{self.prefix}:inbox:{shard}",
+                self.stats_key,
+            ],
+            args=[
+                token,
+                encode_row(transfer),
+                key,
+                transfer.status.value,
+                transfer.amount or 0,
+            ],
+        )
+        if not moved:
+            logger.warning(
+                f"Fencing token {token} for shard {from_shard} is stale, move of {key} "
+                "rejected"
+            )
+        return bool(moved)
+
+    async def get(self, key: str) -> Optional[Dict]:
+        raw = await self.redis.get(self.transfer_key(key))
+        return decode_row(raw) if raw else None
+
+    async def get_many(self, keys: List[str]) -> List[Optional[Dict]]:
+        """Rows for ``keys``, in order (None where there is none)"""
+        if not keys:
+            return []
+        return [
+            decode_row(raw) if raw else None
+            for raw in await self.redis.mget([self.transfer_key(k) for k in keys])
+        ]
+
+    async def stats(self) -> Dict[str, int]:
+        """Transfers per status across all shards, and completed volume ("volume")"""
+        counts = await self.redis.hgetall(self.stats_key)
+        return {
+            _text(field): int(value)
+            for field, value in counts.items()
+            if _text(field) != "seeded"
+        }
+
+    async def publish_report(self, report: Dict, ttl: float):
+        """Store this worker's latest report, kept for ``ttl`` seconds"""
+        await self.redis.set(
+            f"{self.prefix}:report:{self.leases.worker_id}",
+            json.dumps(report),
+            ex=int(ttl),
+        )
+
+    async def reports(self, worker_ids: List[str]) -> Dict[str, Dict]:
+        """Latest report of each worker that has one"""
+        if not worker_ids:
+            return {}
+        raw = await self.redis.mget(
+            [f"{self.prefix}:report:{worker}" for worker in worker_ids]
+        )
+        return {
+            worker: json.loads(report)
+            for worker, report in zip(worker_ids, raw, strict=True)
+            if report
+        }
+
+    async def seed_stats(self, totals: Dict[str, int]) -> bool:
+        """Add counts from before the stats hash existed; only the first call counts"""
+        args: List[Any] = []
+        for field, value in totals.items():
+            args += [field, value]
+        return bool(await self._seed(keys=[self.stats_key], args=args))
+
+    async def load_shard(self, shard: str) -> List[Dict]:
+        """Every unfinished transfer of a shard (on acquiring it)"""
+        await self.redis.delete(f"{self.prefix}:inbox:{shard}")
+        keys = await self.redis.smembers(f"{self.prefix}:active:{shard}")
+        return await self._rows([_text(k) for k in keys])
+
+    async def take_inbox(self, shard: str, limit: int = 500) -> List[Dict]:
+        """Transfers submitted to the shard since the last call"""
+        keys = await self.redis.lpop(f"{self.prefix}:inbox:{shard}", limit)
+        return await self._rows([_text(k) for k in keys or []])
+
+    async def _rows(self, keys: List[str]) -> List[Dict]:
+        rows = []
+        for start in range(0, len(keys), 500):
+            chunk = keys[start : start + 500]
+            for raw in await self.redis.mget([self.transfer_key(k) for k in chunk]):
+                if raw:
+                    rows.append(decode_row(raw))
+        return rows
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Error writing shared transfer state: {e}")
+
+
+def create_shared_state(domains: Iterable[int]) -> Optional[SharedTransferState]:
+    """Shared state sharded by destination domain, if RELAYER_REDIS_URL is set"""
+    if not settings.RELAYER_REDIS_URL:
+        return None
+    redis = Redis.from_url(settings.RELAYER_REDIS_URL)
+    return SharedTransferState(
+        redis, ShardLeases(redis, [str(domain) for domain in domains])
+    )
+
+
+def _text(value) -> Optional[str]:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def encode_row(transfer: Any) -> str:
+    row = transfer_row(transfer)
+    row["created_at"] = row["created_at"].isoformat() if row["created_at"] else None
+    row["completed_at"] = (
+        row["completed_at"].isoformat() if row["completed_at"] else None
+    )
+    return json.dumps(row)
+
+
+def decode_row(raw) -> Dict:
+    row = json.loads(raw)
+    for field in ("created_at", "completed_at"):
+        if row.get(field):
+            row[field] = datetime.fromisoformat(row[field])
+    return row
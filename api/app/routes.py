@@ -6,6 +6,13 @@ from fastapi import APIRouter, HTTPException, Query
 from typing import Optional, List
 from pydantic import BaseModel
 from decimal import Decimal
+import asyncio
+
+from web3 import AsyncWeb3
+from web3.exceptions import TransactionNotFound
+
+from app.burn_scanner import CHAIN_DOMAINS, parse_deposit_for_burn
+from app.chain_clients import CHAIN_NAMES, get_chain_clients
 
 router = APIRouter()
 
@@ -143,19 +150,65 @@ async def prepare_transaction(request: TransactionRequest):
     }
 
 
+# Mainnet chain ID per CCTP domain
+_DOMAIN_CHAINS = {
+    domain: chain_id
+    for chain_id, domain in CHAIN_DOMAINS.items()
+    if chain_id in CHAIN_NAMES
+}
+
+
 @router.get("/transaction/{tx_hash}")
 async def get_transaction_status(tx_hash: str, chain_id: int = Query(...)):
-    """Get status of a cross-chain transaction"""
-    
-    # Mock response - would query blockchain
-    return {
+    """Get status of a cross-chain transaction on its source chain"""
+    clients = get_chain_clients()
+    chain = CHAIN_NAMES.get(chain_id)
+    if chain not in clients:
+        raise HTTPException(status_code=400, detail=f"Unsupported chain: {chain_id}")
+    web3 = clients[chain]
+
+    # Issued together, so both reads travel in one JSON-RPC batch
+    try:
+        receipt, head = await asyncio.gather(
+            _get_receipt(web3, tx_hash), web3.eth.block_number
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"RPC error on {chain}: {e}") from e
+
+    # dest_chain, amounts and timestamp are null until the transaction is
+    # mined, and for transactions that burned nothing through CCTP
+    status = {
         "tx_hash": tx_hash,
-        "status": "completed",
+        "status": "pending",
         "source_chain": chain_id,
-        "dest_chain": 42161,
-        "amount_sent": "1000000000",
-        "amount_received": "999500000",
-        "timestamp": 1704067200,
+        "dest_chain": None,
+        "amount_sent": None,
+        "amount_received": None,
+        "timestamp": None,
+    }
+    if receipt is None:
+        return status
+
+    try:
+        block = await web3.eth.get_block(receipt["blockNumber"])
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"RPC error on {chain}: {e}") from e
+    burn = next(filter(None, map(parse_deposit_for_burn, receipt["logs"])), None)
+    if burn is not None:
+        status["dest_chain"] = _DOMAIN_CHAINS.get(burn.dest_domain)
+        status["amount_sent"] = str(burn.amount)
+        # A v2 fast-transfer fee is only known once minted; up to max_fee
+        status["amount_received"] = str(burn.amount) if burn.max_fee == 0 else None
+
+    return {
+        **status,
+        "status": "completed" if receipt["status"] == 1 else "failed",
+        "timestamp": block["timestamp"],
+        "block_number": receipt["blockNumber"],
+        "confirmations": max(0, head - receipt["blockNumber"] + 1),
+        "gas_used": receipt["gasUsed"],
     }
 
 
@@ -250,6 +303,14 @@ def _get_route_path(request: RouteQuoteRequest) -> List[str]:
         ]
 
 
+async def _get_receipt(web3: AsyncWeb3, tx_hash: str):
+    """Transaction receipt, or None while the transaction is not mined"""
+    try:
+        return await web3.eth.get_transaction_receipt(tx_hash)
+    except TransactionNotFound:
+        return None
+
+
 def _get_router_address(chain_id: int) -> str:
     """Get router address for chain"""
     routers = {
@@ -0,0 +1,204 @@
+"""
+JSON-RPC request batching
+Concurrent requests to one endpoint are queued for a single event-loop turn
+(or a short window) and sent as one JSON-RPC batch array, so independent reads
+made together - gas estimate, fee data, nonce, receipts - cost one HTTP
+round-trip instead of one each. Transactions are sent on their own (``send``)
+so a broadcast never waits on, or fails with, a batch of reads.
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+from collections.abc import Mapping
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+
+import aiohttp
+from web3.types import RPCEndpoint, RPCResponse
+
+logger = logging.getLogger(__name__)
+
+Pending = Tuple[Dict[str, Any], asyncio.Future]
+
+
+def _json_default(value: Any) -> Any:
+    """Encode what web3 leaves in request params (HexBytes, AttributeDict)"""
+    if isinstance(value, (bytes, bytearray)):
+        return "0x" + bytes(value).hex()
+    if isinstance(value, Mapping):
+        return dict(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class JSONRPCBatcher:
+    """Coalesces concurrent JSON-RPC requests to one endpoint into batch arrays"""
+
+    def __init__(
+        self,
+        endpoint_uri: str,
+        request_kwargs: Optional[Dict[str, Any]] = None,
+        max_batch_size: int = 20,
+        batch_window: float = 0.0,
+    ):
+        """
+        Args:
+            endpoint_uri: HTTP JSON-RPC endpoint
+            request_kwargs: Extra aiohttp request arguments (e.g. timeout)
+            max_batch_size: Send a batch as soon as it has this many requests
+            batch_window: Seconds to collect requests; 0 batches whatever was
+                issued in the same event-loop turn
+        """
+        self.endpoint_uri = endpoint_uri
+        self.request_kwargs = {
+            "headers": {"Content-Type": "application/json"},
+            **(request_kwargs or {}),
+        }
+        self.max_batch_size = max_batch_size
+        self.batch_window = batch_window
+        # Cleared if the endpoint answers a batch with a single error object
+        self.supports_batch = True
+        self.calls = 0
+        self.http_requests = 0
+        self._ids = itertools.count()
+        self._queue: List[Pending] = []
+        self._flush_handle: Optional[asyncio.Handle] = None
+        self._sends: Set[asyncio.Task] = set()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        """Send one request as part of the next batch; returns its response object
+
+        Raises:
+            Exception: The transport error if the batch's HTTP request failed
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        payload = {
+            "jsonrpc": "2.0",
+            "method": method,
+            "params": params or [],
+            "id": next(self._ids),
+        }
+        self._queue.append((payload, future))
+        self.calls += 1
+
+        if len(self._queue) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            if self.batch_window > 0:
+                self._flush_handle = loop.call_later(self.batch_window, self._flush)
+            else:
+                self._flush_handle = loop.call_soon(self._flush)
+        return await future
+
+    async def send(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        """Send one request immediately in its own HTTP request, outside any batch"""
+        self.calls += 1
+        payload = {
+            "jsonrpc": "2.0",
+            "method": method,
+            "params": params or [],
+            "id": next(self._ids),
+        }
+        return await self._post(payload)
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        # Callers that gave up (e.g. a lost hedge) are dropped before sending
+        batch = [
+            (payload, future) for payload, future in self._queue if not future.done()
+        ]
+        self._queue = []
+        if batch:
+            task = asyncio.ensure_future(self._send(batch))
+            self._sends.add(task)
+            task.add_done_callback(self._sends.discard)
+
+    async def _send(self, batch: List[Pending]):
+        try:
+            if len(batch) == 1 or not self.supports_batch:
+                await asyncio.gather(
+                    *(self._send_single(payload, future) for payload, future in batch)
+                )
+                return
+
+            responses = await self._post([payload for payload, _ in batch])
+            if not isinstance(responses, list):
+                # Endpoint does not accept batches: send this and later requests singly
+                logger.warning(
+                    f"{self.endpoint_uri} rejected a JSON-RPC batch, sending requests "
+                    "individually"
+                )
+                self.supports_batch = False
+                await asyncio.gather(
+                    *(self._send_single(payload, future) for payload, future in batch)
+                )
+                return
+
+            by_id = {
+                response.get("id"): response
+                for response in responses
+                if isinstance(response, dict)
+            }
+            for payload, future in batch:
+                if future.done():
+                    continue
+                response = by_id.get(payload["id"])
+                if response is None:
+                    future.set_exception(
+                        ValueError(
+                            f"No response for {payload['method']} in JSON-RPC batch"
+                        )
+                    )
+                else:
+                    future.set_result(response)
+        except asyncio.CancelledError:
+            for _, future in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+    async def _send_single(self, payload: Dict[str, Any], future: asyncio.Future):
+        try:
+            response = await self._post(payload)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            return
+        if not future.done():
+            future.set_result(response)
+
+    def _client_session(self) -> aiohttp.ClientSession:
+        # A session is bound to the event loop it was created on
+        loop = asyncio.get_running_loop()
+        if (
+            self._session is None
+            or self._session.closed
+            or self._session_loop is not loop
+        ):
+            self._session = aiohttp.ClientSession()
+            self._session_loop = loop
+        return self._session
+
+    async def _post(
+        self, payload: Union[Dict, List[Dict]]
+    ) -> Union[RPCResponse, List[RPCResponse]]:
+        self.http_requests += 1
+        data = json.dumps(payload, default=_json_default).encode()
+        async with self._client_session().post(
+            self.endpoint_uri, data=data, **self.request_kwargs
+        ) as response:
+            response.raise_for_status()
+            return json.loads(await response.read())
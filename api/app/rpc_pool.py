@@ -0,0 +1,343 @@
+"""
+Multi-endpoint JSON-RPC pool
+A web3 provider over several RPC endpoints for one chain. Reads go to the
+fastest healthy endpoint and are hedged to the next one if they outlast that
+endpoint's latency percentile; endpoints that keep failing are ejected by a
+circuit breaker and retried after a cooldown. Requests to each endpoint go
+through a JSONRPCBatcher, so concurrent calls share HTTP round-trips.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Sequence
+
+import aiohttp
+from web3.providers.async_base import AsyncJSONBaseProvider
+from web3.types import RPCEndpoint, RPCResponse
+
+from app import metrics
+from app.rpc_batch import JSONRPCBatcher
+
+logger = logging.getLogger(__name__)
+
+# Not hedged or retried after a possible delivery: a duplicate broadcast
+# comes back as an error ("already known", "nonce too low")
+WRITE_METHODS = frozenset({"eth_sendRawTransaction", "eth_sendTransaction"})
+
+# JSON-RPC error codes that describe the provider rather than the request
+# (-32005: limit exceeded / rate limited)
+PROVIDER_ERROR_CODES = frozenset({-32005})
+
+
+class ProviderResponseError(Exception):
+    """An endpoint answered with a provider-level JSON-RPC error"""
+
+    def __init__(self, response: RPCResponse):
+        super().__init__(str(response.get("error")))
+        self.response = response
+
+
+def _percentile(samples: Sequence[float], q: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q / 100))]
+
+
+class PoolEndpoint:
+    """One RPC endpoint with rolling latency/error stats and a circuit breaker"""
+
+    # Weight of the newest sample in the latency moving average used for ranking
+    EWMA_ALPHA = 0.2
+
+    def __init__(
+        self,
+        url: str,
+        window: int = 100,
+        request_timeout: float = 10.0,
+        max_batch_size: int = 20,
+        batch_window: float = 0.0,
+    ):
+        self.url = url
+        self.label = metrics.endpoint_label(url)
+        self.transport = JSONRPCBatcher(
+            url,
+            request_kwargs={"timeout": aiohttp.ClientTimeout(total=request_timeout)},
+            max_batch_size=max_batch_size,
+            batch_window=batch_window,
+        )
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.outcomes: Deque[bool] = deque(maxlen=window)
+        # Recency-weighted latency: reacts within a few requests when an
+        # endpoint slows down, where the window percentiles lag behind
+        self.ewma: Optional[float] = None
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        # Circuit breaker: open until this monotonic time (0 = closed); once
+        # it passes, one trial request is let through (half-open)
+        self.open_until = 0.0
+        self.times_opened = 0
+        self.trial_in_flight = False
+
+    def observe(self, latency: float):
+        self.latencies.append(latency)
+        self.ewma = (
+            latency
+            if self.ewma is None
+            else self.ewma + self.EWMA_ALPHA * (latency - self.ewma)
+        )
+
+    def percentile(self, q: float) -> Optional[float]:
+        return _percentile(self.latencies, q)
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    @property
+    def state(self) -> str:
+        if not self.open_until:
+            return "closed"
+        return "open" if time.monotonic() < self.open_until else "half_open"
+
+    def as_dict(self) -> Dict:
+        p50, p95 = self.percentile(50), self.percentile(95)
+        return {
+            "url": self.url,
+            "state": self.state,
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "ewma_ms": round(self.ewma * 1000, 1) if self.ewma is not None else None,
+            "error_rate": round(self.error_rate, 3),
+            "requests": self.requests,
+            "failures": self.failures,
+            "http_requests": self.transport.http_requests,
+        }
+
+
+class RPCPool(AsyncJSONBaseProvider):
+    """web3 async provider that spreads a chain's requests over several endpoints"""
+
+    def __init__(
+        self,
+        urls: Sequence[str],
+        name: str = "",
+        hedge_percentile: float = 95,
+        min_hedge_delay: float = 0.05,
+        max_hedge_delay: float = 2.0,
+        failure_threshold: int = 3,
+        max_error_rate: float = 0.5,
+        cooldown: float = 15.0,
+        max_cooldown: float = 300.0,
+        window: int = 100,
+        request_timeout: float = 10.0,
+        max_batch_size: int = 20,
+        batch_window: float = 0.0,
+    ):
+        """
+        Args:
+            urls: Endpoint URLs for one chain
+            name: Chain name (for logging and metrics)
+            hedge_percentile: A read still running after this percentile of its
+                endpoint's latency is also sent to the next endpoint
+            min_hedge_delay: Lower bound for the hedge deadline in seconds
+            max_hedge_delay: Upper bound for the hedge deadline (also used
+                before an endpoint has latency samples)
+            failure_threshold: Consecutive failures that open an endpoint's breaker
+            max_error_rate: Error rate over the rolling window that opens the breaker
+            cooldown: Seconds an opened breaker stays open (doubles each time
+                it re-opens, up to ``max_cooldown``)
+            max_cooldown: Upper bound for the breaker cooldown
+            window: Requests kept for rolling latency and error rate
+            request_timeout: Total HTTP timeout per request in seconds
+            max_batch_size: Most requests per JSON-RPC batch to one endpoint
+            batch_window: Seconds to collect a batch (0: one event-loop turn)
+        """
+        if not urls:
+            raise ValueError("RPCPool needs at least one endpoint")
+        super().__init__()
+        self.name = name
+        self.endpoints = [
+            PoolEndpoint(url, window, request_timeout, max_batch_size, batch_window)
+            for url in urls
+        ]
+        self.hedge_percentile = hedge_percentile
+        self.min_hedge_delay = min_hedge_delay
+        self.max_hedge_delay = max_hedge_delay
+        self.failure_threshold = failure_threshold
+        self.max_error_rate = max_error_rate
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.hedged = 0
+
+    def __str__(self) -> str:
+        return f"RPC pool {', '.join(e.url for e in self.endpoints)}"
+
+    async def disconnect(self):
+        """Close the endpoints' HTTP sessions (reopened on the next request)"""
+        await asyncio.gather(*(e.transport.close() for e in self.endpoints))
+
+    def stats(self) -> Dict:
+        return {
+            "hedged": self.hedged,
+            "endpoints": [e.as_dict() for e in self.endpoints],
+        }
+
+    def ranked(self) -> List[PoolEndpoint]:
+        """Usable endpoints, fastest first
+
+        Endpoints are scored by recent (moving average) latency inflated by
+        their error rate; endpoints without samples score zero so they get
+        tried. If every breaker is open, the one closest to reopening is returned.
+        """
+        now = time.monotonic()
+        usable = [
+            e
+            for e in self.endpoints
+            if not e.open_until or (now >= e.open_until and not e.trial_in_flight)
+        ]
+        if not usable:
+            return [min(self.endpoints, key=lambda e: e.open_until)]
+        return sorted(
+            usable, key=lambda e: (e.ewma or 0.0) / max(0.05, 1.0 - e.error_rate)
+        )
+
+    async def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        try:
+            if method in WRITE_METHODS:
+                return await self._write(method, params)
+            return await self._read(method, params)
+        except ProviderResponseError as e:
+            # Every endpoint is rate limiting: surface the error response
+            return e.response
+
+    async def _read(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        """Fastest endpoint first, hedged past its deadline, failing over on errors"""
+        candidates = self.ranked()
+        tasks: Dict[asyncio.Task, PoolEndpoint] = {}
+        last_error: Optional[Exception] = None
+        hedged = False
+
+        def launch() -> PoolEndpoint:
+            endpoint = candidates.pop(0)
+            tasks[asyncio.ensure_future(self._call(endpoint, method, params))] = (
+                endpoint
+            )
+            return endpoint
+
+        delay = self._hedge_delay(launch())
+        try:
+            while tasks:
+                can_hedge = not hedged and bool(candidates)
+                done, _ = await asyncio.wait(
+                    tasks,
+                    timeout=delay if can_hedge else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    hedged = True
+                    self.hedged += 1
+                    launch()
+                    continue
+                for task in done:
+                    tasks.pop(task)
+                    try:
+                        return task.result()
+                    except Exception as e:
+                        last_error = e
+                if not tasks and candidates:
+                    launch()
+            raise last_error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _write(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        """Fastest endpoint; fails over only when the request never left"""
+        last_error: Optional[Exception] = None
+        for endpoint in self.ranked():
+            try:
+                return await self._call(endpoint, method, params)
+            except (aiohttp.ClientConnectorError, ProviderResponseError) as e:
+                last_error = e
+        raise last_error
+
+    async def _call(
+        self, endpoint: PoolEndpoint, method: RPCEndpoint, params: Any
+    ) -> RPCResponse:
+        trial = bool(endpoint.open_until)
+        if trial:
+            endpoint.trial_in_flight = True
+        endpoint.requests += 1
+        started = time.monotonic()
+        try:
+            if method in WRITE_METHODS:
+                response = await endpoint.transport.send(method, params)
+            else:
+                response = await endpoint.transport.request(method, params)
+            error = response.get("error") if isinstance(response, dict) else None
+            if isinstance(error, dict) and error.get("code") in PROVIDER_ERROR_CODES:
+                raise ProviderResponseError(response)
+        except asyncio.CancelledError:
+            # Lost a hedge race: it took at least this long, which keeps a
+            # slow endpoint's percentiles honest even when it never finishes
+            endpoint.observe(time.monotonic() - started)
+            raise
+        except Exception as e:
+            metrics.RPC_ERRORS.inc(self.name, endpoint.label)
+            self._record_failure(endpoint, e)
+            raise
+        else:
+            latency = time.monotonic() - started
+            metrics.RPC_REQUEST_SECONDS.observe(latency, self.name, endpoint.label)
+            self._record_success(endpoint, latency)
+            return response
+        finally:
+            if trial:
+                endpoint.trial_in_flight = False
+
+    def _hedge_delay(self, endpoint: PoolEndpoint) -> float:
+        deadline = endpoint.percentile(self.hedge_percentile)
+        if deadline is None:
+            return self.max_hedge_delay
+        return min(self.max_hedge_delay, max(self.min_hedge_delay, deadline))
+
+    def _record_success(self, endpoint: PoolEndpoint, latency: float):
+        endpoint.observe(latency)
+        endpoint.outcomes.append(True)
+        endpoint.consecutive_failures = 0
+        if endpoint.open_until:
+            logger.info(f"RPC endpoint {endpoint.url} recovered")
+            endpoint.open_until = 0.0
+            endpoint.times_opened = 0
+            # Start the error rate afresh so old failures cannot re-trip it
+            endpoint.outcomes.clear()
+
+    def _record_failure(self, endpoint: PoolEndpoint, error: Exception):
+        endpoint.outcomes.append(False)
+        endpoint.failures += 1
+        endpoint.consecutive_failures += 1
+        if endpoint.state == "open":
+            # Already ejected (a request that was in flight when it tripped)
+            return
+        tripped = (
+            endpoint.open_until  # failed trial while half-open
+            or endpoint.consecutive_failures >= self.failure_threshold
+            or (
+                len(endpoint.outcomes) >= 10
+                and endpoint.error_rate > self.max_error_rate
+            )
+        )
+        if tripped:
+            cooldown = min(self.max_cooldown, self.cooldown * 2**endpoint.times_opened)
+            endpoint.open_until = time.monotonic() + cooldown
+            endpoint.times_opened += 1
+            logger.warning(
+                f"⚠️ RPC endpoint {endpoint.url} ejected for {cooldown:.0f}s: "
+                f"{str(error) or type(error).__name__}"
+            )
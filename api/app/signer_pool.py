@@ -0,0 +1,165 @@
+"""
+Relayer signer pool
+Each destination chain gets one nonce sequence per hot wallet. Transactions go
+to the signer with the least work in flight, so relay throughput grows with
+the number of keys and one stuck transaction only holds up its own signer.
+Balances are refreshed in the background and signers that cannot pay for gas
+are taken out of rotation until they are topped up.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, List, Optional, Sequence
+
+from eth_account.signers.local import LocalAccount
+from web3 import AsyncWeb3
+
+from app.nonce_manager import NonceManager
+
+logger = logging.getLogger(__name__)
+
+
+def signer_keys_from_env() -> List[str]:
+    """Extra hot wallet keys from RELAYER_SIGNER_KEYS (comma-separated)"""
+    return [
+        key.strip()
+        for key in os.getenv("RELAYER_SIGNER_KEYS", "").split(",")
+        if key.strip()
+    ]
+
+
+class Signer:
+    """One hot wallet on one chain"""
+
+    def __init__(self, chain: str, account: LocalAccount, web3: AsyncWeb3):
+        self.chain = chain
+        self.account = account
+        self.address = account.address
+
+        async def fetch_nonce(block_identifier: str) -> int:
+            return await web3.eth.get_transaction_count(self.address, block_identifier)
+
+        self.nonces = NonceManager(f"{chain}/{self.address[:10]}", fetch_nonce)
+        # Transactions assigned to this signer and not yet confirmed (or given up on)
+        self.assigned = 0
+        self.balance: Optional[int] = None
+        self.balance_checked_at: Optional[float] = None
+        self.funded = True
+
+    def as_dict(self) -> Dict:
+        return {
+            "address": self.address,
+            "balance": self.balance,
+            "funded": self.funded,
+            "assigned": self.assigned,
+            "in_flight": self.nonces.in_flight,
+        }
+
+
+class SignerPool:
+    """Signers for one chain, handed out least-loaded first"""
+
+    def __init__(
+        self,
+        chain: str,
+        web3: AsyncWeb3,
+        accounts: Sequence[LocalAccount],
+        min_balance: int = 10**15,
+        balance_interval: float = 30.0,
+    ):
+        """
+        Args:
+            chain: Chain name (for logging)
+            web3: Client for the chain
+            accounts: Hot wallets that may sign for this chain
+            min_balance: Native balance in wei below which a signer is taken out
+                of rotation
+            balance_interval: Seconds between background balance refreshes
+        """
+        if not accounts:
+            raise ValueError("SignerPool needs at least one account")
+        self.chain = chain
+        self.web3 = web3
+        self.signers = [Signer(chain, account, web3) for account in accounts]
+        self.min_balance = min_balance
+        self.balance_interval = balance_interval
+        self._task: Optional[asyncio.Task] = None
+
+    def __iter__(self):
+        return iter(self.signers)
+
+    @property
+    def in_flight(self) -> int:
+        return sum(signer.nonces.in_flight for signer in self.signers)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._balance_loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def acquire(self) -> Signer:
+        """Assign a transaction to the funded signer with the least work in flight
+
+        If every signer is underfunded the least-loaded one is used anyway, so
+        the send fails with the node's own error rather than silently stalling.
+        """
+        funded = [signer for signer in self.signers if signer.funded] or self.signers
+        signer = min(funded, key=lambda s: (s.assigned, s.nonces.in_flight))
+        signer.assigned += 1
+        return signer
+
+    def release(self, signer: Signer, receipt=None):
+        """Finish a transaction from ``acquire``; a receipt's gas cost is deducted"""
+        signer.assigned = max(0, signer.assigned - 1)
+        if receipt is not None and signer.balance is not None:
+            price = receipt.get("effectiveGasPrice") or 0
+            self._set_balance(
+                signer, max(0, signer.balance - receipt.get("gasUsed", 0) * price)
+            )
+
+    async def refresh_balances(self):
+        """Read every signer's balance (one round-trip when the endpoint batches)"""
+        balances = await asyncio.gather(
+            *(self.web3.eth.get_balance(signer.address) for signer in self.signers),
+            return_exceptions=True,
+        )
+        for signer, balance in zip(self.signers, balances, strict=True):
+            if isinstance(balance, Exception):
+                logger.debug(
+                    f"Balance check for {signer.address} on {self.chain} failed: "
+                    f"{balance}"
+                )
+                continue
+            signer.balance_checked_at = time.time()
+            self._set_balance(signer, balance)
+
+    def _set_balance(self, signer: Signer, balance: int):
+        signer.balance = balance
+        funded = balance >= self.min_balance
+        if funded != signer.funded:
+            if funded:
+                logger.info(
+                    f"Signer {signer.address} on {self.chain} is funded again, back in "
+                    "rotation"
+                )
+            else:
+                logger.warning(
+                    f"⚠️ Signer {signer.address} on {self.chain} is low on gas "
+                    f"({balance} wei), out of rotation"
+                )
+            signer.funded = funded
+
+    async def _balance_loop(self):
+        while True:
+            try:
+                await self.refresh_balances()
+            except Exception as e:
+                logger.error(f"Error refreshing signer balances on {self.chain}: {e}")
+            await asyncio.sleep(self.balance_interval)
@@ -0,0 +1,180 @@
+"""
+Transfer status streaming
+Status changes recorded by the relayer are pushed to subscribers (SSE and
+WebSocket clients) keyed by source transaction hash. Fan-out is in memory with
+a small bounded buffer per subscriber; with Redis configured, changes are
+published on a pub/sub channel so clients connected to any API process see
+transfers relayed by any worker.
+"""
+
+import asyncio
+import json
+import logging
+from collections import deque
+from typing import Deque, Dict, Iterable, Optional, Set
+
+from redis.asyncio import Redis
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ("completed", "failed")
+
+
+class Subscription:
+    """One client's view of the stream for a set of source transactions"""
+
+    def __init__(
+        self, stream: "StatusStream", tx_hashes: Iterable[str], buffer_size: int
+    ):
+        self.stream = stream
+        self.tx_hashes: Set[str] = set()
+        # Statuses are full snapshots, so on overflow the oldest is dropped
+        self._buffer: Deque[Dict] = deque(maxlen=buffer_size)
+        self._ready = asyncio.Event()
+        self.dropped = 0
+        for tx_hash in tx_hashes:
+            self.add(tx_hash)
+
+    def add(self, tx_hash: str):
+        self.tx_hashes.add(tx_hash.lower())
+        self.stream._subscribers.setdefault(tx_hash.lower(), set()).add(self)
+
+    def remove(self, tx_hash: str):
+        tx_hash = tx_hash.lower()
+        self.tx_hashes.discard(tx_hash)
+        subscribers = self.stream._subscribers.get(tx_hash)
+        if subscribers is not None:
+            subscribers.discard(self)
+            if not subscribers:
+                del self.stream._subscribers[tx_hash]
+
+    def close(self):
+        for tx_hash in list(self.tx_hashes):
+            self.remove(tx_hash)
+
+    def push(self, status: Dict):
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped += 1
+        self._buffer.append(status)
+        self._ready.set()
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Dict]:
+        """Next status, or None if nothing arrives within ``timeout`` seconds"""
+        if not self._buffer:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        return self._buffer.popleft()
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class StatusStream:
+    """Fans transfer status changes out to subscribers, optionally through Redis"""
+
+    def __init__(
+        self,
+        redis: Optional[Redis] = None,
+        channel: str = "relayer:status",
+        buffer_size: int = 16,
+        max_pending_publishes: int = 10_000,
+    ):
+        """
+        Args:
+            redis: Redis client (redis.asyncio) for fan-out across processes;
+                in-memory only if None
+            channel: Pub/sub channel name
+            buffer_size: Statuses buffered per subscriber before the oldest is dropped
+            max_pending_publishes: Statuses waiting to be sent to Redis before new
+                ones are dropped
+        """
+        self.redis = redis
+        self.channel = channel
+        self.buffer_size = buffer_size
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._outbox: Optional[asyncio.Queue] = (
+            asyncio.Queue(max_pending_publishes) if redis else None
+        )
+        self._tasks = []
+        self.published = 0
+
+    @property
+    def subscribers(self) -> int:
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    async def start(self):
+        if self.redis and not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._publish_loop()),
+                asyncio.create_task(self._listen_loop()),
+            ]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def subscribe(self, *tx_hashes: str) -> Subscription:
+        return Subscription(self, tx_hashes, self.buffer_size)
+
+    def emit(self, status: Dict):
+        """Record a status change (never blocks the caller)"""
+        self.published += 1
+        if self._outbox is None:
+            self.deliver(status)
+            return
+        try:
+            self._outbox.put_nowait(status)
+        except asyncio.QueueFull:
+            logger.warning(
+                "Status stream backlog full, dropping update for "
+                f"{status.get('tx_hash')}"
+            )
+
+    def deliver(self, status: Dict):
+        """Push a status to this process's subscribers of its source transaction"""
+        for subscription in self._subscribers.get(
+            str(status.get("tx_hash", "")).lower(), ()
+        ):
+            subscription.push(status)
+
+    async def _publish_loop(self):
+        while True:
+            status = await self._outbox.get()
+            try:
+                await self.redis.publish(self.channel, json.dumps(status))
+            except Exception as e:
+                logger.warning(
+                    f"Publishing status to Redis failed, delivering locally: {e}"
+                )
+                self.deliver(status)
+
+    async def _listen_loop(self):
+        while True:
+            try:
+                async with self.redis.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    async for message in pubsub.listen():
+                        if message.get("type") == "message":
+                            self.deliver(json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Status stream subscription failed: {e}")
+                await asyncio.sleep(1)
+
+
+def create_status_stream() -> StatusStream:
+    """Status stream shared across processes through RELAYER_REDIS_URL, if set"""
+    if not settings.RELAYER_REDIS_URL:
+        return StatusStream()
+    return StatusStream(Redis.from_url(settings.RELAYER_REDIS_URL))
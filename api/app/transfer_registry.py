@@ -0,0 +1,285 @@
+"""
+In-memory transfer registry bucketed by status
+Active transfers live in one bucket per TransferStatus so the relayer loops
+only touch the transfers they act on; terminal transfers are evicted into a
+compact archive after a TTL or size cap so memory tracks active volume.
+Counts per status are kept up to date on every transition, and a creation-time
+index serves newest-first pages without sorting the history per request.
+"""
+
+import time
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+# Position in the creation-time index: (created_at timestamp, tx hash, message index)
+SortKey = Tuple[float, str, int]
+
+
+def utc_timestamp(moment: datetime) -> float:
+    """POSIX timestamp of a naive UTC datetime (how transfers store times)"""
+    return moment.replace(tzinfo=timezone.utc).timestamp()
+
+
+def utc_datetime(timestamp: float) -> datetime:
+    """Naive UTC datetime for a POSIX timestamp"""
+    return datetime.fromtimestamp(timestamp, timezone.utc).replace(tzinfo=None)
+
+
+class ArchivedTransfer(NamedTuple):
+    """Compact record of an evicted terminal transfer"""
+
+    tx_hash: str
+    message_index: int
+    status: str
+    source_domain: int
+    dest_domain: int
+    amount: int
+    recipient: str
+    event_nonce: Optional[str]
+    completion_tx_hash: Optional[str]
+    created_at: float
+    completed_at: Optional[float]
+
+
+class TransferRegistry:
+    """Mapping of transfer key -> transfer with O(1) status bucket moves
+
+    Behaves like a read-only dict of live transfers (``get``, ``in``, ``len``,
+    iteration), plus status buckets, a per-destination ATTESTED index, an
+    archive of evicted terminal transfers, running totals per status and a
+    creation-time index over live and archived transfers.
+    """
+
+    def __init__(
+        self,
+        statuses,
+        terminal_statuses,
+        attested_status,
+        terminal_ttl: float = 3600,
+        max_terminal: int = 10_000,
+        max_archived: int = 100_000,
+    ):
+        """
+        Args:
+            statuses: All status values (one bucket each)
+            terminal_statuses: Statuses eligible for eviction
+            attested_status: Status indexed per destination domain
+            terminal_ttl: Seconds a terminal transfer stays live before eviction
+            max_terminal: Maximum live terminal transfers before the oldest are evicted
+            max_archived: Maximum archived records kept (older ones live only in
+                the store)
+        """
+        self.buckets: Dict[object, Dict[str, object]] = {
+            status: {} for status in statuses
+        }
+        self.terminal_statuses = frozenset(terminal_statuses)
+        self.attested_status = attested_status
+        self.terminal_ttl = terminal_ttl
+        self.max_terminal = max_terminal
+        self.max_archived = max_archived
+
+        self._transfers: Dict[str, object] = {}
+        self._attested_by_domain: Dict[int, Dict[str, object]] = {}
+        # Terminal transfers in the order they finished, with the time they did
+        self._terminal: "OrderedDict[str, float]" = OrderedDict()
+        self.archive: "OrderedDict[str, ArchivedTransfer]" = OrderedDict()
+
+        # Every transfer seen by status, including ones dropped from the archive
+        self.totals: Dict[object, int] = {status: 0 for status in statuses}
+        # Summed amounts of terminal transfers by status (amounts are final by then)
+        self.volumes: Dict[object, int] = {status: 0 for status in terminal_statuses}
+        self._by_value = {
+            getattr(status, "value", status): status for status in statuses
+        }
+        # (created_at, tx_hash, message_index, key) of live and archived
+        # transfers, ascending
+        self._by_created: List[Tuple[float, str, int, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._transfers)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._transfers
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._transfers)
+
+    def __getitem__(self, key: str):
+        return self._transfers[key]
+
+    def get(self, key: str, default=None):
+        return self._transfers.get(key, default)
+
+    def keys(self):
+        return self._transfers.keys()
+
+    def values(self):
+        return self._transfers.values()
+
+    def add(self, transfer):
+        """Register (or replace) a live transfer"""
+        existing = self._transfers.get(transfer.key)
+        archived = self.archive.pop(transfer.key, None)
+        if existing is not None:
+            self._unindex(existing)
+            self._uncount(existing.status, existing.amount)
+            self._unsort(self._sort_key(existing), transfer.key)
+        elif archived is not None:
+            self._uncount(self._by_value[archived.status], archived.amount)
+            self._unsort(
+                (archived.created_at, archived.tx_hash, archived.message_index),
+                transfer.key,
+            )
+        self._transfers[transfer.key] = transfer
+        self._index(transfer)
+        self._count(transfer.status, transfer.amount)
+        insort(self._by_created, (*self._sort_key(transfer), transfer.key))
+
+    def remove(self, key: str):
+        """Forget a live transfer without archiving it (another worker took it over)"""
+        transfer = self._transfers.pop(key, None)
+        if transfer is not None:
+            self._unindex(transfer)
+            self._uncount(transfer.status, transfer.amount)
+            self._unsort(self._sort_key(transfer), key)
+
+    def set_status(self, transfer, status):
+        """Move a transfer to another status bucket"""
+        if transfer.key in self._transfers:
+            self._unindex(transfer)
+            self._uncount(transfer.status, transfer.amount)
+            transfer.status = status
+            self._index(transfer)
+            self._count(status, transfer.amount)
+        else:
+            transfer.status = status
+
+    def add_history(self, status, count: int, volume: int = 0):
+        """Count transfers finished before this registry existed (e.g. in the store)"""
+        self.totals[status] += count
+        if status in self.volumes:
+            self.volumes[status] += volume
+
+    def newest(
+        self,
+        before: Optional[SortKey] = None,
+        since: Optional[float] = None,
+    ) -> Iterator[Tuple[SortKey, Union[object, ArchivedTransfer]]]:
+        """Live and archived transfers newest first, from just past ``before``
+        down to ``since`` (a created_at timestamp), with their index positions"""
+        position = (
+            bisect_left(self._by_created, before)
+            if before is not None
+            else len(self._by_created)
+        )
+        for i in range(position - 1, -1, -1):
+            created_at, tx_hash, message_index, key = self._by_created[i]
+            if since is not None and created_at < since:
+                return
+            record = self._transfers.get(key) or self.archive.get(key)
+            if record is not None:
+                yield (created_at, tx_hash, message_index), record
+
+    def bucket(self, status) -> Dict[str, object]:
+        """Live transfers in ``status`` (do not mutate)"""
+        return self.buckets[status]
+
+    def count(self, status) -> int:
+        return len(self.buckets[status])
+
+    def attested_for_domain(self, dest_domain: int) -> Dict[str, object]:
+        return self._attested_by_domain.get(dest_domain, {})
+
+    def attested(self) -> List[object]:
+        """Every ATTESTED transfer, grouped by destination domain"""
+        return [
+            t
+            for by_domain in self._attested_by_domain.values()
+            for t in by_domain.values()
+        ]
+
+    def get_archived(self, key: str) -> Optional[ArchivedTransfer]:
+        return self.archive.get(key)
+
+    def evict(self, now: Optional[float] = None) -> int:
+        """Archive terminal transfers past their TTL or beyond the size cap"""
+        if now is None:
+            now = time.time()
+        cutoff = now - self.terminal_ttl
+        evicted = 0
+        while self._terminal:
+            key, finished_at = next(iter(self._terminal.items()))
+            if finished_at > cutoff and len(self._terminal) <= self.max_terminal:
+                break
+            self._archive(self._transfers[key])
+            evicted += 1
+        return evicted
+
+    def _archive(self, transfer):
+        self._unindex(transfer)
+        del self._transfers[transfer.key]
+        self.archive[transfer.key] = ArchivedTransfer(
+            tx_hash=transfer.tx_hash,
+            message_index=transfer.message_index,
+            status=transfer.status.value,
+            source_domain=transfer.source_domain,
+            dest_domain=transfer.dest_domain,
+            amount=transfer.amount,
+            recipient=transfer.recipient,
+            event_nonce=str(transfer.event_nonce)
+            if transfer.event_nonce is not None
+            else None,
+            completion_tx_hash=transfer.completion_tx_hash,
+            created_at=utc_timestamp(transfer.created_at),
+            completed_at=utc_timestamp(transfer.completed_at)
+            if transfer.completed_at
+            else None,
+        )
+        while len(self.archive) > self.max_archived:
+            key, dropped = self.archive.popitem(last=False)
+            self._unsort(
+                (dropped.created_at, dropped.tx_hash, dropped.message_index), key
+            )
+
+    def _index(self, transfer):
+        self.buckets[transfer.status][transfer.key] = transfer
+        if transfer.status == self.attested_status:
+            self._attested_by_domain.setdefault(transfer.dest_domain, {})[
+                transfer.key
+            ] = transfer
+        if transfer.status in self.terminal_statuses:
+            self._terminal[transfer.key] = time.time()
+
+    def _unindex(self, transfer):
+        self.buckets[transfer.status].pop(transfer.key, None)
+        if transfer.status == self.attested_status:
+            by_domain = self._attested_by_domain.get(transfer.dest_domain)
+            if by_domain is not None:
+                by_domain.pop(transfer.key, None)
+        self._terminal.pop(transfer.key, None)
+
+    def _count(self, status, amount: int):
+        self.totals[status] += 1
+        if status in self.volumes:
+            self.volumes[status] += amount or 0
+
+    def _uncount(self, status, amount: int):
+        self.totals[status] -= 1
+        if status in self.volumes:
+            self.volumes[status] -= amount or 0
+
+    @staticmethod
+    def _sort_key(transfer) -> SortKey:
+        return (
+            utc_timestamp(transfer.created_at),
+            transfer.tx_hash,
+            transfer.message_index,
+        )
+
+    def _unsort(self, sort_key: SortKey, key: str):
+        entry = (*sort_key, key)
+        i = bisect_left(self._by_created, entry)
+        if i < len(self._by_created) and self._by_created[i] == entry:
+            del self._by_created[i]
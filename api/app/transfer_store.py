@@ -0,0 +1,353 @@
+"""
+Durable storage for relayer transfers
+SQLite (WAL) for single-node deployments and Postgres for shared ones, both
+through SQLAlchemy's async engine. State transitions are written behind in
+batches so the relayer loops never wait on the database.
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    DateTime,
+    Float,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Text,
+    and_,
+    event,
+    func,
+    or_,
+    select,
+)
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+logger = logging.getLogger(__name__)
+
+metadata = MetaData()
+
+transfers_table = Table(
+    "relayer_transfers",
+    metadata,
+    Column("tx_hash", String(80), primary_key=True),
+    # Position of the message among those emitted by the source transaction
+    Column("message_index", Integer, primary_key=True, default=0),
+    Column("source_domain", Integer, nullable=False),
+    Column("dest_domain", Integer, nullable=False),
+    Column("amount", BigInteger, nullable=False, default=0),
+    Column("recipient", String(66), nullable=False, default=""),
+    Column("status", String(16), nullable=False),
+    Column("message", Text),
+    Column("attestation", Text),
+    Column("event_nonce", String(80)),
+    Column("completion_tx_hash", String(80)),
+    Column("created_at", DateTime, nullable=False),
+    Column("completed_at", DateTime),
+    Column("next_poll_at", Float),
+    Index("ix_relayer_transfers_status_next_poll_at", "status", "next_poll_at"),
+    Index("ix_relayer_transfers_status_dest_domain", "status", "dest_domain"),
+    Index("ix_relayer_transfers_created_at", "created_at"),
+    # Filtered history pages (see TransferStore.page)
+    Index("ix_relayer_transfers_status_created_at", "status", "created_at"),
+    Index("ix_relayer_transfers_dest_domain_created_at", "dest_domain", "created_at"),
+)
+
+# Last block scanned for burns per source chain (see burn_scanner)
+checkpoints_table = Table(
+    "relayer_scan_checkpoints",
+    metadata,
+    Column("chain_id", Integer, primary_key=True, autoincrement=False),
+    Column("block_number", BigInteger, nullable=False),
+    Column("updated_at", DateTime, nullable=False),
+)
+
+# Columns written on every flush (everything but the primary key)
+_UPDATE_COLUMNS = [c.name for c in transfers_table.columns if not c.primary_key]
+
+
+class TransferStore:
+    """Indexed transfer repository with batched write-behind
+
+    ``mark_dirty`` only records the transfer; a background task upserts all
+    dirty transfers in one transaction every ``flush_interval`` seconds (or
+    sooner once ``flush_batch_size`` transfers are waiting).
+    """
+
+    def __init__(
+        self,
+        database_url: str,
+        flush_interval: float = 0.5,
+        flush_batch_size: int = 500,
+        read_only: bool = False,
+    ):
+        """
+        Args:
+            database_url: SQLAlchemy async URL
+            flush_interval: Seconds between write-behind flushes
+            flush_batch_size: Waiting transfers that trigger an early flush
+            read_only: Only query the store (API processes in front of relayer
+                workers): no table creation and no write-behind task
+        """
+        self.database_url = database_url
+        self.read_only = read_only
+        self.flush_interval = flush_interval
+        self.flush_batch_size = flush_batch_size
+        self.engine: AsyncEngine = create_async_engine(database_url)
+        self._dirty: Dict[str, Any] = {}
+        self._flush_now = asyncio.Event()
+        self._flush_task: Optional[asyncio.Task] = None
+
+        if self.engine.dialect.name == "sqlite":
+            event.listen(self.engine.sync_engine, "connect", _enable_sqlite_wal)
+
+    async def start(self):
+        """Create tables if needed and start the write-behind task"""
+        if self.read_only:
+            logger.info(f"Transfer store ready, read-only ({self.engine.dialect.name})")
+            return
+        async with self.engine.begin() as conn:
+            await conn.run_sync(_create_schema)
+        self._flush_task = asyncio.create_task(self._flush_loop())
+        logger.info(f"Transfer store ready ({self.engine.dialect.name})")
+
+    async def stop(self):
+        """Flush outstanding writes and close the engine"""
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+        await self.engine.dispose()
+
+    def mark_dirty(self, transfer: Any):
+        """Queue a transfer's current state to be written"""
+        self._dirty[transfer.key] = transfer
+        if len(self._dirty) >= self.flush_batch_size:
+            self._flush_now.set()
+
+    async def flush(self):
+        """Write every dirty transfer in a single transaction"""
+        if not self._dirty:
+            return
+        # Snapshot rows now: transfers may keep changing while we await the DB
+        dirty, self._dirty = self._dirty, {}
+        rows = [transfer_row(transfer) for transfer in dirty.values()]
+        try:
+            async with self.engine.begin() as conn:
+                await conn.execute(self._upsert(), rows)
+        except BaseException:
+            # Keep the writes for the next flush (including one interrupted by
+            # shutdown) unless newer state has been queued since
+            for key, transfer in dirty.items():
+                self._dirty.setdefault(key, transfer)
+            raise
+
+    async def due_pending(self, until: float, limit: int = 1000) -> List[Dict]:
+        """PENDING transfers whose next poll is due by ``until``, earliest first"""
+        query = (
+            select(transfers_table)
+            .where(transfers_table.c.status == "pending")
+            .where(
+                (transfers_table.c.next_poll_at <= until)
+                | (transfers_table.c.next_poll_at.is_(None))
+            )
+            .order_by(transfers_table.c.next_poll_at)
+            .limit(limit)
+        )
+        return await self._fetch(query)
+
+    async def by_status(self, status: str, limit: Optional[int] = None) -> List[Dict]:
+        """Transfers in ``status``, oldest first"""
+        query = (
+            select(transfers_table)
+            .where(transfers_table.c.status == status)
+            .order_by(transfers_table.c.created_at)
+            .limit(limit)
+        )
+        return await self._fetch(query)
+
+    async def attested_for_domain(
+        self, dest_domain: int, limit: Optional[int] = None
+    ) -> List[Dict]:
+        """ATTESTED transfers bound for ``dest_domain``, oldest first"""
+        query = (
+            select(transfers_table)
+            .where(transfers_table.c.status == "attested")
+            .where(transfers_table.c.dest_domain == dest_domain)
+            .order_by(transfers_table.c.created_at)
+            .limit(limit)
+        )
+        return await self._fetch(query)
+
+    async def page(
+        self,
+        before: Optional[Tuple[datetime, str, int]] = None,
+        limit: int = 100,
+        status: Optional[str] = None,
+        source_domain: Optional[int] = None,
+        dest_domain: Optional[int] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> List[Dict]:
+        """Transfers newest first, continuing past ``before``
+
+        ``before`` is the (created_at, tx_hash, message_index) of the last row
+        of the previous page. Keyset pagination on the created_at index, or on
+        (status, created_at) / (dest_domain, created_at) when filtered by one of
+        those, so each page costs the same however much history precedes it.
+        """
+        c = transfers_table.c
+        query = select(transfers_table)
+        if status is not None:
+            query = query.where(c.status == status)
+        if source_domain is not None:
+            query = query.where(c.source_domain == source_domain)
+        if dest_domain is not None:
+            query = query.where(c.dest_domain == dest_domain)
+        if since is not None:
+            query = query.where(c.created_at >= since)
+        if until is not None:
+            query = query.where(c.created_at < until)
+        if before is not None:
+            created_at, tx_hash, message_index = before
+            query = query.where(
+                or_(
+                    c.created_at < created_at,
+                    and_(
+                        c.created_at == created_at,
+                        or_(
+                            c.tx_hash < tx_hash,
+                            and_(c.tx_hash == tx_hash, c.message_index < message_index),
+                        ),
+                    ),
+                )
+            )
+        query = query.order_by(
+            c.created_at.desc(), c.tx_hash.desc(), c.message_index.desc()
+        ).limit(limit)
+        return await self._fetch(query)
+
+    async def totals(self) -> Dict[str, Tuple[int, int]]:
+        """Transfer count and summed amount per status"""
+        c = transfers_table.c
+        rows = await self._fetch(
+            select(
+                c.status,
+                func.count().label("count"),
+                func.coalesce(func.sum(c.amount), 0).label("amount"),
+            ).group_by(c.status)
+        )
+        return {row["status"]: (row["count"], int(row["amount"])) for row in rows}
+
+    async def get(self, tx_hash: str, message_index: int = 0) -> Optional[Dict]:
+        rows = await self._fetch(
+            select(transfers_table)
+            .where(transfers_table.c.tx_hash == tx_hash)
+            .where(transfers_table.c.message_index == message_index)
+        )
+        return rows[0] if rows else None
+
+    async def get_checkpoint(self, chain_id: int) -> Optional[int]:
+        rows = await self._fetch(
+            select(checkpoints_table.c.block_number).where(
+                checkpoints_table.c.chain_id == chain_id
+            )
+        )
+        return rows[0]["block_number"] if rows else None
+
+    async def save_checkpoint(self, chain_id: int, block_number: int):
+        """Record the last scanned block for a chain (written immediately)"""
+        insert = self._insert(checkpoints_table)
+        stmt = insert.values(
+            chain_id=chain_id, block_number=block_number, updated_at=datetime.utcnow()
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[checkpoints_table.c.chain_id],
+            set_={
+                "block_number": stmt.excluded.block_number,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+        async with self.engine.begin() as conn:
+            await conn.execute(stmt)
+
+    async def _fetch(self, query) -> List[Dict]:
+        async with self.engine.connect() as conn:
+            result = await conn.execute(query)
+            return [dict(row._mapping) for row in result]
+
+    def _insert(self, table: Table):
+        if self.engine.dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        return insert(table)
+
+    def _upsert(self):
+        stmt = self._insert(transfers_table)
+        return stmt.on_conflict_do_update(
+            index_elements=[transfers_table.c.tx_hash, transfers_table.c.message_index],
+            set_={name: stmt.excluded[name] for name in _UPDATE_COLUMNS},
+        )
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_now.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_now.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Error flushing transfer store: {e}")
+
+
+def _create_schema(conn):
+    """Create missing tables, and indexes added since an existing table was made"""
+    metadata.create_all(conn)
+    for table in metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+
+def _enable_sqlite_wal(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+
+def _to_hex(value: Optional[bytes]) -> Optional[str]:
+    return "0x" + value.hex() if value is not None else None
+
+
+def transfer_row(transfer: Any) -> Dict:
+    return {
+        "tx_hash": transfer.tx_hash,
+        "message_index": transfer.message_index,
+        "source_domain": transfer.source_domain,
+        "dest_domain": transfer.dest_domain,
+        "amount": transfer.amount or 0,
+        "recipient": transfer.recipient or "",
+        "status": transfer.status.value,
+        "message": _to_hex(transfer.message),
+        "attestation": _to_hex(transfer.attestation),
+        "event_nonce": str(transfer.event_nonce)
+        if transfer.event_nonce is not None
+        else None,
+        "completion_tx_hash": transfer.completion_tx_hash,
+        "created_at": transfer.created_at,
+        "completed_at": transfer.completed_at,
+        "next_poll_at": transfer.next_poll_at,
+    }
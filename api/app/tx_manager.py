@@ -0,0 +1,219 @@
+"""
+Relayer transaction lifecycle
+Watches each sent transaction until a version of it is mined. A transaction
+still pending after its chain's deadline is re-signed at the same nonce with
+higher fees (up to a cap), and whichever version lands is reported, so a mint
+stuck behind a fee spike is pushed through instead of timing out.
+"""
+
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+from web3 import AsyncWeb3
+
+from app import metrics
+from app.fee_oracle import FeeOracle
+from app.nonce_manager import is_nonce_too_low
+from app.receipt_tracker import ReceiptTracker
+from app.signer_pool import Signer
+
+logger = logging.getLogger(__name__)
+
+# Seconds without a receipt before a transaction is replaced, per chain: a few
+# blocks on L1s, longer than a sequencer hiccup on L2s
+BUMP_AFTER = {
+    "ethereum": 36,
+    "polygon": 15,
+    "avalanche": 8,
+    "arbitrum": 10,
+    "base": 10,
+    "optimism": 10,
+}
+DEFAULT_BUMP_AFTER = 15
+
+FEE_FIELDS = ("maxFeePerGas", "maxPriorityFeePerGas", "gasPrice")
+
+# Nodes only accept a replacement paying at least 10% more on every fee field
+MIN_REPLACEMENT_BUMP = 1.1
+
+# Node errors meaning the same or a better version is already in the mempool
+ALREADY_KNOWN_ERRORS = ("already known", "known transaction", "alreadyknown")
+UNDERPRICED_ERRORS = ("underpriced", "fee too low", "feetoolow")
+
+
+@dataclass
+class SentTransaction:
+    """A relayer transaction and every version of it broadcast so far"""
+
+    chain: str
+    signer: Signer
+    tx: Dict
+    # Hash of each broadcast version, oldest first
+    hashes: List[bytes]
+    sent_at: float = field(default_factory=time.time)
+    replacements: int = 0
+    # Fees reached the cap; no further replacements
+    capped: bool = False
+
+    @property
+    def nonce(self) -> int:
+        return self.tx["nonce"]
+
+    @property
+    def tx_hash(self) -> bytes:
+        """Latest version"""
+        return self.hashes[-1]
+
+
+class TransactionManager:
+    """Confirms a chain's relayer transactions, replacing stuck ones with higher fees"""
+
+    def __init__(
+        self,
+        chain: str,
+        web3: AsyncWeb3,
+        fee_oracle: FeeOracle,
+        receipts: ReceiptTracker,
+        bump_after: Optional[float] = None,
+        fee_bump: float = 1.125,
+        max_fee_multiplier: float = 3.0,
+        max_replacements: int = 5,
+        timeout: float = 900.0,
+    ):
+        """
+        Args:
+            chain: Chain name
+            web3: Client for the chain
+            fee_oracle: Current fees; a replacement pays at least these
+            receipts: The chain's shared receipt tracker
+            bump_after: Seconds without a receipt before replacing (defaults to
+                BUMP_AFTER for the chain)
+            fee_bump: Fee multiplier per replacement (at least MIN_REPLACEMENT_BUMP)
+            max_fee_multiplier: Cap on fees relative to the first version
+            max_replacements: Most replacements per transaction
+            timeout: Seconds before giving up on a transaction entirely
+        """
+        self.chain = chain
+        self.web3 = web3
+        self.fee_oracle = fee_oracle
+        self.receipts = receipts
+        self.bump_after = (
+            bump_after
+            if bump_after is not None
+            else BUMP_AFTER.get(chain, DEFAULT_BUMP_AFTER)
+        )
+        self.fee_bump = fee_bump
+        self.max_fee_multiplier = max_fee_multiplier
+        self.max_replacements = max_replacements
+        self.timeout = timeout
+        self.replaced = 0
+        # Nonces being confirmed, by signer address
+        self._watching: Dict[str, Set[int]] = {}
+
+    def watching(self, address: str) -> Set[int]:
+        """Nonces of ``address`` whose transactions are still being confirmed"""
+        return self._watching.get(address, set())
+
+    async def confirm(self, sent: SentTransaction):
+        """Wait until a version of ``sent`` is mined and return its receipt
+
+        Raises:
+            TimeoutError: Nothing was mined within ``timeout``
+            ValueError: The nonce was consumed by a transaction other than ours
+        """
+        # Until this returns, a dropped version is rebroadcast here rather
+        # than filled as a nonce gap
+        watching = self._watching.setdefault(sent.signer.address, set())
+        watching.add(sent.nonce)
+        try:
+            # Fees of the first version, the basis for the cap
+            original = {key: sent.tx[key] for key in FEE_FIELDS if key in sent.tx}
+            next_bump_at = sent.sent_at + self.bump_after
+            give_up_at = sent.sent_at + self.timeout
+            nonce_consumed = False
+
+            while True:
+                wait = max(0.0, min(next_bump_at, give_up_at) - time.time())
+                receipt = await self.receipts.wait(sent.hashes, timeout=wait)
+                if receipt is not None:
+                    if len(sent.hashes) > 1:
+                        logger.info(
+                            f"Nonce {sent.nonce} on {self.chain} mined as "
+                            f"{receipt['transactionHash'].hex()} ({len(sent.hashes)} "
+                            "versions sent)"
+                        )
+                    return receipt
+
+                now = time.time()
+                if now >= give_up_at:
+                    raise TimeoutError(
+                        f"No receipt for nonce {sent.nonce} on {self.chain} after "
+                        f"{self.timeout:.0f}s"
+                    )
+                if now < next_bump_at:
+                    continue
+                if nonce_consumed:
+                    # A version would have shown up by now (receipts can lag a block)
+                    raise ValueError(
+                        f"Nonce {sent.nonce} on {self.chain} was used by another "
+                        "transaction"
+                    )
+                if sent.replacements < self.max_replacements and not sent.capped:
+                    nonce_consumed = await self._replace(sent, original)
+                next_bump_at = now + self.bump_after
+        finally:
+            watching.discard(sent.nonce)
+
+    async def _replace(self, sent: SentTransaction, original: Dict[str, int]) -> bool:
+        """Send a higher-fee version at the same nonce; True if it is mined already"""
+        current = (await self.fee_oracle.quote()).tx_params()
+        fees = {}
+        for key, value in original.items():
+            cap = int(value * self.max_fee_multiplier)
+            fees[key] = min(
+                cap, max(int(sent.tx[key] * self.fee_bump) + 1, current.get(key, 0))
+            )
+            if fees[key] < sent.tx[key] * MIN_REPLACEMENT_BUMP:
+                if not sent.capped:
+                    sent.capped = True
+                    logger.warning(
+                        f"⚠️ Nonce {sent.nonce} on {self.chain} is at the fee cap "
+                        f"({self.max_fee_multiplier}x), waiting without replacing"
+                    )
+                return False
+        if "maxPriorityFeePerGas" in fees:
+            fees["maxPriorityFeePerGas"] = min(
+                fees["maxPriorityFeePerGas"], fees["maxFeePerGas"]
+            )
+
+        tx = {**sent.tx, **fees}
+        signed = sent.signer.account.sign_transaction(tx)
+        try:
+            tx_hash = await self.web3.eth.send_raw_transaction(signed.rawTransaction)
+        except Exception as e:
+            if is_nonce_too_low(e):
+                return True
+            message = str(e).lower()
+            if any(fragment in message for fragment in UNDERPRICED_ERRORS):
+                # Still below what the node wants: the next attempt starts from
+                # these fees
+                sent.tx = tx
+            elif not any(fragment in message for fragment in ALREADY_KNOWN_ERRORS):
+                logger.warning(
+                    f"Replacing nonce {sent.nonce} on {self.chain} failed: {e}"
+                )
+            return False
+
+        sent.tx = tx
+        sent.hashes.append(tx_hash)
+        sent.replacements += 1
+        sent.signer.nonces.mark_sent(sent.nonce)
+        self.replaced += 1
+        metrics.TX_REPLACEMENTS.inc(self.chain)
+        logger.info(
+            f"⛽ Replaced stuck nonce {sent.nonce} on {self.chain} with higher fees: "
+            f"{tx_hash.hex()}"
+        )
+        return False
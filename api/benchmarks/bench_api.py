@@ -0,0 +1,377 @@
+"""
+API benchmark: request throughput, latency and allocations per endpoint
+
+Calls the FastAPI app from app.main in-process through httpx's ASGI transport
+(no sockets), at a fixed concurrency, for the routing endpoints in app.routes
+and the relayer endpoints in app.relayer_routes. The relayer endpoints are
+served by an embedded relayer that is never started, holding synthetic
+transfers.
+
+Results are compared with the baseline committed in benchmarks/baselines.
+Allocations are repeatable anywhere, so --check fails on allocation
+regressions only. Timings depend on the machine (and on shared runners vary
+by tens of percent even as best of several rounds): they are gated only when
+--timing-tolerance is given, against a baseline refreshed on the same machine.
+
+    cd api && python -m benchmarks.bench_api
+    cd api && python -m benchmarks.bench_api --check  # CI: allocations
+    cd api && python -m benchmarks.bench_api --check --timing-tolerance 0.25
+    cd api && python -m benchmarks.bench_api --update-baseline
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import httpx
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines", "api.json")
+
+# Metrics compared against the baseline, and whether higher is better
+TIMINGS = ("requests_per_second", "latency_p50_ms", "latency_p99_ms")
+COMPARED = {
+    "requests_per_second": True,
+    "latency_p50_ms": False,
+    "latency_p99_ms": False,
+    "alloc_peak_kib": False,
+}
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    path: str
+    body: Optional[Dict] = None
+    params: Dict = field(default_factory=dict)
+
+
+def scenarios(tx_hash: str) -> List[Scenario]:
+    quote = {
+        "source_token": "USDC",
+        "dest_token": "PYUSD",
+        "source_chain": 1,
+        "dest_chain": 42161,
+        "amount": "1000000000",
+    }
+    prepare = {
+        "recipient": "0x" + "11" * 20,
+        "amount": "1000000000",
+        "source_token": "USDC",
+        "source_chain": 1,
+        "dest_token": "USDC",
+        "dest_chain": 42161,
+    }
+    return [
+        Scenario("chains", "GET", "/api/v1/chains"),
+        Scenario("quote", "POST", "/api/v1/quote", body=quote),
+        Scenario("pools", "GET", "/api/v1/pools"),
+        Scenario(
+            "transaction_prepare", "POST", "/api/v1/transaction/prepare", body=prepare
+        ),
+        Scenario("relayer_status", "GET", f"/relayer/status/{tx_hash}"),
+        Scenario(
+            "relayer_monitor",
+            "POST",
+            "/relayer/monitor",
+            body={"tx_hash": tx_hash, "source_chain": "base", "dest_chain": "arbitrum"},
+        ),
+        Scenario(
+            "relayer_transfers", "GET", "/relayer/transfers", params={"limit": 50}
+        ),
+        Scenario(
+            "relayer_transfers_filtered",
+            "GET",
+            "/relayer/transfers",
+            params={"limit": 50, "status": "completed", "dest_domain": 3},
+        ),
+        Scenario("relayer_stats", "GET", "/relayer/stats"),
+        Scenario("relayer_health", "GET", "/relayer/health"),
+    ]
+
+
+def install_relayer(transfers: int, seed: int) -> str:
+    """Point the relayer routes at an unstarted relayer with synthetic transfers
+
+    Returns the tx hash of one of them.
+    """
+    from app import relayer_routes
+    from app.cctp_relayer import CCTPRelayer, CCTPTransfer, TransferStatus
+    from app.relayer_client import LocalRelayerClient
+    from app.status_stream import StatusStream
+
+    rng = random.Random(seed)
+    relayer = CCTPRelayer("0x" + "01" * 32)
+    started = datetime.utcnow() - timedelta(days=1)
+    statuses = [TransferStatus.COMPLETED] * 8 + [
+        TransferStatus.PENDING,
+        TransferStatus.FAILED,
+    ]
+    for i in range(transfers):
+        transfer = CCTPTransfer(
+            tx_hash=f"0x{i:064x}",
+            source_domain=6,
+            dest_domain=rng.choice([0, 2, 3, 7]),
+            amount=rng.randint(1, 10**6) * 10**6,
+            recipient="0x" + "22" * 20,
+            status=TransferStatus.PENDING,
+            event_nonce="0x" + f"{i:064x}",
+            created_at=started + timedelta(seconds=i),
+        )
+        relayer.transfers.add(transfer)
+        relayer._set_status(transfer, rng.choice(statuses))
+    relayer_routes.relayer = relayer
+    relayer_routes.relayer_client = LocalRelayerClient(relayer)
+    relayer_routes.status_stream = StatusStream()
+    return f"0x{transfers // 2:064x}"
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def measure(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    requests: int,
+    concurrency: int,
+    warmup: int,
+    rounds: int,
+) -> Dict:
+    async def call():
+        response = await client.request(
+            scenario.method, scenario.path, json=scenario.body, params=scenario.params
+        )
+        if response.status_code >= 400:
+            raise RuntimeError(
+                f"{scenario.name}: HTTP {response.status_code} {response.text[:200]}"
+            )
+
+    for _ in range(warmup):
+        await call()
+
+    # Allocations, one request at a time: peak traced memory above the
+    # starting point, and memory still held afterwards
+    samples = min(requests, 200)
+    tracemalloc.start()
+    start_size, _ = tracemalloc.get_traced_memory()
+    peaks = []
+    for _ in range(samples):
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        await call()
+        _, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - before)
+    end_size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Throughput and latency at the requested concurrency; the best of
+    # several rounds, which is far less noisy than any single one
+    best = {
+        "requests_per_second": 0.0,
+        "latency_p50_ms": float("inf"),
+        "latency_p99_ms": float("inf"),
+    }
+    for _ in range(rounds):
+        latencies: List[float] = []
+        remaining = requests
+
+        async def worker(latencies: List[float] = latencies):
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                started = time.perf_counter()
+                await call()
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        best["requests_per_second"] = max(
+            best["requests_per_second"], requests / elapsed
+        )
+        best["latency_p50_ms"] = min(
+            best["latency_p50_ms"], percentile(latencies, 0.50) * 1000
+        )
+        best["latency_p99_ms"] = min(
+            best["latency_p99_ms"], percentile(latencies, 0.99) * 1000
+        )
+
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "requests_per_second": round(best["requests_per_second"], 1),
+        "latency_p50_ms": round(best["latency_p50_ms"], 3),
+        "latency_p99_ms": round(best["latency_p99_ms"], 3),
+        "alloc_peak_kib": round(sum(peaks) / len(peaks) / 1024, 1),
+        "retained_bytes_per_request": round((end_size - start_size) / samples),
+    }
+
+
+async def run(args) -> Dict[str, Dict]:
+    from app.main import app
+
+    tx_hash = install_relayer(args.transfers, args.seed)
+    transport = httpx.ASGITransport(app=app)
+    results = {}
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        for scenario in scenarios(tx_hash):
+            if args.only and scenario.name not in args.only:
+                continue
+            results[scenario.name] = await measure(
+                client,
+                scenario,
+                args.requests,
+                args.concurrency,
+                args.warmup,
+                args.rounds,
+            )
+    return results
+
+
+def report(
+    results: Dict[str, Dict],
+    baseline: Dict[str, Dict],
+    tolerance: float,
+    timing_tolerance: Optional[float] = None,
+) -> bool:
+    """Print results with changes against ``baseline``
+
+    Returns False if allocations regressed beyond ``tolerance``, or timings
+    beyond ``timing_tolerance`` (timings are not gated if it is None).
+    """
+    ok = True
+    print(
+        f"{'endpoint':28} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'alloc KiB':>10} "
+        f"{'retained B':>11}"
+    )
+    for name, result in results.items():
+        print(
+            f"{name:28} {result['requests_per_second']:>9} "
+            f"{result['latency_p50_ms']:>8} "
+            f"{result['latency_p99_ms']:>8} {result['alloc_peak_kib']:>10} "
+            f"{result['retained_bytes_per_request']:>11}"
+        )
+        before = baseline.get(name)
+        if not before:
+            continue
+        changes = []
+        for metric, higher_is_better in COMPARED.items():
+            if not before.get(metric):
+                continue
+            change = (result[metric] - before[metric]) / before[metric]
+            if metric in TIMINGS and timing_tolerance is None:
+                # Reported but not gated: timings vary from machine to machine
+                changes.append(f"{metric} {change:+.0%}")
+                continue
+            allowed = timing_tolerance if metric in TIMINGS else tolerance
+            regressed = (change < -allowed) if higher_is_better else (change > allowed)
+            ok = ok and not regressed
+            changes.append(
+                f"{metric} {change:+.0%}{' REGRESSION' if regressed else ''}"
+            )
+        print(f"{'':28} vs baseline: {', '.join(changes)}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--requests", type=int, default=1000, help="Requests per endpoint and round"
+    )
+    parser.add_argument(
+        "--rounds",
+        type=int,
+        default=5,
+        help="Rounds per endpoint; the best is reported",
+    )
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument(
+        "--transfers",
+        type=int,
+        default=10_000,
+        help="Synthetic transfers held by the relayer",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", nargs="*", help="Endpoints to run (scenario names)")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Save these results as the baseline",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Exit 1 if any endpoint's allocations regressed",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed relative allocation regression",
+    )
+    parser.add_argument(
+        "--timing-tolerance",
+        type=float,
+        help="Also fail --check on throughput/latency regressions beyond this "
+        "(only against a baseline from the same machine)",
+    )
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    results = asyncio.run(run(args))
+
+    parameters = {
+        k: getattr(args, k)
+        for k in ("requests", "rounds", "concurrency", "warmup", "transfers", "seed")
+    }
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("parameters") != parameters:
+            print(
+                "⚠️ Baseline was run with different parameters; numbers are not "
+                "comparable"
+            )
+    ok = report(
+        results,
+        baseline.get("results", {}),
+        args.tolerance,
+        timing_tolerance=args.timing_tolerance,
+    )
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(
+                {
+                    "parameters": parameters,
+                    "python": sys.version.split()[0],
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}")
+    if args.check and not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,369 @@
+"""
+Load test: relayer throughput and latency against local Iris and RPC stand-ins
+
+Drives synthetic burns through CCTPRelayer.add_transfer, with Circle's Iris
+API and every chain's JSON-RPC endpoint served by the fakes in
+benchmarks.fakes, and reports transfers per second, end-to-end latency
+percentiles, Iris responses, RPC calls per method and event loop lag.
+Results can be saved as JSON and compared with an earlier run, so a
+regression in the relayer loops shows up as a failing comparison.
+
+    cd api && python -m benchmarks.bench_relayer_load --transfers 2000
+    cd api && python -m benchmarks.bench_relayer_load --output before.json
+    cd api && python -m benchmarks.bench_relayer_load --baseline before.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from eth_account import Account
+from eth_utils import keccak
+
+from app.cctp_relayer import CCTPRelayer, TransferStatus, transfer_key
+from app.iris_client import IrisClient
+from app.status_stream import TERMINAL_STATUSES, StatusStream
+from benchmarks.fakes import FakeChain, FakeIris, ServerThread
+
+# Metrics compared against a baseline: (higher is better, fails the comparison
+# when it regresses); loop lag is too noisy between runs to gate on
+COMPARED = {
+    "transfers_per_second": (True, True),
+    "latency_p50": (False, True),
+    "latency_p99": (False, True),
+    "rpc_calls_per_transfer": (False, True),
+    "iris_requests_per_transfer": (False, True),
+    "loop_lag_p99": (False, False),
+}
+
+
+class CompletionRecorder(StatusStream):
+    """Status stream that records when each transfer reaches a terminal status"""
+
+    def __init__(self, expected: int):
+        super().__init__()
+        self.expected = expected
+        self.finished: Dict[str, Tuple[float, str]] = {}
+        self.done = asyncio.Event()
+
+    def emit(self, status: Dict):
+        key = transfer_key(status["tx_hash"], status["message_index"])
+        if status["status"] in TERMINAL_STATUSES and key not in self.finished:
+            self.finished[key] = (time.monotonic(), status["status"])
+            if len(self.finished) >= self.expected:
+                self.done.set()
+
+
+class LagSampler:
+    """Measures how late the event loop wakes a task that sleeps ``interval`` seconds"""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+
+    async def _run(self):
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.monotonic() - started - self.interval))
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def parse_routes(routes: str) -> List[Tuple[str, str]]:
+    pairs = []
+    for route in routes.split(","):
+        source, _, dest = route.partition("->")
+        for chain in (source, dest):
+            if chain not in CCTPRelayer.DOMAINS:
+                raise SystemExit(f"Unknown chain {chain!r} in route {route!r}")
+        pairs.append((source, dest))
+    return pairs
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args) -> Dict:
+    routes = parse_routes(args.routes)
+    chain_ids = {chain: chain_id for chain_id, chain in CCTPRelayer.CHAIN_IDS.items()}
+    iris = FakeIris(
+        attestation_delay=args.attestation_delay,
+        delay_jitter=args.attestation_jitter,
+        not_found_rate=args.not_found_rate,
+        throttle_rate=args.throttle_rate,
+        seed=args.seed,
+    )
+    chains = {
+        chain: FakeChain(
+            chain_ids[chain], block_time=args.block_time, latency=args.rpc_latency
+        )
+        for chain in CCTPRelayer.RPC_URLS
+    }
+    servers = ServerThread(iris, *chains.values())
+    servers.start()
+
+    recorder = CompletionRecorder(args.transfers)
+    relayer = CCTPRelayer(
+        Account.create().key.hex(),
+        iris_client=IrisClient(
+            iris.url, rate_limit=args.iris_rate, burst=args.iris_rate
+        ),
+        rpc_urls={chain: [fake.url + "/"] for chain, fake in chains.items()},
+        signer_keys=[Account.create().key.hex() for _ in range(args.signers - 1)],
+        status_stream=recorder,
+    )
+    lag = LagSampler()
+    try:
+        await relayer.start()
+        lag.start()
+
+        added: Dict[str, float] = {}
+        started = time.monotonic()
+        interval = 1 / args.rate if args.rate else 0.0
+        pending = []
+        for i in range(args.transfers):
+            source, dest = routes[i % len(routes)]
+            tx_hash = "0x" + keccak(text=f"bench-{args.seed}-{i}").hex()
+            iris.register(
+                tx_hash, CCTPRelayer.DOMAINS[source], CCTPRelayer.DOMAINS[dest]
+            )
+            added[tx_hash] = time.monotonic()
+            pending.append(
+                asyncio.create_task(relayer.add_transfer(tx_hash, source, dest))
+            )
+            if interval:
+                await asyncio.sleep(
+                    max(0.0, started + (i + 1) * interval - time.monotonic())
+                )
+        await asyncio.gather(*pending)
+
+        try:
+            await asyncio.wait_for(recorder.done.wait(), args.timeout)
+        except asyncio.TimeoutError:
+            pass
+        elapsed = time.monotonic() - started
+    finally:
+        await lag.stop()
+        await relayer.stop()
+        servers.stop()
+
+    latencies = [
+        at - added[key]
+        for key, (at, status) in recorder.finished.items()
+        if status == "completed"
+    ]
+    completed = len(latencies)
+    rpc_calls: Dict[str, int] = {}
+    for fake in chains.values():
+        for method, count in fake.calls.items():
+            rpc_calls[method] = rpc_calls.get(method, 0) + count
+    iris_requests = sum(iris.responses.values())
+
+    return {
+        "commit": git_commit(),
+        "parameters": {
+            k: v
+            for k, v in vars(args).items()
+            if k not in ("output", "baseline", "tolerance", "verbose", "repeat")
+        },
+        "runs": 1,
+        "transfers": args.transfers,
+        "completed": completed,
+        "failed": sum(
+            1
+            for _, status in recorder.finished.values()
+            if status == TransferStatus.FAILED.value
+        ),
+        "unfinished": args.transfers - len(recorder.finished),
+        "elapsed": round(elapsed, 3),
+        "transfers_per_second": round(completed / elapsed, 2) if elapsed else 0.0,
+        "latency_p50": round(percentile(latencies, 0.50), 3),
+        "latency_p99": round(percentile(latencies, 0.99), 3),
+        "latency_max": round(max(latencies, default=0.0), 3),
+        "iris_responses": {
+            str(status): count for status, count in sorted(iris.responses.items())
+        },
+        "iris_requests_per_transfer": round(iris_requests / args.transfers, 2),
+        "rpc_calls": dict(sorted(rpc_calls.items())),
+        "rpc_http_requests": sum(fake.http_requests for fake in chains.values()),
+        "rpc_calls_per_transfer": round(sum(rpc_calls.values()) / args.transfers, 2),
+        "loop_lag_p50": round(percentile(lag.samples, 0.50), 4),
+        "loop_lag_p99": round(percentile(lag.samples, 0.99), 4),
+        "loop_lag_max": round(max(lag.samples, default=0.0), 4),
+    }
+
+
+def median_of(results: List[Dict]) -> Dict:
+    """The median-throughput run, with every compared metric replaced by its median"""
+    ordered = sorted(results, key=lambda r: r["transfers_per_second"])
+    summary = dict(ordered[len(ordered) // 2])
+    for metric in COMPARED:
+        values = sorted(r[metric] for r in results)
+        summary[metric] = values[len(values) // 2]
+    summary["runs"] = len(results)
+    return summary
+
+
+def report(result: Dict):
+    if result["runs"] > 1:
+        print(f"Median of {result['runs']} runs")
+    print(
+        f"{result['completed']}/{result['transfers']} transfers completed in "
+        f"{result['elapsed']:.1f}s "
+        f"({result['failed']} failed, {result['unfinished']} unfinished)"
+    )
+    print(f"  throughput:   {result['transfers_per_second']:8.1f} transfers/s")
+    print(
+        f"  latency:      p50 {result['latency_p50']:.2f}s  p99 "
+        f"{result['latency_p99']:.2f}s  max {result['latency_max']:.2f}s"
+    )
+    print(
+        f"  iris:         {result['iris_requests_per_transfer']:.2f} requests/transfer "
+        f"{result['iris_responses']}"
+    )
+    print(
+        f"  rpc:          {result['rpc_calls_per_transfer']:.2f} calls/transfer in "
+        f"{result['rpc_http_requests']} HTTP requests"
+    )
+    for method, count in result["rpc_calls"].items():
+        print(f"    {method:28} {count}")
+    print(
+        f"  loop lag:     p50 {result['loop_lag_p50'] * 1000:.1f}ms  p99 "
+        f"{result['loop_lag_p99'] * 1000:.1f}ms  max "
+        f"{result['loop_lag_max'] * 1000:.1f}ms"
+    )
+
+
+def compare(result: Dict, baseline: Dict, tolerance: float) -> bool:
+    """Print changes against ``baseline``
+
+    Returns False if any gated metric regressed by more than ``tolerance``.
+    """
+    if baseline.get("parameters") != result["parameters"]:
+        print(
+            "⚠️ Baseline was run with different parameters; numbers are not comparable"
+        )
+    print(f"Compared with {baseline.get('commit') or 'baseline'}:")
+    ok = True
+    for metric, (higher_is_better, gated) in COMPARED.items():
+        before, after = baseline.get(metric), result[metric]
+        if not before:
+            continue
+        change = (after - before) / before
+        regressed = gated and (
+            (change < -tolerance) if higher_is_better else (change > tolerance)
+        )
+        ok = ok and not regressed
+        print(
+            f"  {metric:28} {before:>10} -> {after:<10} "
+            f"{change:+7.1%}{'  REGRESSION' if regressed else ''}"
+        )
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--transfers", type=int, default=1000)
+    parser.add_argument(
+        "--routes",
+        default="base->arbitrum,arbitrum->base,ethereum->optimism,polygon->avalanche",
+        help="Comma-separated source->dest chain pairs, used round-robin",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=0.0,
+        help="Transfers added per second (0: all at once)",
+    )
+    parser.add_argument(
+        "--attestation-delay",
+        type=float,
+        default=2.0,
+        help="Seconds until Iris attests a burn",
+    )
+    parser.add_argument("--attestation-jitter", type=float, default=1.0)
+    parser.add_argument(
+        "--not-found-rate",
+        type=float,
+        default=0.0,
+        help="Fraction of spurious Iris 404s",
+    )
+    parser.add_argument(
+        "--throttle-rate", type=float, default=0.0, help="Fraction of Iris 429s"
+    )
+    parser.add_argument(
+        "--iris-rate",
+        type=float,
+        default=1000.0,
+        help="Client-side Iris request rate limit (Circle's real limit is 35/s)",
+    )
+    parser.add_argument("--block-time", type=float, default=0.5)
+    parser.add_argument(
+        "--rpc-latency",
+        type=float,
+        default=0.005,
+        help="Seconds added to every RPC response",
+    )
+    parser.add_argument("--signers", type=int, default=1, help="Hot wallets per chain")
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument(
+        "--baseline", help="Compare with results saved by an earlier --output"
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Runs to take the median of (single runs vary by 10-20%%)",
+    )
+    parser.add_argument(
+        "--tolerance", type=float, default=0.20, help="Allowed relative regression"
+    )
+    parser.add_argument("--verbose", action="store_true", help="Show relayer logs")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.ERROR)
+    result = median_of([asyncio.run(run(args)) for _ in range(args.repeat)])
+    report(result)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if not compare(result, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
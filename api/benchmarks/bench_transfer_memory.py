@@ -0,0 +1,165 @@
+"""
+Microbenchmark: in-memory footprint of relayer transfers and message parsing cost
+
+Compares the previous CCTPTransfer layout (regular dataclass holding hex
+strings, decoded with bytes.fromhex on every use) with the slotted, raw-bytes
+layout and the memoryview parser.
+
+    cd api && python -m benchmarks.bench_transfer_memory --count 100000
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from app.cctp_message import parse_message, to_bytes
+from app.cctp_relayer import CCTPTransfer, TransferStatus
+
+
+@dataclass
+class LegacyTransfer:
+    """CCTPTransfer as it was before raw-bytes storage"""
+
+    tx_hash: str
+    source_domain: int
+    dest_domain: int
+    amount: int
+    recipient: str
+    status: TransferStatus
+    message: Optional[str] = None
+    attestation: Optional[str] = None
+    event_nonce: Optional[int] = None
+    completion_tx_hash: Optional[str] = None
+    created_at: datetime = None
+    completed_at: Optional[datetime] = None
+    next_poll_at: Optional[float] = None
+
+    def __post_init__(self):
+        if self.created_at is None:
+            self.created_at = datetime.utcnow()
+
+
+def sample_message(i: int, hook_data: bytes = b"") -> bytes:
+    """A CCTP v2 burn message (header + burn body)"""
+    body = (
+        (1).to_bytes(4, "big")
+        + bytes(12)
+        + bytes.fromhex("833589fcd6edb6e08f4c7c32d4f71b54bda02913")
+        + bytes(12)
+        + i.to_bytes(20, "big")
+        + (1_000_000 + i).to_bytes(32, "big")
+        + bytes(12)
+        + i.to_bytes(20, "big")
+        + (100).to_bytes(32, "big")
+        + (50).to_bytes(32, "big")
+        + bytes(32)
+        + hook_data
+    )
+    header = (
+        (1).to_bytes(4, "big")
+        + (6).to_bytes(4, "big")
+        + (3).to_bytes(4, "big")
+        + i.to_bytes(32, "big")
+        + bytes(96)
+        + (1000).to_bytes(4, "big")
+        + (1000).to_bytes(4, "big")
+    )
+    return header + body
+
+
+def legacy_decode(message_hex: str):
+    """The previous _decode_message: full hex decode, fixed offsets"""
+    message_bytes = bytes.fromhex(message_hex.replace("0x", ""))
+    recipient = "0x" + message_bytes[76:108].hex()[-40:]
+    amount = int.from_bytes(message_bytes[108:140], "big")
+    return recipient, amount
+
+
+def measure(build, count: int):
+    gc.collect()
+    tracemalloc.start()
+    items = [build(i) for i in range(count)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return items, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--parse-iterations", type=int, default=200_000)
+    args = parser.parse_args()
+
+    messages = [sample_message(i) for i in range(args.count)]
+    attestation = bytes(range(65)) * 2
+
+    def legacy(i):
+        return LegacyTransfer(
+            tx_hash=f"0x{i:064x}",
+            source_domain=6,
+            dest_domain=3,
+            amount=1_000_000,
+            recipient=f"0x{i:040x}",
+            status=TransferStatus.ATTESTED,
+            message="0x" + messages[i].hex(),
+            attestation="0x" + attestation.hex(),
+        )
+
+    def slotted(i):
+        return CCTPTransfer(
+            tx_hash=f"0x{i:064x}",
+            source_domain=6,
+            dest_domain=3,
+            amount=1_000_000,
+            recipient=f"0x{i:040x}",
+            status=TransferStatus.ATTESTED,
+            message=to_bytes("0x" + messages[i].hex()),
+            attestation=to_bytes("0x" + attestation.hex()),
+        )
+
+    legacy_items, legacy_size = measure(legacy, args.count)
+    slotted_items, slotted_size = measure(slotted, args.count)
+
+    print(f"{args.count} transfers in memory")
+    print(
+        f"  dataclass + hex strings: {legacy_size / 2**20:8.1f} MiB "
+        f"({legacy_size / args.count:.0f} B/transfer)"
+    )
+    print(
+        f"  slots + raw bytes:       {slotted_size / 2**20:8.1f} MiB "
+        f"({slotted_size / args.count:.0f} B/transfer)"
+    )
+    print(f"  ratio:                   {slotted_size / legacy_size:8.2f}")
+
+    n = args.parse_iterations
+    legacy_hex = legacy_items[0].message
+    raw = slotted_items[0].message
+
+    start = time.perf_counter()
+    for _ in range(n):
+        legacy_decode(legacy_hex)
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(n):
+        burn = parse_message(raw).burn
+        _ = burn.recipient_address, burn.amount
+    parse_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(n):
+        _ = parse_message(raw, burn=False).has_destination_caller
+    header_time = time.perf_counter() - start
+
+    print(f"{n} decodes")
+    print(f"  hex decode + slices (old):  {legacy_time / n * 1e6:6.2f} us")
+    print(f"  full header + burn parse:   {parse_time / n * 1e6:6.2f} us")
+    print(f"  header only:                {header_time / n * 1e6:6.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,376 @@
+"""
+Local stand-ins for Circle's Iris API and chain JSON-RPC endpoints
+
+FakeIris serves /v2/messages/{domain} with a configurable attestation delay
+and rates of spurious 404s and 429s; FakeChain produces blocks at a fixed
+interval, mines every valid transaction in the next block and answers the
+JSON-RPC methods the relayer uses (including batches). ServerThread runs them
+on their own event loop so they add nothing to the lag measured in the
+process under test.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import rlp
+from aiohttp import web
+from eth_abi import decode, encode
+from eth_account import Account
+from eth_utils import keccak
+
+AGGREGATE3_SELECTOR = keccak(text="aggregate3((address,bool,bytes)[])")[:4]
+
+
+class _Server:
+    """aiohttp app on an ephemeral localhost port"""
+
+    def __init__(self):
+        self.url: Optional[str] = None
+        self._runner: Optional[web.AppRunner] = None
+
+    def routes(self, app: web.Application):
+        raise NotImplementedError
+
+    async def start(self) -> str:
+        app = web.Application()
+        self.routes(app)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+        return self.url
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+def burn_message(
+    source_domain: int, dest_domain: int, nonce: bytes, amount: int, recipient: bytes
+) -> bytes:
+    """A CCTP v2 message (header + burn body)"""
+    body = (
+        (1).to_bytes(4, "big")
+        + bytes(12)
+        + bytes.fromhex("833589fcd6edb6e08f4c7c32d4f71b54bda02913")
+        + bytes(12)
+        + recipient
+        + amount.to_bytes(32, "big")
+        + bytes(12)
+        + recipient
+        + bytes(96)
+    )
+    header = (
+        (1).to_bytes(4, "big")
+        + source_domain.to_bytes(4, "big")
+        + dest_domain.to_bytes(4, "big")
+        + nonce
+        + bytes(96)
+        + (1000).to_bytes(4, "big")
+        + (1000).to_bytes(4, "big")
+    )
+    return header + body
+
+
+class FakeIris(_Server):
+    """Circle Iris v2 stand-in
+
+    A registered burn is answered with 404 until its attestation delay has
+    passed since registration, then with one complete, attested message.
+    Unregistered transactions are always 404.
+    """
+
+    def __init__(
+        self,
+        attestation_delay: float = 10.0,
+        delay_jitter: float = 0.0,
+        not_found_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        retry_after: int = 1,
+        seed: int = 0,
+    ):
+        """
+        Args:
+            attestation_delay: Seconds from registration until the attestation is
+                available
+            delay_jitter: Uniform +/- seconds added to each transfer's delay
+            not_found_rate: Fraction of requests answered 404 even once attested
+            throttle_rate: Fraction of requests answered 429
+            retry_after: Retry-After seconds sent with a 429
+            seed: Random seed, for repeatable runs
+        """
+        super().__init__()
+        self.attestation_delay = attestation_delay
+        self.delay_jitter = delay_jitter
+        self.not_found_rate = not_found_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self._random = random.Random(seed)
+        # tx hash -> (source domain, dest domain, time the attestation is ready)
+        self._burns: Dict[str, Tuple[int, int, float]] = {}
+        self.responses: Counter = Counter()
+
+    def register(self, tx_hash: str, source_domain: int, dest_domain: int):
+        """Record a burn; its attestation becomes available after the delay"""
+        delay = self.attestation_delay + self._random.uniform(
+            -self.delay_jitter, self.delay_jitter
+        )
+        self._burns[tx_hash.lower()] = (
+            source_domain,
+            dest_domain,
+            time.monotonic() + max(0.0, delay),
+        )
+
+    def routes(self, app: web.Application):
+        app.router.add_get("/v2/messages/{domain}", self._messages)
+
+    async def _messages(self, request: web.Request) -> web.Response:
+        tx_hash = request.query.get("transactionHash", "").lower()
+        burn = self._burns.get(tx_hash)
+        roll = self._random.random()
+        if roll < self.throttle_rate:
+            status = 429
+        elif (
+            burn is None
+            or burn[0] != int(request.match_info["domain"])
+            or time.monotonic() < burn[2]
+        ):
+            status = 404
+        elif roll < self.throttle_rate + self.not_found_rate:
+            status = 404
+        else:
+            status = 200
+        self.responses[status] += 1
+
+        if status == 429:
+            return web.json_response(
+                {"error": "Too Many Requests"},
+                status=429,
+                headers={"Retry-After": str(self.retry_after)},
+            )
+        if status == 404:
+            return web.json_response({"error": "Message not found"}, status=404)
+        source_domain, dest_domain, _ = burn
+        nonce = keccak(text=tx_hash)
+        message = burn_message(source_domain, dest_domain, nonce, 1_000_000, nonce[:20])
+        return web.json_response(
+            {
+                "messages": [
+                    {
+                        "message": "0x" + message.hex(),
+                        "eventNonce": "0x" + nonce.hex(),
+                        "attestation": "0x" + "ab" * 130,
+                        "status": "complete",
+                    }
+                ]
+            }
+        )
+
+
+class FakeChain(_Server):
+    """EVM JSON-RPC stand-in with fixed block times
+
+    Transactions are accepted in nonce order per sender (later nonces wait
+    for the gap to close) and mined in the block after they arrive; every
+    mint succeeds.
+    """
+
+    GAS_PRICE = 10**8
+    BASE_FEE = 5 * 10**7
+
+    def __init__(self, chain_id: int, block_time: float = 2.0, latency: float = 0.0):
+        """
+        Args:
+            chain_id: Reported chain ID
+            block_time: Seconds per block
+            latency: Seconds added to every HTTP response (round-trip time)
+        """
+        super().__init__()
+        self.chain_id = chain_id
+        self.block_time = block_time
+        self.latency = latency
+        self._started = time.monotonic()
+        self._nonces: Dict[str, int] = {}
+        # Transactions sent ahead of a nonce gap, per sender
+        self._queued: Dict[str, Dict[int, str]] = {}
+        # tx hash -> (block mined in, sender)
+        self._mined: Dict[str, Tuple[int, str]] = {}
+        self._blocks: Dict[int, List[str]] = {}
+        self.calls: Counter = Counter()
+        self.http_requests = 0
+
+    @property
+    def block_number(self) -> int:
+        return 100 + int((time.monotonic() - self._started) / self.block_time)
+
+    def routes(self, app: web.Application):
+        app.router.add_post("/", self._handle)
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        self.http_requests += 1
+        body = await request.json()
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if isinstance(body, list):
+            return web.json_response([self._call(item) for item in body])
+        return web.json_response(self._call(body))
+
+    def _call(self, request: Dict) -> Dict:
+        method = request["method"]
+        params = request.get("params") or []
+        self.calls[method] += 1
+        try:
+            result = self._dispatch(method, params)
+        except _RpcError as e:
+            return {
+                "jsonrpc": "2.0",
+                "id": request.get("id"),
+                "error": {"code": e.code, "message": str(e)},
+            }
+        return {"jsonrpc": "2.0", "id": request.get("id"), "result": result}
+
+    def _dispatch(self, method: str, params: List):
+        if method == "eth_chainId":
+            return hex(self.chain_id)
+        if method == "net_version":
+            return str(self.chain_id)
+        if method == "eth_blockNumber":
+            return hex(self.block_number)
+        if method == "eth_gasPrice":
+            return hex(self.GAS_PRICE)
+        if method == "eth_maxPriorityFeePerGas":
+            return hex(10**6)
+        if method == "eth_estimateGas":
+            return hex(150_000)
+        if method == "eth_getBalance":
+            return hex(10**20)
+        if method == "eth_getTransactionCount":
+            return hex(self._nonces.get(params[0].lower(), 0))
+        if method == "eth_feeHistory":
+            count = int(params[0], 16) if isinstance(params[0], str) else params[0]
+            percentiles = params[2] if len(params) > 2 else []
+            return {
+                "oldestBlock": hex(self.block_number - count + 1),
+                "baseFeePerGas": [hex(self.BASE_FEE)] * (count + 1),
+                "gasUsedRatio": [0.5] * count,
+                "reward": [
+                    [hex(10**6 * (i + 1)) for i, _ in enumerate(percentiles)]
+                    for _ in range(count)
+                ],
+            }
+        if method == "eth_getBlockByNumber":
+            return {
+                "number": hex(self.block_number),
+                "hash": "0x" + "00" * 32,
+                "parentHash": "0x" + "00" * 32,
+                "timestamp": hex(int(time.time())),
+                "baseFeePerGas": hex(self.BASE_FEE),
+                "gasLimit": hex(30_000_000),
+                "gasUsed": hex(0),
+                "transactions": [],
+            }
+        if method == "eth_call":
+            return self._eth_call(params[0])
+        if method == "eth_sendRawTransaction":
+            return self._send(bytes.fromhex(params[0][2:]))
+        if method == "eth_getTransactionReceipt":
+            mined = self._mined.get(params[0].lower())
+            if mined is None or mined[0] >= self.block_number:
+                return None
+            return self._receipt(params[0].lower())
+        if method == "eth_getBlockReceipts":
+            block = int(params[0], 16)
+            if block > self.block_number:
+                return None
+            # Transactions sent during block N are mined in N + 1
+            return [
+                self._receipt(tx_hash) for tx_hash in self._blocks.get(block - 1, [])
+            ]
+        raise _RpcError(f"method {method} not supported", -32601)
+
+    def _eth_call(self, call: Dict) -> str:
+        data = bytes.fromhex((call.get("data") or call.get("input") or "0x")[2:])
+        if data[:4] == AGGREGATE3_SELECTOR:
+            # usedNonces reads batched through Multicall3: nothing received yet
+            (calls,) = decode(["(address,bool,bytes)[]"], data[4:])
+            return (
+                "0x"
+                + encode(["(bool,bytes)[]"], [[(True, bytes(32)) for _ in calls]]).hex()
+            )
+        return "0x" + "00" * 32
+
+    def _send(self, raw: bytes) -> str:
+        sender = Account.recover_transaction(raw).lower()
+        # Typed transactions: type byte, then [chainId, nonce, ...];
+        # legacy: [nonce, ...]
+        fields = rlp.decode(raw[1:]) if raw[0] < 0x7F else rlp.decode(raw)
+        nonce = int.from_bytes(fields[1] if raw[0] < 0x7F else fields[0], "big")
+        expected = self._nonces.get(sender, 0)
+        if nonce < expected:
+            raise _RpcError("nonce too low")
+        tx_hash = "0x" + keccak(raw).hex()
+        queued = self._queued.setdefault(sender, {})
+        queued[nonce] = tx_hash
+        block = self.block_number
+        while expected in queued:
+            mined_hash = queued.pop(expected)
+            self._mined[mined_hash] = (block, sender)
+            self._blocks.setdefault(block, []).append(mined_hash)
+            expected += 1
+        self._nonces[sender] = expected
+        return tx_hash
+
+    def _receipt(self, tx_hash: str) -> Dict:
+        block, sender = self._mined[tx_hash]
+        return {
+            "transactionHash": tx_hash,
+            "status": "0x1",
+            "blockNumber": hex(block + 1),
+            "blockHash": "0x" + "11" * 32,
+            "transactionIndex": "0x0",
+            "from": sender,
+            "to": "0x" + "22" * 20,
+            "gasUsed": hex(100_000),
+            "cumulativeGasUsed": hex(100_000),
+            "effectiveGasPrice": hex(self.GAS_PRICE),
+            "logs": [],
+            "logsBloom": "0x" + "00" * 256,
+            "contractAddress": None,
+            "type": "0x2",
+        }
+
+
+class _RpcError(Exception):
+    def __init__(self, message: str, code: int = -32000):
+        super().__init__(message)
+        self.code = code
+
+
+class ServerThread:
+    """Runs stand-in servers on a separate event loop in a background thread"""
+
+    def __init__(self, *servers: _Server):
+        self.servers = servers
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="benchmark-fakes", daemon=True
+        )
+
+    def start(self):
+        """Start every server; their ``url`` is set on return"""
+        self._thread.start()
+        for server in self.servers:
+            asyncio.run_coroutine_threadsafe(server.start(), self._loop).result()
+
+    def stop(self):
+        for server in self.servers:
+            asyncio.run_coroutine_threadsafe(server.stop(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
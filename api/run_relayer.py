@@ -1,10 +1,16 @@
 #!/usr/bin/env python3
 """
-Run the API with CCTP V2 Attestation Relayer
+Run the CCTP V2 Attestation Relayer worker
+
+The worker owns the relayer loops and signing keys; API processes queue
+transfers and read their status through RELAYER_REDIS_URL, so they never run
+a relayer of their own. Run one worker per deployment (or several - they
+share the destination domains between them through Redis leases).
 """
 
 import asyncio
 import os
+import signal
 import sys
 import logging
 from dotenv import load_dotenv
@@ -12,7 +18,13 @@ from dotenv import load_dotenv
 # Add app directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
 
-from app.cctp_relayer import CCTPRelayer
+from app.burn_scanner import BurnScanner, load_scan_targets
+from app.cctp_relayer import CCTPRelayer, TransferStatus
+from app.config import settings
+from app.relayer_shards import create_shared_state
+from app.signer_pool import signer_keys_from_env
+from app.status_stream import create_status_stream
+from app.transfer_store import TransferStore
 
 # Configure logging
 logging.basicConfig(
@@ -26,7 +38,13 @@ async def main():
     
     # Load environment variables
     load_dotenv()
-    
+
+    if not settings.RELAYER_REDIS_URL:
+        logger.warning("RELAYER_REDIS_URL not set - the API cannot reach this worker")
+        logger.warning(
+            "Only burns found by the burn scanner (or TEST_TX_HASH) will be relayed"
+        )
+
     # Get private key from environment or use a test key
     # IMPORTANT: In production, use secure key management
     private_key = os.getenv("RELAYER_PRIVATE_KEY")
@@ -47,7 +65,37 @@ async def main():
         
     # Initialize relayer
     logger.info("🚀 Starting CCTP V2 Attestation Relayer...")
-    relayer = CCTPRelayer(private_key, network="mainnet")
+    store = (
+        TransferStore(settings.RELAYER_DATABASE_URL)
+        if settings.RELAYER_DATABASE_URL
+        else None
+    )
+    burn_scanner = None
+    if settings.RELAYER_DEPLOYMENTS_PATH:
+        burn_scanner = BurnScanner(
+            load_scan_targets(
+                settings.RELAYER_DEPLOYMENTS_PATH, network=settings.RELAYER_NETWORK
+            ),
+            store=store,
+        )
+    relayer = CCTPRelayer(
+        private_key,
+        network=settings.RELAYER_NETWORK,
+        batch_relayers=settings.batch_relayers(),
+        store=store,
+        burn_scanner=burn_scanner,
+        rpc_urls=settings.rpc_urls(),
+        shared_state=create_shared_state(CCTPRelayer.DOMAINS.values()),
+        signer_keys=signer_keys_from_env(),
+        status_stream=create_status_stream(),
+    )
+
+    # Stop on SIGTERM (deploys, scaling down) as on Ctrl+C, handing shards
+    # back to other workers after flushing their state
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopping.set)
     
     # Start the relayer service
     await relayer.start()
@@ -66,9 +114,8 @@ async def main():
     logger.info("  • Base (Domain 6)")
     logger.info("  • Polygon (Domain 7)")
     logger.info("")
-    logger.info("API Endpoints:")
-    logger.info("  POST /api/v1/relayer/monitor - Add transfer to monitor")
-    logger.info("  GET  /api/v1/relayer/status/{tx_hash} - Check status")
+    source = "via Redis" if settings.RELAYER_REDIS_URL else "not connected"
+    logger.info(f"Transfers from the API: {source}")
     logger.info("")
     logger.info("Circle API: https://iris-api.circle.com/v2")
     logger.info("Expected attestation time: 5-10 seconds")
@@ -91,26 +138,28 @@ async def main():
     try:
         while True:
             # Log status every minute
-            await asyncio.sleep(60)
-            
-            # Get all transfers
-            transfers = relayer.get_all_transfers()
-            
-            if transfers:
-                logger.info(f"\n📊 Status Update: {len(transfers)} transfers monitored")
-                
-                # Count by status
-                status_counts = {}
-                for t in transfers:
-                    status = t['status']
-                    status_counts[status] = status_counts.get(status, 0) + 1
-                
-                for status, count in status_counts.items():
-                    logger.info(f"  {status}: {count}")
+            try:
+                await asyncio.wait_for(stopping.wait(), 60)
+                break
+            except asyncio.TimeoutError:
+                pass
+
+            # Counts are kept up to date by the relayer
+            stats = relayer.get_stats()
+
+            if stats["total_transfers"]:
+                logger.info(
+                    f"\n📊 Status Update: {stats['total_transfers']} transfers "
+                    "monitored"
+                )
+
+                for status in TransferStatus:
+                    if stats[status.value]:
+                        logger.info(f"  {status.value}: {stats[status.value]}")
             else:
                 logger.info("⏳ No transfers being monitored")
                 
-    except KeyboardInterrupt:
+    finally:
         logger.info("\n🛑 Shutting down relayer...")
         await relayer.stop()
         logger.info("✅ Relayer stopped successfully")
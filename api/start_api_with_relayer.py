@@ -1,11 +1,17 @@
 #!/usr/bin/env python3
 """
-Start the FastAPI server with integrated CCTP V2 Relayer
+Start the FastAPI server with the CCTP V2 Relayer (local development)
+
+With RELAYER_REDIS_URL set, the relayer runs as a separate worker process
+(run_relayer.py) and the API, with auto-reload, reaches it through Redis - as
+deployed. Without it, the relayer runs inside a single API process on the
+server's event loop (RELAYER_EMBEDDED), so auto-reload is off.
 """
 
 import os
+import signal
+import subprocess
 import sys
-import asyncio
 import logging
 import uvicorn
 from dotenv import load_dotenv
@@ -20,41 +26,49 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-async def start_relayer():
-    """Initialize and start the CCTP relayer"""
-    from app.cctp_relayer import CCTPRelayer
-    
-    # Get private key
-    private_key = os.getenv("RELAYER_PRIVATE_KEY")
-    
-    if not private_key:
-        from eth_account import Account
-        test_account = Account.create()
-        private_key = test_account.key.hex()
-        logger.warning(f"Using test relayer address: {test_account.address}")
-        logger.warning("Set RELAYER_PRIVATE_KEY in .env for production")
-    
-    # Initialize and start relayer
-    relayer = CCTPRelayer(private_key, network="mainnet")
-    await relayer.start()
-    
-    logger.info(f"✅ Relayer started: {relayer.account.address}")
-    return relayer
+def ensure_private_key():
+    """Use a throwaway relayer key unless RELAYER_PRIVATE_KEY is set"""
+    if os.getenv("RELAYER_PRIVATE_KEY"):
+        return
+    from eth_account import Account
+
+    test_account = Account.create()
+    # Inherited by the worker process and read by the embedded relayer
+    os.environ["RELAYER_PRIVATE_KEY"] = test_account.key.hex()
+    logger.warning(f"Using test relayer address: {test_account.address}")
+    logger.warning("Set RELAYER_PRIVATE_KEY in .env for production")
+
+
+def start_worker() -> subprocess.Popen:
+    """Start run_relayer.py as its own process"""
+    worker = subprocess.Popen(
+        [sys.executable, "run_relayer.py"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    logger.info(f"✅ Relayer worker started (pid {worker.pid})")
+    return worker
 
 def main():
     """Main function to start API server with relayer"""
     
     logger.info("🚀 Starting Stable Router API with CCTP V2 Relayer...")
     
-    # Start the relayer in background
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    
-    # Initialize relayer
-    relayer = loop.run_until_complete(start_relayer())
-    
-    # Store relayer instance for API access
-    os.environ["RELAYER_ENABLED"] = "true"
+    ensure_private_key()
+
+    # Separate worker when the API can reach it through Redis; otherwise the
+    # relayer has to run inside the (single) API process
+    worker = None
+    if os.getenv("RELAYER_REDIS_URL"):
+        # The API reads the worker's history; on one host the SQLite file is shared
+        os.environ.setdefault(
+            "RELAYER_DATABASE_URL", "sqlite+aiosqlite:///./relayer.db"
+        )
+        worker = start_worker()
+    else:
+        logger.warning(
+            "RELAYER_REDIS_URL not set - running the relayer inside the API process"
+        )
+        os.environ["RELAYER_EMBEDDED"] = "true"
     
     logger.info("\n" + "="*60)
     logger.info("STABLE ROUTER API - READY")
@@ -63,8 +77,9 @@ def main():
     logger.info("Documentation: http://localhost:8000/docs")
     logger.info("")
     logger.info("Relayer Endpoints:")
-    logger.info("  POST /api/v1/relayer/monitor")
-    logger.info("  GET  /api/v1/relayer/status/{tx_hash}")
+    logger.info("  POST /relayer/monitor")
+    logger.info("  GET  /relayer/status/{tx_hash}")
+    logger.info("  GET  /relayer/stream/{tx_hash}")
     logger.info("")
     logger.info("Main Endpoints:")
     logger.info("  GET  /api/v1/chains")
@@ -73,13 +88,19 @@ def main():
     logger.info("-"*60 + "\n")
     
     # Run the FastAPI server
-    uvicorn.run(
-        "app.main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-        log_level="info"
-    )
+    try:
+        uvicorn.run(
+            "app.main:app",
+            host="0.0.0.0",
+            port=8000,
+            reload=worker is not None,
+            log_level="info",
+        )
+    finally:
+        if worker:
+            # Let the worker flush its state and hand back its shards
+            worker.send_signal(signal.SIGTERM)
+            worker.wait()
 
 if __name__ == "__main__":
     try:
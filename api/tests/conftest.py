@@ -0,0 +1,24 @@
+"""
+Shared fixtures: local Iris/JSON-RPC stand-ins (benchmarks/fakes.py) and an
+in-memory Redis with Lua scripting (fakeredis)
+"""
+
+import fakeredis
+import pytest
+
+from benchmarks.fakes import FakeChain, ServerThread
+
+
+@pytest.fixture
+def redis():
+    return fakeredis.aioredis.FakeRedis()
+
+
+@pytest.fixture(scope="module")
+def fake_chain():
+    """A fake chain on its own event loop; blocks every 0.2 seconds"""
+    fake = FakeChain(8453, block_time=0.2)
+    servers = ServerThread(fake)
+    servers.start()
+    yield fake
+    servers.stop()
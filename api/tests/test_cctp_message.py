@@ -0,0 +1,128 @@
+"""CCTP message parsing and usedNonces keys"""
+
+import pytest
+from eth_utils import keccak
+
+from app.cctp_message import (
+    MESSAGE_VERSION_V1,
+    MESSAGE_VERSION_V2,
+    parse_burn_message,
+    parse_message,
+    to_bytes,
+    used_nonce_key,
+)
+from benchmarks.fakes import burn_message
+
+RECIPIENT = bytes.fromhex("00112233445566778899aabbccddeeff00112233")
+NONCE = keccak(text="nonce")
+
+
+def v1_message(
+    source_domain: int = 6,
+    dest_domain: int = 3,
+    nonce: int = 42,
+    caller: bytes = bytes(32),
+) -> bytes:
+    body = (
+        (0).to_bytes(4, "big")
+        + bytes(12)
+        + bytes.fromhex("833589fcd6edb6e08f4c7c32d4f71b54bda02913")
+        + bytes(12)
+        + RECIPIENT
+        + (2_500_000).to_bytes(32, "big")
+        + bytes(12)
+        + RECIPIENT
+    )
+    header = (
+        (0).to_bytes(4, "big")
+        + source_domain.to_bytes(4, "big")
+        + dest_domain.to_bytes(4, "big")
+        + nonce.to_bytes(8, "big")
+        + bytes(64)
+        + caller
+    )
+    return header + body
+
+
+def test_parses_v2_header_and_burn_body():
+    message = parse_message(burn_message(6, 3, NONCE, 1_000_000, RECIPIENT))
+    assert message.version == MESSAGE_VERSION_V2
+    assert message.is_v2
+    assert (message.source_domain, message.destination_domain) == (6, 3)
+    assert message.nonce == int.from_bytes(NONCE, "big")
+    assert (message.min_finality_threshold, message.finality_threshold_executed) == (
+        1000,
+        1000,
+    )
+    assert not message.has_destination_caller
+    assert message.burn.amount == 1_000_000
+    assert message.burn.recipient_address == "0x" + RECIPIENT.hex()
+    assert message.burn.max_fee == 0
+    assert bytes(message.burn.hook_data) == b""
+
+
+def test_parses_v1_header_and_burn_body():
+    message = parse_message(v1_message(caller=bytes(12) + RECIPIENT))
+    assert message.version == MESSAGE_VERSION_V1
+    assert not message.is_v2
+    assert (message.source_domain, message.destination_domain, message.nonce) == (
+        6,
+        3,
+        42,
+    )
+    assert message.has_destination_caller
+    assert message.burn.amount == 2_500_000
+    assert message.burn.max_fee is None
+
+
+def test_header_only_when_burn_is_not_requested():
+    assert (
+        parse_message(burn_message(6, 3, NONCE, 1, RECIPIENT), burn=False).burn is None
+    )
+
+
+def test_fields_are_views_of_the_message():
+    raw = bytearray(burn_message(6, 3, NONCE, 1, RECIPIENT))
+    message = parse_message(raw)
+    raw[44] = 0xFF
+    assert message.sender[0] == 0xFF
+
+
+def test_v2_used_nonce_key_is_the_bytes32_nonce():
+    message = parse_message(burn_message(6, 3, NONCE, 1, RECIPIENT), burn=False)
+    assert used_nonce_key(message) == NONCE
+
+
+def test_v1_used_nonce_key_hashes_source_domain_and_nonce():
+    message = parse_message(v1_message(source_domain=6, nonce=42), burn=False)
+    assert used_nonce_key(message) == keccak(
+        (6).to_bytes(4, "big") + (42).to_bytes(8, "big")
+    )
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        b"\x00\x00",
+        v1_message()[:100],
+        burn_message(6, 3, NONCE, 1, RECIPIENT)[:140],
+        (7).to_bytes(4, "big") + bytes(200),
+    ],
+    ids=["no-version", "short-v1", "short-v2", "unknown-version"],
+)
+def test_rejects_truncated_or_unknown_messages(raw):
+    with pytest.raises(ValueError):
+        parse_message(raw)
+
+
+def test_short_body_is_not_decoded_as_a_burn():
+    message = parse_message(burn_message(6, 3, NONCE, 1, RECIPIENT)[: 148 + 200])
+    assert message.burn is None
+    with pytest.raises(ValueError):
+        parse_burn_message(message.body, message.version)
+
+
+def test_to_bytes_accepts_hex_with_or_without_prefix():
+    assert to_bytes("0xabcd") == to_bytes("abcd") == b"\xab\xcd"
+    assert to_bytes(b"\x01") == b"\x01"
+    assert to_bytes(None) is None
@@ -0,0 +1,205 @@
+"""CCTPRelayer completions against a fake destination chain (Base)"""
+
+import asyncio
+
+import pytest
+from eth_abi import decode, encode
+from eth_account import Account
+from eth_utils import keccak
+from web3 import Web3
+
+from app.cctp_relayer import CCTPRelayer, CCTPTransfer, TransferStatus
+from app.relayer_shards import ShardLeases, SharedTransferState
+from benchmarks.fakes import AGGREGATE3_SELECTOR, _RpcError, burn_message
+
+BATCH_V1 = Web3.to_checksum_address("0x" + "b1" * 20)
+BATCH_V2 = Web3.to_checksum_address("0x" + "b2" * 20)
+MESSAGE_TRANSMITTER_SELECTOR = keccak(text="messageTransmitter()")[:4]
+RECEIVE_MESSAGES_SELECTOR = keccak(text="receiveMessages(bytes[],bytes[])")[:4]
+
+
+def attested(n: int) -> CCTPTransfer:
+    """An attested CCTP v2 transfer from Arbitrum to Base"""
+    nonce = keccak(text=f"transfer-{n}")
+    return CCTPTransfer(
+        tx_hash=f"0x{n:064x}",
+        source_domain=3,
+        dest_domain=6,
+        amount=10**6,
+        recipient="0x" + nonce[:20].hex(),
+        status=TransferStatus.ATTESTED,
+        message=burn_message(3, 6, nonce, 10**6, nonce[:20]),
+        attestation=bytes(65),
+    )
+
+
+@pytest.fixture
+async def relayers(fake_chain):
+    """Build relayers whose only chain is the fake Base; stopped at the end"""
+    created = []
+
+    def build(**kwargs) -> CCTPRelayer:
+        relayer = CCTPRelayer(
+            Account.create().key.hex(),
+            rpc_urls={"base": [fake_chain.url + "/"]},
+            **kwargs,
+        )
+        created.append(relayer)
+        return relayer
+
+    yield build
+    for relayer in created:
+        await relayer.stop()
+
+
+@pytest.fixture
+def batch_relayer_transmitters(fake_chain, monkeypatch):
+    """Answer messageTransmitter() for BATCH_V1 and BATCH_V2 on the fake chain"""
+    transmitters = {
+        BATCH_V1.lower(): CCTPRelayer.MESSAGE_TRANSMITTER,
+        BATCH_V2.lower(): CCTPRelayer.MESSAGE_TRANSMITTER_V2,
+    }
+    eth_call = fake_chain._eth_call
+
+    def answer(call):
+        data = bytes.fromhex((call.get("data") or call.get("input"))[2:])
+        transmitter = transmitters.get(call.get("to", "").lower())
+        if transmitter and data == MESSAGE_TRANSMITTER_SELECTOR:
+            return "0x" + encode(["address"], [transmitter]).hex()
+        return eth_call(call)
+
+    monkeypatch.setattr(fake_chain, "_eth_call", answer)
+
+
+def report_received(fake_chain, monkeypatch, nonces):
+    """Answer usedNonces reads through Multicall3 as received for ``nonces``"""
+    eth_call = fake_chain._eth_call
+
+    def answer(call):
+        data = bytes.fromhex((call.get("data") or call.get("input"))[2:])
+        if data[:4] != AGGREGATE3_SELECTOR:
+            return eth_call(call)
+        (calls,) = decode(["(address,bool,bytes)[]"], data[4:])
+        results = [
+            (True, (1 if call_data[4:] in nonces else 0).to_bytes(32, "big"))
+            for _, _, call_data in calls
+        ]
+        return "0x" + encode(["(bool,bytes)[]"], [results]).hex()
+
+    monkeypatch.setattr(fake_chain, "_eth_call", answer)
+
+
+async def wait_for_status(transfers, status: TransferStatus, timeout: float = 10):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while any(t.status != status for t in transfers):
+        assert asyncio.get_running_loop().time() < deadline, [
+            t.status for t in transfers
+        ]
+        await asyncio.sleep(0.05)
+
+
+async def test_messages_are_batched_only_through_their_versions_transmitter(
+    relayers, batch_relayer_transmitters
+):
+    transfer = attested(1)
+
+    v1_only = relayers(batch_relayers={"base": BATCH_V1})
+    batch_relayers = await v1_only._batch_relayers_on("base")
+    assert batch_relayers == {CCTPRelayer.MESSAGE_TRANSMITTER: BATCH_V1}
+    assert v1_only._batch_relayer_for(transfer, batch_relayers) is None
+
+    both = relayers(batch_relayers={"base": [BATCH_V1, BATCH_V2]})
+    batch_relayers = await both._batch_relayers_on("base")
+    assert both._batch_relayer_for(transfer, batch_relayers) == BATCH_V2
+
+
+async def test_a_failing_batch_falls_back_to_individual_completions(
+    relayers, fake_chain, batch_relayer_transmitters, monkeypatch
+):
+    dispatch = fake_chain._dispatch
+    reverted = []
+
+    def revert_batches(method, params):
+        if method == "eth_estimateGas":
+            data = params[0].get("data") or params[0].get("input")
+            if data[2:10] == RECEIVE_MESSAGES_SELECTOR.hex():
+                reverted.append(data)
+                raise _RpcError("execution reverted: MessageFailed(1)", 3)
+        return dispatch(method, params)
+
+    monkeypatch.setattr(fake_chain, "_dispatch", revert_batches)
+    relayer = relayers(batch_relayers={"base": BATCH_V2}, batch_window=0.05)
+    transfers = [attested(n) for n in range(3)]
+    for transfer in transfers:
+        relayer.transfers.add(transfer)
+    sent = fake_chain.calls["eth_sendRawTransaction"]
+
+    await relayer._preflight("base", transfers)
+    await wait_for_status(transfers, TransferStatus.COMPLETED)
+    assert len(reverted) == 1
+    assert fake_chain.calls["eth_sendRawTransaction"] - sent == len(transfers)
+    assert len({t.completion_tx_hash for t in transfers}) == len(transfers)
+
+
+async def test_preflight_skips_messages_already_received(
+    relayers, fake_chain, monkeypatch
+):
+    transfers = [attested(n) for n in range(4)]
+    received = {keccak(text=f"transfer-{n}") for n in (0, 2)}
+    report_received(fake_chain, monkeypatch, received)
+    relayer = relayers()
+    for transfer in transfers:
+        relayer.transfers.add(transfer)
+    sent = fake_chain.calls["eth_sendRawTransaction"]
+
+    await relayer._preflight("base", transfers)
+    await wait_for_status(transfers, TransferStatus.COMPLETED)
+    assert fake_chain.calls["eth_sendRawTransaction"] - sent == 2
+    sent_for = [n for n, t in enumerate(transfers) if t.completion_tx_hash]
+    assert sent_for == [1, 3]
+
+
+async def test_preflight_errors_relay_every_transfer(relayers, fake_chain, monkeypatch):
+    dispatch = fake_chain._dispatch
+
+    def fail_calls(method, params):
+        if method == "eth_call":
+            raise _RpcError("upstream timeout")
+        return dispatch(method, params)
+
+    monkeypatch.setattr(fake_chain, "_dispatch", fail_calls)
+    relayer = relayers()
+    transfers = [attested(n) for n in range(2)]
+    for transfer in transfers:
+        relayer.transfers.add(transfer)
+    sent = fake_chain.calls["eth_sendRawTransaction"]
+
+    await relayer._preflight("base", transfers)
+    await wait_for_status(transfers, TransferStatus.COMPLETED)
+    assert fake_chain.calls["eth_sendRawTransaction"] - sent == 2
+
+
+async def test_a_lost_lease_stops_the_send_and_leaves_the_transfer(
+    relayers, fake_chain, redis
+):
+    leases = ShardLeases(redis, ["6"], worker_id="worker-1")
+    relayer = relayers(shared_state=SharedTransferState(redis, leases))
+    leases._on_acquired = relayer._on_shard_acquired
+    leases._on_lost = relayer._on_shard_lost
+    await leases.rebalance()
+    assert leases.owns("6")
+    transfer = attested(1)
+    relayer.transfers.add(transfer)
+
+    # Another worker takes the shard over before this one's lease lapses locally
+    await redis.delete(leases.lease_key("6"))
+    other = ShardLeases(redis, ["6"], worker_id="worker-2")
+    await other._acquire(
+        keys=[other.lease_key("6"), other.fence_key("6")], args=["worker-2", 15000]
+    )
+    sent = fake_chain.calls["eth_sendRawTransaction"]
+
+    await relayer._complete_transfer(transfer)
+    assert fake_chain.calls["eth_sendRawTransaction"] == sent
+    assert transfer.key not in relayer.transfers
+    assert transfer.completion_tx_hash is None
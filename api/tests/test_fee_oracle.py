@@ -0,0 +1,68 @@
+"""FeeOracle: EIP-1559 quotes from eth_feeHistory and the legacy fallback"""
+
+from dataclasses import replace
+
+import pytest
+from web3 import AsyncWeb3
+
+from app.fee_oracle import FeeOracle
+from benchmarks.fakes import FakeChain, _RpcError
+
+
+@pytest.fixture
+def oracle(fake_chain) -> FeeOracle:
+    web3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(fake_chain.url + "/"))
+    return FeeOracle("base", web3, refresh_interval=60)
+
+
+async def test_quotes_the_median_tip_over_a_multiple_of_the_next_base_fee(
+    oracle, fake_chain
+):
+    quote = await oracle.quote()
+
+    assert oracle.chain_id == fake_chain.chain_id
+    assert quote.base_fee == FakeChain.BASE_FEE
+    assert quote.max_priority_fee_per_gas == 10**6
+    assert quote.max_fee_per_gas == 2 * FakeChain.BASE_FEE + 10**6
+    assert quote.tx_params(bump=1.5) == {
+        "type": 2,
+        "maxFeePerGas": int((2 * FakeChain.BASE_FEE + 10**6) * 1.5),
+        "maxPriorityFeePerGas": int(10**6 * 1.5),
+    }
+
+
+async def test_min_priority_fee_floors_the_tip(oracle):
+    oracle.min_priority_fee = 3 * 10**6
+    quote = await oracle.quote()
+    assert quote.max_priority_fee_per_gas == 3 * 10**6
+    assert quote.max_fee_per_gas == 2 * FakeChain.BASE_FEE + 3 * 10**6
+
+
+async def test_falls_back_to_gas_price_without_fee_history(
+    oracle, fake_chain, monkeypatch
+):
+    dispatch = fake_chain._dispatch
+
+    def no_fee_history(method, params):
+        if method == "eth_feeHistory":
+            raise _RpcError(f"method {method} not supported", -32601)
+        return dispatch(method, params)
+
+    monkeypatch.setattr(fake_chain, "_dispatch", no_fee_history)
+    quote = await oracle.quote()
+    assert quote.base_fee is None
+    assert quote.tx_params() == {"gasPrice": FakeChain.GAS_PRICE}
+
+
+async def test_fresh_quotes_are_served_from_the_cache(oracle, fake_chain):
+    await oracle.quote()
+    fetched = fake_chain.calls["eth_feeHistory"]
+
+    await oracle.quote()
+    assert fake_chain.calls["eth_feeHistory"] == fetched
+
+    oracle.latest = replace(oracle.latest, updated_at=oracle.latest.updated_at - 60)
+    assert oracle.stale
+    await oracle.quote()
+    assert fake_chain.calls["eth_feeHistory"] == fetched + 1
+    assert not oracle.stale
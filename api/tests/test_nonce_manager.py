@@ -0,0 +1,118 @@
+"""NonceManager: local allocation, reuse of released nonces and gap detection"""
+
+import pytest
+
+from app.nonce_manager import NonceManager, is_nonce_too_low
+
+
+class Chain:
+    """The signer's transaction count as the node reports it"""
+
+    def __init__(self, pending: int = 5):
+        self.pending = pending
+
+    async def transaction_count(self, block: str) -> int:
+        return self.pending
+
+
+@pytest.fixture
+def chain() -> Chain:
+    return Chain()
+
+
+@pytest.fixture
+def manager(chain: Chain) -> NonceManager:
+    return NonceManager("base", chain.transaction_count)
+
+
+def age(manager: NonceManager, *nonces: int, seconds: float = 120):
+    """Pretend nonces were sent or released ``seconds`` ago"""
+    for nonce in nonces:
+        for times in (manager._sent_at, manager._released_at):
+            if nonce in times:
+                times[nonce] -= seconds
+
+
+async def test_allocates_sequentially_from_chain_pending_count(manager):
+    assert not manager.synced
+    assert [await manager.allocate() for _ in range(3)] == [5, 6, 7]
+    assert manager.synced
+
+
+async def test_released_nonces_are_reused_lowest_first(manager):
+    for _ in range(4):
+        await manager.allocate()
+    manager.release(7)
+    manager.release(6)
+    manager.release(6)
+    assert [await manager.allocate() for _ in range(3)] == [6, 7, 9]
+
+
+async def test_release_ignores_nonces_never_handed_out(manager):
+    await manager.allocate()
+    manager.release(8)
+    assert await manager.allocate() == 6
+
+
+async def test_resync_skips_nonces_consumed_elsewhere(manager, chain):
+    await manager.allocate()
+    chain.pending = 10
+    await manager.resync()
+    assert await manager.allocate() == 10
+    # A lower chain count may just be our sends still propagating
+    chain.pending = 3
+    await manager.resync()
+    assert await manager.allocate() == 11
+
+
+async def test_stale_released_nonce_below_a_sent_one_is_a_gap(manager):
+    for _ in range(3):
+        await manager.allocate()
+    manager.release(6)
+    manager.mark_sent(7)
+    assert await manager.find_gaps(stale_after=60) == []
+
+    age(manager, 6, 7)
+    assert await manager.find_gaps(stale_after=60) == [6]
+    # Reserved for the caller: not handed out again
+    assert await manager.allocate() == 8
+
+
+async def test_dropped_transaction_at_chain_pending_is_a_gap(manager):
+    await manager.allocate()
+    manager.mark_sent(5)
+    age(manager, 5)
+    assert await manager.find_gaps(stale_after=60) == [5]
+    assert manager.in_flight == 0
+
+
+async def test_owned_nonces_are_not_gaps(manager):
+    await manager.allocate()
+    manager.mark_sent(5)
+    age(manager, 5)
+    assert await manager.find_gaps(stale_after=60, owned={5}) == []
+    assert await manager.find_gaps(stale_after=60) == [5]
+
+
+async def test_mined_and_consumed_nonces_are_not_gaps(manager, chain):
+    for _ in range(3):
+        await manager.allocate()
+    manager.release(5)
+    manager.mark_sent(6)
+    manager.mark_sent(7)
+    manager.mark_mined(7)
+    age(manager, 5, 6)
+    chain.pending = 7
+    assert await manager.find_gaps(stale_after=60) == []
+    assert manager.in_flight == 0
+
+
+@pytest.mark.parametrize(
+    "message", ["nonce too low: next nonce 7", "OldNonce", "Nonce is too low"]
+)
+def test_is_nonce_too_low(message):
+    assert is_nonce_too_low(ValueError(message))
+
+
+def test_other_errors_are_not_nonce_too_low():
+    assert not is_nonce_too_low(ValueError("insufficient funds for gas"))
@@ -0,0 +1,100 @@
+"""PollScheduler: deadline ordering, backoff and wakeups"""
+
+import asyncio
+import time
+
+from app.poll_scheduler import PollScheduler
+
+
+def test_backoff_is_flat_for_fast_attempts_then_grows_to_the_cap():
+    scheduler = PollScheduler(
+        initial_delay=1.0, max_delay=5.0, backoff_factor=2.0, fast_attempts=3
+    )
+    assert [scheduler.backoff_delay(n) for n in range(7)] == [
+        1.0,
+        1.0,
+        1.0,
+        2.0,
+        4.0,
+        5.0,
+        5.0,
+    ]
+
+
+def test_pops_due_keys_earliest_first_up_to_the_limit():
+    scheduler = PollScheduler()
+    now = time.time()
+    scheduler.schedule_at("c", now - 1)
+    scheduler.schedule_at("a", now - 3)
+    scheduler.schedule_at("b", now - 2)
+    scheduler.schedule_at("later", now + 60)
+
+    assert scheduler.pop_due(2, now=now) == ["a", "b"]
+    assert scheduler.pop_due(10, now=now) == ["c"]
+    assert len(scheduler) == 1
+    assert "later" in scheduler
+
+
+def test_rescheduling_replaces_the_previous_deadline():
+    scheduler = PollScheduler()
+    now = time.time()
+    scheduler.schedule_at("a", now - 1)
+    scheduler.schedule_at("a", now + 60)
+    assert scheduler.pop_due(10, now=now) == []
+    assert scheduler.pop_due(10, now=now + 61) == ["a"]
+    # The stale heap entry is never returned
+    assert scheduler.pop_due(10, now=now + 61) == []
+
+
+def test_reschedule_counts_attempts_and_backs_off():
+    scheduler = PollScheduler(initial_delay=1.0, backoff_factor=2.0, fast_attempts=1)
+    before = time.time()
+    scheduler.reschedule("a")
+    deadline = scheduler.reschedule("a")
+    assert scheduler.attempts("a") == 2
+    assert deadline >= before + 4.0
+
+
+def test_discard_stops_polling():
+    scheduler = PollScheduler()
+    now = time.time()
+    scheduler.schedule_at("a", now - 1)
+    scheduler.reschedule("a")
+    scheduler.discard("a")
+    assert "a" not in scheduler
+    assert scheduler.attempts("a") == 0
+    assert scheduler.pop_due(10, now=now + 3600) == []
+    assert scheduler.time_until_next() is None
+
+
+def test_time_until_next_skips_stale_entries():
+    scheduler = PollScheduler()
+    now = time.time()
+    scheduler.schedule_at("a", now + 1)
+    scheduler.schedule_at("a", now + 10)
+    assert scheduler.time_until_next(now=now) == 10
+    assert scheduler.time_until_next(now=now + 20) == 0.0
+
+
+async def test_an_earlier_deadline_ends_a_wait():
+    scheduler = PollScheduler()
+    scheduler.schedule("a", delay=60)
+    await scheduler.wait(max_wait=0)
+    waiter = asyncio.create_task(scheduler.wait(max_wait=60))
+    await asyncio.sleep(0.01)
+    assert not waiter.done()
+
+    scheduler.schedule("b", delay=0)
+    await asyncio.wait_for(waiter, 1)
+
+
+async def test_without_free_slots_only_a_wakeup_ends_a_wait():
+    scheduler = PollScheduler()
+    scheduler.schedule_at("due", time.time() - 1)
+    await scheduler.wait(max_wait=0)
+    waiter = asyncio.create_task(scheduler.wait(max_wait=60, slots_free=False))
+    await asyncio.sleep(0.05)
+    assert not waiter.done()
+
+    scheduler.wake()
+    await asyncio.wait_for(waiter, 1)
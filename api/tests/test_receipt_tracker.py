@@ -0,0 +1,112 @@
+"""ReceiptTracker: confirmation depth and receipts moved or dropped by a reorg"""
+
+import asyncio
+
+import pytest
+from hexbytes import HexBytes
+from web3 import AsyncWeb3
+
+from app.receipt_tracker import ReceiptTracker
+
+TX_HASH = HexBytes("0x" + "ab" * 32)
+
+
+class Reorgs:
+    """Where the fake chain reports TX_HASH as mined; the test moves it"""
+
+    def __init__(self, fake_chain):
+        self.fake_chain = fake_chain
+        self.block = None
+        self.block_hash = None
+
+    def mine(self, block: int, block_hash: bytes):
+        self.block, self.block_hash = block, block_hash
+
+    def drop(self):
+        self.block = self.block_hash = None
+
+    def receipt(self):
+        if self.block is None or self.block > self.fake_chain.block_number:
+            return None
+        return {
+            "transactionHash": TX_HASH.hex(),
+            "status": "0x1",
+            "blockNumber": hex(self.block),
+            "blockHash": "0x" + self.block_hash.hex(),
+            "transactionIndex": "0x0",
+            "from": "0x" + "11" * 20,
+            "to": "0x" + "22" * 20,
+            "gasUsed": hex(100_000),
+            "cumulativeGasUsed": hex(100_000),
+            "effectiveGasPrice": hex(10**8),
+            "logs": [],
+            "logsBloom": "0x" + "00" * 256,
+            "contractAddress": None,
+            "type": "0x2",
+        }
+
+
+@pytest.fixture
+def reorgs(fake_chain, monkeypatch) -> Reorgs:
+    reorgs = Reorgs(fake_chain)
+    dispatch = fake_chain._dispatch
+
+    def receipts(method, params):
+        if method == "eth_getTransactionReceipt" and params[0] == TX_HASH.hex():
+            return reorgs.receipt()
+        return dispatch(method, params)
+
+    monkeypatch.setattr(fake_chain, "_dispatch", receipts)
+    return reorgs
+
+
+@pytest.fixture
+async def tracker(fake_chain):
+    web3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(fake_chain.url + "/"))
+    tracker = ReceiptTracker("base", web3, confirmations=3, poll_interval=0.05)
+    yield tracker
+    await tracker.stop()
+
+
+async def found(tracker: ReceiptTracker):
+    while bytes(TX_HASH) not in tracker._found:
+        await asyncio.sleep(0.02)
+
+
+async def test_waits_for_the_confirmation_depth(tracker, reorgs, fake_chain):
+    reorgs.mine(fake_chain.block_number, b"\x01" * 32)
+    receipt = await tracker.wait([TX_HASH], timeout=5)
+    assert receipt["blockHash"] == HexBytes(b"\x01" * 32)
+    assert tracker._head - receipt["blockNumber"] + 1 >= 3
+
+
+async def test_a_receipt_moved_by_a_reorg_is_returned_from_its_new_block(
+    tracker, reorgs, fake_chain
+):
+    block = fake_chain.block_number
+    reorgs.mine(block, b"\x01" * 32)
+    waiter = asyncio.create_task(tracker.wait([TX_HASH], timeout=5))
+    await asyncio.wait_for(found(tracker), 2)
+
+    reorgs.mine(block + 1, b"\x02" * 32)
+    receipt = await waiter
+    assert receipt["blockHash"] == HexBytes(b"\x02" * 32)
+    assert receipt["blockNumber"] == block + 1
+
+
+async def test_a_receipt_dropped_by_a_reorg_is_looked_up_again(
+    tracker, reorgs, fake_chain
+):
+    reorgs.mine(fake_chain.block_number, b"\x01" * 32)
+    waiter = asyncio.create_task(tracker.wait([TX_HASH], timeout=8))
+    await asyncio.wait_for(found(tracker), 2)
+
+    reorgs.drop()
+    # Long enough for the receipt to reach the confirmation depth and be rechecked
+    await asyncio.sleep(1)
+    assert not waiter.done()
+    assert bytes(TX_HASH) not in tracker._found
+
+    reorgs.mine(fake_chain.block_number, b"\x03" * 32)
+    receipt = await waiter
+    assert receipt["blockHash"] == HexBytes(b"\x03" * 32)
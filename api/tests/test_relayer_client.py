@@ -0,0 +1,58 @@
+"""RedisRelayerClient: API access to relayer workers, with and without their database"""
+
+import logging
+
+import pytest
+from sqlalchemy import inspect
+
+from app.config import settings
+from app.relayer_client import (
+    RedisRelayerClient,
+    RelayerUnavailableError,
+    create_relayer_client,
+)
+from app.relayer_shards import ShardLeases, SharedTransferState
+from app.transfer_store import TransferStore
+
+TX_HASH = "0x" + "ab" * 32
+
+
+@pytest.fixture
+def shared(redis) -> SharedTransferState:
+    return SharedTransferState(
+        redis, ShardLeases(redis, ["0", "3", "6"], worker_id="api")
+    )
+
+
+async def test_without_a_store_status_comes_from_redis_only(shared):
+    client = RedisRelayerClient(shared)
+    await client.start()
+    status = await client.add_transfer(TX_HASH, "base", "arbitrum")
+    assert status["status"] == "pending"
+    assert (await client.lookup_transfer_status(TX_HASH))["status"] == "pending"
+    assert await client.lookup_transfer_status("0x" + "cd" * 32) is None
+    with pytest.raises(RelayerUnavailableError):
+        await client.list_transfers()
+
+
+async def test_a_read_only_store_creates_nothing_and_never_writes(tmp_path):
+    store = TransferStore(
+        f"sqlite+aiosqlite:///{tmp_path / 'relayer.db'}", read_only=True
+    )
+    await store.start()
+    assert store._flush_task is None
+    async with store.engine.connect() as conn:
+        assert await conn.run_sync(lambda sync: inspect(sync).get_table_names()) == []
+    await store.stop()
+
+
+async def test_worker_mode_without_a_database_url_warns_and_continues(
+    monkeypatch, caplog
+):
+    monkeypatch.setattr(settings, "RELAYER_REDIS_URL", "redis://localhost:6379")
+    with caplog.at_level(logging.WARNING):
+        client = create_relayer_client()
+    assert isinstance(client, RedisRelayerClient)
+    assert client.store is None
+    assert "RELAYER_DATABASE_URL not set" in caplog.text
+    await client.shared.redis.aclose()
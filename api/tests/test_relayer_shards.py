@@ -0,0 +1,233 @@
+"""Shard leases, fencing tokens and the shared transfer state scripts"""
+
+import json
+import time
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.cctp_relayer import CCTPTransfer, TransferStatus
+from app.relayer_shards import Lease, ShardLeases, SharedTransferState
+
+SHARDS = ["0", "3", "6"]
+
+
+def transfer(
+    n: int, status: TransferStatus = TransferStatus.PENDING, dest_domain: int = 3
+) -> CCTPTransfer:
+    return CCTPTransfer(
+        tx_hash=f"0x{n:064x}",
+        source_domain=6,
+        dest_domain=dest_domain,
+        amount=10**6,
+        recipient="0xrecipient",
+        status=status,
+    )
+
+
+class Worker:
+    """A worker's leases and shared state, recording shard hand-offs"""
+
+    def __init__(self, redis, worker_id: str):
+        self.leases = ShardLeases(redis, SHARDS, worker_id=worker_id, lease_ttl=15)
+        self.state = SharedTransferState(redis, self.leases)
+        self.acquired = []
+        self.lost = []
+        self.leases._on_acquired = self._acquired
+        self.leases._on_lost = self._lost
+
+    async def _acquired(self, shard: str):
+        self.acquired.append(shard)
+
+    async def _lost(self, shard: str):
+        self.lost.append(shard)
+
+
+@pytest.fixture
+def worker(redis) -> Worker:
+    return Worker(redis, "worker-1")
+
+
+async def take_over(redis, worker: Worker, shard: str, by: str = "worker-2"):
+    """Expire the worker's lease on a shard and acquire it for another worker"""
+    await redis.delete(worker.leases.lease_key(shard))
+    other = Worker(redis, by)
+    token = await other.leases._acquire(
+        keys=[other.leases.lease_key(shard), other.leases.fence_key(shard)],
+        args=[by, 15000],
+    )
+    other.leases.owned[shard] = Lease(
+        token=int(token), expires_at=time.monotonic() + 15
+    )
+    return other
+
+
+async def test_a_lone_worker_acquires_every_shard_with_a_fencing_token(worker, redis):
+    await worker.leases.rebalance()
+    assert sorted(worker.acquired) == SHARDS
+    assert all(
+        worker.leases.owns(shard) and worker.leases.token(shard) == 1
+        for shard in SHARDS
+    )
+    assert await worker.leases.holders() == {shard: "worker-1" for shard in SHARDS}
+    assert await worker.leases.workers() == ["worker-1"]
+
+
+async def test_each_acquisition_issues_a_new_token(worker, redis):
+    await worker.leases.rebalance()
+    await worker.leases.stop()
+    assert await worker.leases.holders() == {shard: None for shard in SHARDS}
+
+    again = Worker(redis, "worker-1b")
+    await again.leases.rebalance()
+    assert {again.leases.token(shard) for shard in SHARDS} == {2}
+
+
+async def test_shards_are_split_between_live_workers(redis):
+    first, second = Worker(redis, "worker-1"), Worker(redis, "worker-2")
+    await first.leases.rebalance()
+    await second.leases.rebalance()
+    # The second worker sees two live workers but every shard is taken
+    assert second.acquired == []
+    await first.leases.rebalance()
+    assert len(first.leases.owned) == 2
+    await second.leases.rebalance()
+    assert len(second.acquired) == 1
+    assert not set(first.leases.owned) & set(second.leases.owned)
+
+
+async def test_a_taken_over_lease_is_lost_on_renewal(worker, redis):
+    await worker.leases.rebalance()
+    await take_over(redis, worker, "3")
+    assert not await worker.leases.verify("3")
+    assert await worker.leases.verify("0")
+
+    await worker.leases.rebalance()
+    assert "3" in worker.lost
+    assert not worker.leases.owns("3")
+
+
+async def test_an_expired_local_deadline_means_the_lease_is_not_owned(worker):
+    await worker.leases.rebalance()
+    worker.leases.owned["3"].expires_at = time.monotonic() - 1
+    assert not worker.leases.owns("3")
+    assert not await worker.leases.verify("3")
+    await worker.leases._drop_expired()
+    assert worker.lost == ["3"]
+
+
+async def test_writes_under_a_stale_token_are_rejected(worker, redis):
+    await worker.leases.rebalance()
+    t = transfer(1)
+    worker.state.mark_dirty(t, "3")
+    assert await worker.state.flush()
+    assert (await worker.state.get(t.key))["status"] == "pending"
+
+    other = await take_over(redis, worker, "3")
+    t.status = TransferStatus.FAILED
+    worker.state.mark_dirty(t, "3")
+    assert not await worker.state.flush()
+    assert (await worker.state.get(t.key))["status"] == "pending"
+
+    # The new owner's token is accepted
+    assert other.leases.token("3") == 2
+    t.status = TransferStatus.COMPLETED
+    other.state.mark_dirty(t, "3")
+    assert await other.state.flush()
+    assert (await other.state.get(t.key))["status"] == "completed"
+
+
+async def test_updates_survive_a_failed_write(worker, monkeypatch):
+    await worker.leases.rebalance()
+    t, other = transfer(1), transfer(2)
+    worker.state.mark_dirty(t, "3")
+    worker.state.mark_dirty(other, "3")
+    newer = transfer(1, TransferStatus.ATTESTED)
+    write = worker.state._write
+
+    async def failing_write(**kwargs):
+        # A newer update for the same transfer arrives while Redis is down
+        worker.state.mark_dirty(newer, "3")
+        raise RedisConnectionError("connection reset")
+
+    monkeypatch.setattr(worker.state, "_write", failing_write)
+    with pytest.raises(RedisConnectionError):
+        await worker.state.flush()
+    assert worker.state._dirty["3"] == {t.key: newer, other.key: other}
+
+    monkeypatch.setattr(worker.state, "_write", write)
+    assert await worker.state.flush()
+    assert (await worker.state.get(t.key))["status"] == "attested"
+    assert (await worker.state.get(other.key))["status"] == "pending"
+
+
+async def test_writes_keep_the_active_set_and_counters_in_step(worker, redis):
+    await worker.leases.rebalance()
+    t = transfer(1)
+    worker.state.mark_dirty(t, "3")
+    await worker.state.flush()
+    assert await redis.smembers("relayer:active:3") == {t.key.encode()}
+
+    t.status = TransferStatus.COMPLETED
+    worker.state.mark_dirty(t, "3")
+    await worker.state.flush()
+    assert await redis.smembers("relayer:active:3") == set()
+    assert await redis.ttl(worker.state.transfer_key(t.key)) > 0
+    assert await worker.state.stats() == {"pending": 0, "completed": 1, "volume": 10**6}
+
+
+async def test_submit_creates_a_row_once_and_queues_it_for_the_owner(worker, redis):
+    t = transfer(1)
+    assert await worker.state.submit(t, "3")
+    assert not await worker.state.submit(t, "3")
+    assert await worker.state.stats() == {"pending": 1}
+
+    await worker.leases.rebalance()
+    inbox = await worker.state.take_inbox("3")
+    assert [row["tx_hash"] for row in inbox] == [t.tx_hash]
+    assert await worker.state.take_inbox("3") == []
+    assert [row["tx_hash"] for row in await worker.state.load_shard("3")] == [t.tx_hash]
+
+
+async def test_move_re_homes_a_transfer_to_its_destination_shard(worker, redis):
+    await worker.leases.rebalance()
+    t = transfer(1)
+    worker.state.mark_dirty(t, "3")
+    await worker.state.flush()
+
+    t.dest_domain = 6
+    t.status = TransferStatus.ATTESTED
+    assert await worker.state.move(t, "3")
+    assert await redis.smembers("relayer:active:3") == set()
+    assert await redis.smembers("relayer:active:6") == {t.key.encode()}
+    assert [row["status"] for row in await worker.state.take_inbox("6")] == ["attested"]
+    assert await worker.state.stats() == {"pending": 0, "attested": 1}
+
+
+async def test_a_move_under_a_stale_token_is_rejected(worker, redis):
+    await worker.leases.rebalance()
+    t = transfer(1)
+    worker.state.mark_dirty(t, "3")
+    await worker.state.flush()
+
+    await take_over(redis, worker, "3")
+    t.dest_domain = 6
+    t.status = TransferStatus.ATTESTED
+    assert not await worker.state.move(t, "3")
+    assert await redis.smembers("relayer:active:3") == {t.key.encode()}
+    assert await redis.smembers("relayer:active:6") == set()
+    assert (await worker.state.get(t.key))["status"] == "pending"
+    assert await worker.state.stats() == {"pending": 1}
+
+
+async def test_stats_are_seeded_only_once(worker):
+    assert await worker.state.seed_stats({"completed": 5, "volume": 100})
+    assert not await worker.state.seed_stats({"completed": 5, "volume": 100})
+    assert await worker.state.stats() == {"completed": 5, "volume": 100}
+
+
+async def test_reports_are_read_back_per_worker(worker):
+    await worker.state.publish_report({"health": {"monitored_transfers": 1}}, ttl=30)
+    reports = await worker.state.reports(["worker-1", "worker-2"])
+    assert reports == {"worker-1": {"health": {"monitored_transfers": 1}}}
+    assert json.loads(await worker.state.redis.get("relayer:report:worker-1"))["health"]
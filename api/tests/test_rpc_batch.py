@@ -0,0 +1,142 @@
+"""JSONRPCBatcher: coalescing concurrent requests into batch arrays"""
+
+import asyncio
+
+import pytest
+from aiohttp import web
+
+from app.rpc_batch import JSONRPCBatcher
+from benchmarks.fakes import ServerThread, _Server
+
+
+class NoBatchServer(_Server):
+    """JSON-RPC endpoint that answers any batch with a single error object"""
+
+    def __init__(self):
+        super().__init__()
+        self.requests = 0
+
+    def routes(self, app: web.Application):
+        app.router.add_post("/", self._handle)
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        body = await request.json()
+        if isinstance(body, list):
+            return web.json_response(
+                {
+                    "jsonrpc": "2.0",
+                    "id": None,
+                    "error": {"code": -32600, "message": "batch not supported"},
+                }
+            )
+        return web.json_response({"jsonrpc": "2.0", "id": body["id"], "result": "0x1"})
+
+
+@pytest.fixture(scope="module")
+def no_batch():
+    server = NoBatchServer()
+    servers = ServerThread(server)
+    servers.start()
+    yield server
+    servers.stop()
+
+
+@pytest.fixture
+async def batchers():
+    """Builds batchers and closes their HTTP sessions after the test"""
+    created = []
+
+    def create(*args, **kwargs) -> JSONRPCBatcher:
+        created.append(JSONRPCBatcher(*args, **kwargs))
+        return created[-1]
+
+    yield create
+    for batcher in created:
+        await batcher.close()
+
+
+async def test_concurrent_requests_share_one_http_request(fake_chain, batchers):
+    batcher = batchers(fake_chain.url)
+    chain_id, block, balance = await asyncio.gather(
+        batcher.request("eth_chainId", []),
+        batcher.request("eth_blockNumber", []),
+        batcher.request("eth_getBalance", ["0x" + "11" * 20, "latest"]),
+    )
+    assert int(chain_id["result"], 16) == 8453
+    assert int(block["result"], 16) >= 100
+    assert int(balance["result"], 16) == 10**20
+    assert (batcher.calls, batcher.http_requests) == (3, 1)
+
+
+async def test_batches_are_split_at_the_size_limit(fake_chain, batchers):
+    batcher = batchers(fake_chain.url, max_batch_size=4)
+    responses = await asyncio.gather(
+        *(batcher.request("eth_chainId", []) for _ in range(10))
+    )
+    assert all(response["result"] == hex(8453) for response in responses)
+    assert batcher.http_requests == 3
+
+
+async def test_sequential_requests_are_sent_separately(fake_chain, batchers):
+    batcher = batchers(fake_chain.url)
+    await batcher.request("eth_chainId", [])
+    await batcher.request("eth_chainId", [])
+    assert batcher.http_requests == 2
+
+
+async def test_sends_bypass_the_batch(fake_chain, batchers):
+    batcher = batchers(fake_chain.url)
+    chain_id, block, sent = await asyncio.gather(
+        batcher.request("eth_chainId", []),
+        batcher.request("eth_blockNumber", []),
+        batcher.send("eth_chainId", []),
+    )
+    assert chain_id["result"] == sent["result"] == hex(8453)
+    assert int(block["result"], 16) >= 100
+    assert (batcher.calls, batcher.http_requests) == (3, 2)
+
+
+async def test_a_batch_window_collects_requests_across_turns(fake_chain, batchers):
+    batcher = batchers(fake_chain.url, batch_window=0.05)
+
+    async def later(delay: float):
+        await asyncio.sleep(delay)
+        return await batcher.request("eth_chainId", [])
+
+    await asyncio.gather(later(0), later(0.01), later(0.02))
+    assert batcher.http_requests == 1
+
+
+async def test_errors_are_returned_per_request(fake_chain, batchers):
+    batcher = batchers(fake_chain.url)
+    ok, unsupported = await asyncio.gather(
+        batcher.request("eth_chainId", []),
+        batcher.request("eth_unknownMethod", []),
+    )
+    assert ok["result"] == hex(8453)
+    assert unsupported["error"]["code"] == -32601
+
+
+async def test_endpoints_rejecting_batches_get_single_requests(no_batch, batchers):
+    batcher = batchers(no_batch.url)
+    responses = await asyncio.gather(
+        *(batcher.request("eth_chainId", []) for _ in range(3))
+    )
+    assert [response["result"] for response in responses] == ["0x1"] * 3
+    assert not batcher.supports_batch
+
+    before = no_batch.requests
+    await asyncio.gather(*(batcher.request("eth_chainId", []) for _ in range(2)))
+    assert no_batch.requests - before == 2
+
+
+async def test_transport_errors_fail_every_request_in_the_batch(batchers):
+    batcher = batchers("http://127.0.0.1:1")
+    results = await asyncio.gather(
+        batcher.request("eth_chainId", []),
+        batcher.request("eth_blockNumber", []),
+        return_exceptions=True,
+    )
+    assert all(isinstance(result, Exception) for result in results)
+    assert batcher.http_requests == 1
@@ -0,0 +1,179 @@
+"""RPCPool: ranking, hedged reads and the per-endpoint circuit breaker"""
+
+import asyncio
+import time
+
+import aiohttp
+import pytest
+from aiohttp import web
+from eth_account import Account
+
+from app.rpc_pool import RPCPool
+from benchmarks.fakes import FakeChain, ServerThread
+
+
+class FlakyChain(FakeChain):
+    """FakeChain that answers HTTP 500 while ``failing`` is set"""
+
+    failing = False
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        if self.failing:
+            return web.Response(status=500)
+        return await super()._handle(request)
+
+
+@pytest.fixture(scope="module")
+def chains():
+    slow, fast, flaky = FakeChain(8453, latency=0.5), FakeChain(8453), FlakyChain(8453)
+    servers = ServerThread(slow, fast, flaky)
+    servers.start()
+    yield slow, fast, flaky
+    servers.stop()
+
+
+@pytest.fixture
+def flaky(chains):
+    chain = chains[2]
+    chain.failing = False
+    yield chain
+    chain.failing = False
+
+
+@pytest.fixture
+async def pools():
+    """Builds pools and closes their HTTP sessions after the test"""
+    created = []
+
+    def create(*args, **kwargs) -> RPCPool:
+        created.append(RPCPool(*args, **kwargs))
+        return created[-1]
+
+    yield create
+    for pool in created:
+        await pool.disconnect()
+
+
+async def test_a_slow_read_is_hedged_to_the_next_endpoint(chains, pools):
+    slow, fast, _ = chains
+    pool = pools([slow.url, fast.url], name="base", max_hedge_delay=0.05)
+    started = time.monotonic()
+    response = await pool.make_request("eth_chainId", [])
+    assert response["result"] == hex(8453)
+    assert time.monotonic() - started < 0.4
+    assert pool.hedged == 1
+    # The cancelled loser's elapsed time still counts against it
+    await asyncio.sleep(0)
+    assert [e.url for e in pool.ranked()] == [fast.url, slow.url]
+
+
+async def test_fast_reads_are_not_hedged(chains, pools):
+    _, fast, _ = chains
+    pool = pools([fast.url, fast.url + "/"], name="base", max_hedge_delay=1.0)
+    for _ in range(3):
+        await pool.make_request("eth_blockNumber", [])
+    assert pool.hedged == 0
+
+
+async def test_writes_are_never_hedged(chains, pools):
+    slow, fast, _ = chains
+    pool = pools([slow.url, fast.url], name="base", max_hedge_delay=0.05)
+    tx = {
+        "to": "0x" + "22" * 20,
+        "value": 0,
+        "gas": 21000,
+        "gasPrice": 10**8,
+        "nonce": 0,
+        "chainId": 8453,
+    }
+    signed = Account.create().sign_transaction(tx)
+    response = await pool.make_request(
+        "eth_sendRawTransaction", ["0x" + bytes(signed.rawTransaction).hex()]
+    )
+    assert response["result"].startswith("0x")
+    assert pool.hedged == 0
+    assert pool.endpoints[1].requests == 0
+
+
+async def test_writes_are_not_batched_with_reads(chains, pools):
+    _, fast, _ = chains
+    pool = pools([fast.url], name="base")
+    tx = {
+        "to": "0x" + "22" * 20,
+        "value": 0,
+        "gas": 21000,
+        "gasPrice": 10**8,
+        "nonce": 1,
+        "chainId": 8453,
+    }
+    signed = Account.create().sign_transaction(tx)
+    *_, sent = await asyncio.gather(
+        pool.make_request("eth_chainId", []),
+        pool.make_request("eth_blockNumber", []),
+        pool.make_request(
+            "eth_sendRawTransaction", ["0x" + bytes(signed.rawTransaction).hex()]
+        ),
+    )
+    assert sent["result"].startswith("0x")
+    assert pool.endpoints[0].transport.http_requests == 2
+
+
+async def test_reads_fail_over_from_an_unreachable_endpoint(chains, pools):
+    _, fast, _ = chains
+    pool = pools(["http://127.0.0.1:1", fast.url], name="base")
+    response = await pool.make_request("eth_chainId", [])
+    assert response["result"] == hex(8453)
+    assert pool.endpoints[0].failures == 1
+
+
+async def test_consecutive_failures_open_the_breaker(chains, flaky, pools):
+    _, fast, _ = chains
+    pool = pools([flaky.url, fast.url], name="base", failure_threshold=3, cooldown=60)
+    flaky.failing = True
+    endpoint = pool.endpoints[0]
+    for _ in range(3):
+        # Keep the flaky endpoint first so every read tries it
+        endpoint.ewma = None
+        pool.endpoints[1].ewma = 1.0
+        assert (await pool.make_request("eth_chainId", []))["result"] == hex(8453)
+    assert endpoint.state == "open"
+    assert pool.ranked() == [pool.endpoints[1]]
+
+    requests = endpoint.requests
+    await pool.make_request("eth_chainId", [])
+    assert endpoint.requests == requests
+
+
+async def test_a_successful_trial_closes_the_breaker(flaky, pools):
+    pool = pools([flaky.url], name="base", failure_threshold=1, cooldown=0.05)
+    endpoint = pool.endpoints[0]
+    flaky.failing = True
+    with pytest.raises(aiohttp.ClientResponseError):
+        await pool.make_request("eth_chainId", [])
+    assert endpoint.state == "open"
+
+    await asyncio.sleep(0.06)
+    assert endpoint.state == "half_open"
+    flaky.failing = False
+    await pool.make_request("eth_chainId", [])
+    assert endpoint.state == "closed"
+    assert endpoint.times_opened == 0
+
+
+async def test_a_failed_trial_reopens_with_a_longer_cooldown(flaky, pools):
+    pool = pools([flaky.url], name="base", failure_threshold=1, cooldown=0.05)
+    endpoint = pool.endpoints[0]
+    flaky.failing = True
+    with pytest.raises(aiohttp.ClientResponseError):
+        await pool.make_request("eth_chainId", [])
+    await asyncio.sleep(0.06)
+    with pytest.raises(aiohttp.ClientResponseError):
+        await pool.make_request("eth_chainId", [])
+    assert endpoint.state == "open"
+    assert endpoint.times_opened == 2
+    assert endpoint.open_until - time.monotonic() > 0.05
+
+
+def test_a_pool_needs_an_endpoint():
+    with pytest.raises(ValueError):
+        RPCPool([])
@@ -0,0 +1,63 @@
+"""SignerPool: least-loaded assignment and balance-based rotation"""
+
+import pytest
+from eth_account import Account
+from web3 import AsyncWeb3
+
+from app.signer_pool import SignerPool
+
+
+@pytest.fixture
+def pool(fake_chain) -> SignerPool:
+    web3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(fake_chain.url + "/"))
+    return SignerPool("base", web3, [Account.create() for _ in range(3)])
+
+
+def test_needs_an_account(fake_chain):
+    web3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(fake_chain.url + "/"))
+    with pytest.raises(ValueError):
+        SignerPool("base", web3, [])
+
+
+async def test_transactions_go_to_the_least_loaded_signer(pool):
+    first = [pool.acquire() for _ in range(3)]
+    assert len({signer.address for signer in first}) == 3
+
+    pool.release(first[1])
+    assert pool.acquire() is first[1]
+
+    # Equal assignments: fewer nonces in flight wins
+    for signer in (first[0], first[2]):
+        signer.nonces.mark_sent(await signer.nonces.allocate())
+    assert pool.acquire() is first[1]
+
+
+async def test_each_signer_has_its_own_nonce_sequence(pool):
+    nonces = [await signer.nonces.allocate() for signer in pool]
+    assert nonces == [0, 0, 0]
+    for signer, nonce in zip(pool, nonces, strict=True):
+        signer.nonces.mark_sent(nonce)
+    assert pool.in_flight == 3
+
+
+async def test_underfunded_signers_leave_rotation_until_topped_up(pool):
+    await pool.refresh_balances()
+    assert all(signer.balance == 10**20 and signer.funded for signer in pool)
+
+    low, *others = pool.signers
+    pool.min_balance = 10**20
+    assert pool.acquire() is low
+    pool.release(low, {"gasUsed": 21_000, "effectiveGasPrice": 10**8})
+    assert not low.funded
+    assert low.balance == 10**20 - 21_000 * 10**8
+    assert {pool.acquire().address for _ in range(4)} == {s.address for s in others}
+
+    await pool.refresh_balances()
+    assert low.funded
+
+
+async def test_an_unfunded_pool_still_hands_out_a_signer(pool):
+    pool.min_balance = 10**21
+    await pool.refresh_balances()
+    assert not any(signer.funded for signer in pool)
+    assert pool.acquire() in pool.signers
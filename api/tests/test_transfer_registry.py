@@ -0,0 +1,208 @@
+"""TransferRegistry: status buckets, eviction into the archive and paging"""
+
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.cctp_relayer import CCTPTransfer, TransferStatus
+from app.transfer_registry import TransferRegistry, utc_datetime, utc_timestamp
+
+START = datetime(2025, 1, 1)
+
+
+def transfer(
+    n: int, status: TransferStatus = TransferStatus.PENDING, dest_domain: int = 3
+) -> CCTPTransfer:
+    return CCTPTransfer(
+        tx_hash=f"0x{n:064x}",
+        source_domain=6,
+        dest_domain=dest_domain,
+        amount=n * 10**6,
+        recipient="0xrecipient",
+        status=status,
+        created_at=START + timedelta(seconds=n),
+    )
+
+
+def registry(**kwargs) -> TransferRegistry:
+    return TransferRegistry(
+        statuses=TransferStatus,
+        terminal_statuses=(TransferStatus.COMPLETED, TransferStatus.FAILED),
+        attested_status=TransferStatus.ATTESTED,
+        **kwargs,
+    )
+
+
+def test_status_changes_move_transfers_between_buckets():
+    transfers = registry()
+    t = transfer(1)
+    transfers.add(t)
+    assert t.key in transfers and transfers[t.key] is t
+    assert list(transfers.bucket(TransferStatus.PENDING)) == [t.key]
+
+    transfers.set_status(t, TransferStatus.ATTESTED)
+    assert t.status == TransferStatus.ATTESTED
+    assert transfers.count(TransferStatus.PENDING) == 0
+    assert transfers.count(TransferStatus.ATTESTED) == 1
+    assert transfers.totals[TransferStatus.PENDING] == 0
+    assert transfers.totals[TransferStatus.ATTESTED] == 1
+
+
+def test_messages_of_one_source_transaction_are_separate_transfers():
+    transfers = registry()
+    first, second = transfer(1), transfer(1)
+    second.message_index = 1
+    transfers.add(first)
+    transfers.add(second)
+    assert second.key == f"{first.tx_hash}:1"
+    assert len(transfers) == 2
+    assert transfers[first.key] is first and transfers[second.key] is second
+
+
+def test_attested_transfers_are_indexed_by_destination():
+    transfers = registry()
+    to_arbitrum, to_base = transfer(1, dest_domain=3), transfer(2, dest_domain=6)
+    for t in (to_arbitrum, to_base):
+        transfers.add(t)
+        transfers.set_status(t, TransferStatus.ATTESTED)
+    assert list(transfers.attested_for_domain(3).values()) == [to_arbitrum]
+    assert transfers.attested_for_domain(0) == {}
+    assert {t.key for t in transfers.attested()} == {to_arbitrum.key, to_base.key}
+
+    transfers.set_status(to_arbitrum, TransferStatus.COMPLETING)
+    assert transfers.attested_for_domain(3) == {}
+
+
+def test_terminal_transfers_are_archived_after_the_ttl():
+    transfers = registry(terminal_ttl=60)
+    done, active = transfer(1), transfer(2)
+    transfers.add(done)
+    transfers.add(active)
+    transfers.set_status(done, TransferStatus.COMPLETED)
+
+    assert transfers.evict() == 0
+    assert transfers.evict(now=time.time() + 61) == 1
+    assert done.key not in transfers and active.key in transfers
+    archived = transfers.get_archived(done.key)
+    assert archived.status == "completed"
+    assert archived.amount == done.amount
+    assert transfers.count(TransferStatus.COMPLETED) == 0
+    # Totals and volume still cover the archived transfer
+    assert transfers.totals[TransferStatus.COMPLETED] == 1
+    assert transfers.volumes[TransferStatus.COMPLETED] == done.amount
+
+
+def test_terminal_transfers_beyond_the_cap_are_archived_oldest_first():
+    transfers = registry(max_terminal=2)
+    finished = [transfer(n) for n in range(4)]
+    for t in finished:
+        transfers.add(t)
+        transfers.set_status(t, TransferStatus.FAILED)
+    assert transfers.evict() == 2
+    assert [key for key in transfers.archive] == [finished[0].key, finished[1].key]
+
+
+def test_archive_is_capped():
+    transfers = registry(max_terminal=0, max_archived=2)
+    for n in range(3):
+        t = transfer(n)
+        transfers.add(t)
+        transfers.set_status(t, TransferStatus.COMPLETED)
+        transfers.evict()
+    assert len(transfers.archive) == 2
+    assert transfers.get_archived(transfer(0).key) is None
+    assert [record.tx_hash for _, record in transfers.newest()] == [
+        transfer(2).tx_hash,
+        transfer(1).tx_hash,
+    ]
+    assert transfers.totals[TransferStatus.COMPLETED] == 3
+
+
+def test_archived_times_are_utc_whatever_the_local_zone(monkeypatch):
+    monkeypatch.setenv("TZ", "America/New_York")
+    time.tzset()
+    try:
+        transfers = registry(max_terminal=0)
+        t = transfer(1, TransferStatus.COMPLETED)
+        t.completed_at = START + timedelta(minutes=5)
+        transfers.add(t)
+        transfers.evict()
+        archived = transfers.get_archived(t.key)
+        assert (
+            archived.created_at
+            == datetime(2025, 1, 1, 0, 0, 1).replace(tzinfo=timezone.utc).timestamp()
+        )
+        assert utc_datetime(archived.created_at) == t.created_at
+        assert utc_datetime(archived.completed_at) == t.completed_at
+    finally:
+        monkeypatch.undo()
+        time.tzset()
+
+
+def test_re_adding_an_archived_transfer_replaces_its_record():
+    transfers = registry(max_terminal=0)
+    t = transfer(1)
+    transfers.add(t)
+    transfers.set_status(t, TransferStatus.FAILED)
+    transfers.evict()
+
+    retry = transfer(1)
+    transfers.add(retry)
+    assert transfers.get_archived(t.key) is None
+    assert transfers.totals[TransferStatus.FAILED] == 0
+    assert transfers.totals[TransferStatus.PENDING] == 1
+    assert len(list(transfers.newest())) == 1
+
+
+def test_remove_forgets_without_archiving():
+    transfers = registry()
+    t = transfer(1)
+    transfers.add(t)
+    transfers.remove(t.key)
+    assert t.key not in transfers
+    assert transfers.get_archived(t.key) is None
+    assert transfers.totals[TransferStatus.PENDING] == 0
+    assert list(transfers.newest()) == []
+
+
+def test_newest_pages_through_live_and_archived_transfers():
+    transfers = registry(max_terminal=0)
+    for n in range(5):
+        t = transfer(n)
+        transfers.add(t)
+        if n % 2:
+            transfers.set_status(t, TransferStatus.COMPLETED)
+    transfers.evict()
+    assert len(transfers.archive) == 2
+
+    page = list(transfers.newest())[:3]
+    assert [record.tx_hash for _, record in page] == [
+        transfer(n).tx_hash for n in (4, 3, 2)
+    ]
+    cursor = page[-1][0]
+    rest = [record.tx_hash for _, record in transfers.newest(before=cursor)]
+    assert rest == [transfer(n).tx_hash for n in (1, 0)]
+
+    since = utc_timestamp(START + timedelta(seconds=3))
+    assert len(list(transfers.newest(since=since))) == 2
+
+
+def test_history_adds_to_totals():
+    transfers = registry()
+    transfers.add_history(TransferStatus.COMPLETED, 10, volume=5 * 10**6)
+    transfers.add_history(TransferStatus.PENDING, 2)
+    assert transfers.totals[TransferStatus.COMPLETED] == 10
+    assert transfers.volumes[TransferStatus.COMPLETED] == 5 * 10**6
+    assert TransferStatus.PENDING not in transfers.volumes
+
+
+@pytest.mark.parametrize("status", [TransferStatus.COMPLETED, TransferStatus.FAILED])
+def test_leaving_a_terminal_status_cancels_its_eviction(status):
+    transfers = registry(max_terminal=0)
+    t = transfer(1)
+    transfers.add(t)
+    transfers.set_status(t, status)
+    transfers.set_status(t, TransferStatus.ATTESTED)
+    assert transfers.evict() == 0
+    assert t.key in transfers
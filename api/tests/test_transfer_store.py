@@ -0,0 +1,64 @@
+"""TransferStore schema and filtered history pages"""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import inspect, text
+
+from app.cctp_relayer import CCTPTransfer, TransferStatus
+from app.transfer_store import TransferStore
+
+START = datetime(2026, 1, 1)
+
+
+def transfer(n: int, dest_domain: int = 3) -> CCTPTransfer:
+    return CCTPTransfer(
+        tx_hash=f"0x{n:064x}",
+        source_domain=6,
+        dest_domain=dest_domain,
+        amount=10**6,
+        recipient="0xrecipient",
+        status=TransferStatus.COMPLETED,
+        created_at=START + timedelta(minutes=n),
+    )
+
+
+async def index_names(store: TransferStore):
+    async with store.engine.connect() as conn:
+        return await conn.run_sync(
+            lambda sync: {
+                index["name"]
+                for index in inspect(sync).get_indexes("relayer_transfers")
+            }
+        )
+
+
+async def test_indexes_added_later_are_created_on_an_existing_table(tmp_path):
+    url = f"sqlite+aiosqlite:///{tmp_path / 'relayer.db'}"
+    store = TransferStore(url)
+    await store.start()
+    async with store.engine.begin() as conn:
+        await conn.execute(
+            text("DROP INDEX ix_relayer_transfers_dest_domain_created_at")
+        )
+    await store.stop()
+
+    store = TransferStore(url)
+    await store.start()
+    assert "ix_relayer_transfers_dest_domain_created_at" in await index_names(store)
+    await store.stop()
+
+
+async def test_filtered_pages_continue_past_the_cursor(tmp_path):
+    store = TransferStore(f"sqlite+aiosqlite:///{tmp_path / 'relayer.db'}")
+    await store.start()
+    for n in range(10):
+        store.mark_dirty(transfer(n, dest_domain=3 if n % 2 else 7))
+    await store.flush()
+
+    first = await store.page(limit=2, dest_domain=3)
+    assert [row["tx_hash"] for row in first] == [f"0x{n:064x}" for n in (9, 7)]
+    last = first[-1]
+    before = (last["created_at"], last["tx_hash"], last["message_index"])
+    second = await store.page(before, limit=2, dest_domain=3)
+    assert [row["tx_hash"] for row in second] == [f"0x{n:064x}" for n in (5, 3)]
+    await store.stop()
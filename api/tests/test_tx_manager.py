@@ -0,0 +1,94 @@
+"""TransactionManager: replacing stuck transactions with higher fees"""
+
+import pytest
+from eth_account import Account
+from eth_utils import keccak
+from web3 import AsyncWeb3, Web3
+
+from app.fee_oracle import FeeOracle
+from app.receipt_tracker import ReceiptTracker
+from app.signer_pool import Signer
+from app.tx_manager import SentTransaction, TransactionManager
+
+RECIPIENT = Web3.to_checksum_address("0x" + "22" * 20)
+
+
+@pytest.fixture
+def web3(fake_chain) -> AsyncWeb3:
+    return AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(fake_chain.url + "/"))
+
+
+@pytest.fixture
+async def receipts(web3):
+    tracker = ReceiptTracker("base", web3, poll_interval=0.05)
+    yield tracker
+    await tracker.stop()
+
+
+@pytest.fixture
+def held_back(fake_chain, monkeypatch):
+    """Keep the first transaction sent out of every block, as if underpriced"""
+    dispatch = fake_chain._dispatch
+    held = []
+
+    def hold_first(method, params):
+        if method == "eth_sendRawTransaction" and not held:
+            held.append(params[0])
+            return "0x" + keccak(bytes.fromhex(params[0][2:])).hex()
+        return dispatch(method, params)
+
+    monkeypatch.setattr(fake_chain, "_dispatch", hold_first)
+    return held
+
+
+async def send(web3, oracle: FeeOracle) -> SentTransaction:
+    signer = Signer("base", Account.create(), web3)
+    tx = {
+        "to": RECIPIENT,
+        "value": 0,
+        "gas": 21_000,
+        "nonce": await signer.nonces.allocate(),
+        "chainId": await oracle.get_chain_id(),
+        **(await oracle.quote()).tx_params(),
+    }
+    signed = signer.account.sign_transaction(tx)
+    tx_hash = await web3.eth.send_raw_transaction(signed.rawTransaction)
+    signer.nonces.mark_sent(tx["nonce"])
+    return SentTransaction(chain="base", signer=signer, tx=tx, hashes=[tx_hash])
+
+
+async def test_a_stuck_transaction_is_replaced_with_higher_fees(
+    web3, receipts, held_back
+):
+    oracle = FeeOracle("base", web3)
+    manager = TransactionManager("base", web3, oracle, receipts, bump_after=0.3)
+    sent = await send(web3, oracle)
+    first = dict(sent.tx)
+
+    receipt = await manager.confirm(sent)
+    assert len(held_back) == 1
+    assert sent.replacements == 1 and manager.replaced == 1
+    assert receipt["transactionHash"] == sent.hashes[1]
+    for key in ("maxFeePerGas", "maxPriorityFeePerGas"):
+        assert sent.tx[key] > first[key] * 1.1
+    assert sent.tx["nonce"] == first["nonce"]
+    assert not manager.watching(sent.signer.address)
+
+
+async def test_fees_stop_rising_at_the_cap(web3, receipts, held_back):
+    oracle = FeeOracle("base", web3)
+    manager = TransactionManager(
+        "base",
+        web3,
+        oracle,
+        receipts,
+        bump_after=0.2,
+        max_fee_multiplier=1.05,
+        timeout=1.0,
+    )
+    sent = await send(web3, oracle)
+
+    with pytest.raises(TimeoutError):
+        await manager.confirm(sent)
+    assert sent.capped
+    assert sent.replacements == 0 and len(sent.hashes) == 1
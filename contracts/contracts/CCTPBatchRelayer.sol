@@ -0,0 +1,54 @@
+// SPDX-License-Identifier: MIT
+pragma solidity 0.8.22;
+
+import "./libraries/SharedInterfaces.sol";
+import "./libraries/ValidationLibrary.sol";
+
+/**
+ * @title CCTPBatchRelayer
+ * @notice Relays several attested CCTP messages to the MessageTransmitter in one transaction
+ * @dev Deployed next to CCTPHookReceiver on each destination chain and used by the off-chain
+ *      relayer during bursts. The batch is atomic: if any message fails, the whole call reverts
+ *      with the index of the failing message so the relayer can fall back to individual
+ *      submission. Only messages with an unrestricted destinationCaller can be batched, since
+ *      the MessageTransmitter sees this contract as the caller.
+ */
+contract CCTPBatchRelayer {
+    IMessageTransmitter public immutable messageTransmitter;
+
+    event BatchRelayed(address indexed relayer, uint256 count);
+
+    error LengthMismatch();
+    error EmptyBatch();
+    error MessageFailed(uint256 index, bytes reason);
+
+    constructor(address _messageTransmitter) {
+        ValidationLibrary.validateAddress(_messageTransmitter);
+        messageTransmitter = IMessageTransmitter(_messageTransmitter);
+    }
+
+    /**
+     * @notice Receive a batch of CCTP messages
+     * @param messages Encoded CCTP messages
+     * @param attestations Attestations matching each message
+     */
+    function receiveMessages(
+        bytes[] calldata messages,
+        bytes[] calldata attestations
+    ) external {
+        uint256 count = messages.length;
+        if (count == 0) revert EmptyBatch();
+        if (count != attestations.length) revert LengthMismatch();
+
+        for (uint256 i = 0; i < count; ) {
+            try messageTransmitter.receiveMessage(messages[i], attestations[i]) returns (bool success) {
+                if (!success) revert MessageFailed(i, "");
+            } catch (bytes memory reason) {
+                revert MessageFailed(i, reason);
+            }
+            unchecked { ++i; }
+        }
+
+        emit BatchRelayed(msg.sender, count);
+    }
+}
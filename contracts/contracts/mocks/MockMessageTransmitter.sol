@@ -0,0 +1,20 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.22;
+
+contract MockMessageTransmitter {
+    mapping(bytes32 => uint256) public usedNonces;
+
+    event MessageReceived(address caller, bytes message);
+
+    function receiveMessage(
+        bytes calldata message,
+        bytes calldata attestation
+    ) external returns (bool) {
+        require(attestation.length > 0, "Invalid attestation");
+        bytes32 key = keccak256(message);
+        require(usedNonces[key] == 0, "Nonce already used");
+        usedNonces[key] = 1;
+        emit MessageReceived(msg.sender, message);
+        return true;
+    }
+}
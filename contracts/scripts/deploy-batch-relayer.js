@@ -0,0 +1,48 @@
+const { ethers, network } = require("hardhat");
+const { config } = require("./config");
+
+// CCTP v2 MessageTransmitter (same address on every mainnet chain)
+const MESSAGE_TRANSMITTER_V2 = "0x81D40F21F12A8F0E3252Bccb954D722d4c464B64";
+
+// Deploys a CCTPBatchRelayer for the relayer (api/run_relayer.py) on one
+// destination chain. Each batch relayer calls a single MessageTransmitter and
+// so only relays messages of that CCTP version; deploy one per version to
+// batch both.
+//
+//   npx hardhat run scripts/deploy-batch-relayer.js --network base
+//   CCTP_VERSION=v1 npx hardhat run scripts/deploy-batch-relayer.js --network base
+//   MESSAGE_TRANSMITTER=0x... npx hardhat run scripts/deploy-batch-relayer.js --network baseSepolia
+async function main() {
+  const version = process.env.CCTP_VERSION || "v2";
+  let transmitter = process.env.MESSAGE_TRANSMITTER;
+  if (!transmitter) {
+    if (version === "v2") {
+      transmitter = MESSAGE_TRANSMITTER_V2;
+    } else if (config[network.name]) {
+      transmitter = config[network.name].cctpMessageTransmitter;
+    } else {
+      throw new Error(`No CCTP v1 MessageTransmitter known for ${network.name}; set MESSAGE_TRANSMITTER`);
+    }
+  }
+
+  const [deployer] = await ethers.getSigners();
+  console.log(`Deploying CCTPBatchRelayer on ${network.name}...\n`);
+  console.log("Deployer:", deployer.address);
+  console.log(`MessageTransmitter (${version}):`, transmitter);
+
+  const CCTPBatchRelayer = await ethers.getContractFactory("CCTPBatchRelayer");
+  const batchRelayer = await CCTPBatchRelayer.deploy(transmitter);
+  await batchRelayer.waitForDeployment();
+
+  const address = await batchRelayer.getAddress();
+  console.log("✅ CCTPBatchRelayer deployed to:", address);
+  console.log("\nAdd it to the relayer's environment (comma-separated with other chains):");
+  console.log(`RELAYER_BATCH_RELAYERS=${network.name}=${address}`);
+}
+
+main()
+  .then(() => process.exit(0))
+  .catch((error) => {
+    console.error(error);
+    process.exit(1);
+  });
@@ -0,0 +1,54 @@
+const { expect } = require("chai");
+const { ethers } = require("hardhat");
+
+describe("CCTPBatchRelayer", function () {
+  let batchRelayer;
+  let transmitter;
+  let relayer;
+
+  const messages = ["0x01", "0x02", "0x03"];
+  const attestations = ["0xaa", "0xbb", "0xcc"];
+
+  beforeEach(async function () {
+    [, relayer] = await ethers.getSigners();
+
+    const MockMessageTransmitter = await ethers.getContractFactory("MockMessageTransmitter");
+    transmitter = await MockMessageTransmitter.deploy();
+    await transmitter.waitForDeployment();
+
+    const CCTPBatchRelayer = await ethers.getContractFactory("CCTPBatchRelayer");
+    batchRelayer = await CCTPBatchRelayer.deploy(await transmitter.getAddress());
+    await batchRelayer.waitForDeployment();
+  });
+
+  it("Should relay every message in the batch", async function () {
+    await expect(batchRelayer.connect(relayer).receiveMessages(messages, attestations))
+      .to.emit(batchRelayer, "BatchRelayed")
+      .withArgs(relayer.address, messages.length);
+
+    for (const message of messages) {
+      expect(await transmitter.usedNonces(ethers.keccak256(message))).to.equal(1);
+    }
+  });
+
+  it("Should revert the whole batch with the index of the failing message", async function () {
+    await transmitter.receiveMessage(messages[1], attestations[1]);
+
+    await expect(batchRelayer.receiveMessages(messages, attestations))
+      .to.be.revertedWithCustomError(batchRelayer, "MessageFailed");
+
+    expect(await transmitter.usedNonces(ethers.keccak256(messages[0]))).to.equal(0);
+  });
+
+  it("Should reject empty and mismatched batches", async function () {
+    await expect(batchRelayer.receiveMessages([], []))
+      .to.be.revertedWithCustomError(batchRelayer, "EmptyBatch");
+    await expect(batchRelayer.receiveMessages(messages, attestations.slice(1)))
+      .to.be.revertedWithCustomError(batchRelayer, "LengthMismatch");
+  });
+
+  it("Should reject a zero transmitter address", async function () {
+    const CCTPBatchRelayer = await ethers.getContractFactory("CCTPBatchRelayer");
+    await expect(CCTPBatchRelayer.deploy(ethers.ZeroAddress)).to.be.revertedWith("VL: Zero address");
+  });
+});
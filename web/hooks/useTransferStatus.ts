@@ -1,10 +1,12 @@
 import { useState, useEffect, useCallback } from 'react'
-import { getTransferStatus, type TransferStatus } from '@/lib/relayer-api'
+import { getTransferStatus, subscribeTransferStatus, type TransferStatus } from '@/lib/relayer-api'
 
 export function useTransferStatus(txHash: string | null, enabled: boolean = true) {
   const [status, setStatus] = useState<TransferStatus | null>(null)
   const [isLoading, setIsLoading] = useState(false)
   const [error, setError] = useState<Error | null>(null)
+  // Set when the status stream is unavailable, switching to polling
+  const [polling, setPolling] = useState(false)
 
   const fetchStatus = useCallback(async () => {
     if (!txHash || !enabled) return
@@ -22,23 +24,40 @@ export function useTransferStatus(txHash: string | null, enabled: boolean = true
     }
   }, [txHash, enabled])
 
+  // Stream status changes as the relayer records them
   useEffect(() => {
     if (!txHash || !enabled) return
 
+    setPolling(false)
+    setIsLoading(true)
+    const close = subscribeTransferStatus(
+      txHash,
+      (result) => {
+        setStatus(result)
+        setIsLoading(false)
+      },
+      () => setPolling(true)
+    )
+    if (!close) {
+      setPolling(true)
+      return
+    }
+
+    return close
+  }, [txHash, enabled])
+
+  // Fallback: poll while the transfer is pending
+  useEffect(() => {
+    if (!txHash || !enabled || !polling) return
+    if (status && (status.status === 'completed' || status.status === 'failed')) return
+
     // Initial fetch
     fetchStatus()
 
-    // Poll for updates while transfer is pending
-    const interval = setInterval(() => {
-      if (status && (status.status === 'completed' || status.status === 'failed')) {
-        clearInterval(interval)
-        return
-      }
-      fetchStatus()
-    }, 5000) // Check every 5 seconds
+    const interval = setInterval(fetchStatus, 5000) // Check every 5 seconds
 
     return () => clearInterval(interval)
-  }, [txHash, enabled, fetchStatus, status])
+  }, [txHash, enabled, polling, fetchStatus, status?.status])
 
   return { status, isLoading, error, refetch: fetchStatus }
 }
@@ -10,15 +10,17 @@ export interface MonitorTransferRequest {
 
 export interface TransferStatus {
   tx_hash: string
+  message_index?: number
   status: 'pending' | 'attested' | 'completing' | 'completed' | 'failed'
   source_domain: number
   dest_domain: number
   amount: number
   recipient: string | null
-  event_nonce: number | null
+  event_nonce: string | null
   created_at: string
   completed_at: string | null
   has_attestation: boolean
+  completion_tx_hash?: string | null
 }
 
 // Map chain IDs to chain names for the API
@@ -137,8 +139,51 @@ export async function getTransferStatus(txHash: string): Promise<TransferStatus
   }
 }
 
+function isTerminal(status: TransferStatus): boolean {
+  return status.status === 'completed' || status.status === 'failed'
+}
+
 /**
- * Poll for transfer completion
+ * Stream status changes of a transfer from the relayer (Server-Sent Events)
+ *
+ * The current status is delivered first, then every transition as the
+ * relayer records it; the stream closes itself once the transfer completes
+ * or fails. Returns a function that closes the stream, or null where
+ * EventSource is unavailable (server-side), so callers can fall back to
+ * polling. onError is called if the connection drops.
+ */
+export function subscribeTransferStatus(
+  txHash: string,
+  onStatus: (status: TransferStatus) => void,
+  onError?: (error: Event) => void
+): (() => void) | null {
+  if (typeof window === 'undefined' || typeof EventSource === 'undefined') {
+    return null
+  }
+  
+  const source = new EventSource(`${getApiBaseUrl()}/relayer/stream/${txHash}`)
+  
+  source.addEventListener('status', (event) => {
+    const status: TransferStatus = JSON.parse((event as MessageEvent).data)
+    onStatus(status)
+    if (isTerminal(status)) {
+      source.close()
+    }
+  })
+  
+  source.onerror = (event) => {
+    // EventSource reconnects on its own unless the stream was closed for good
+    if (source.readyState === EventSource.CLOSED && onError) {
+      onError(event)
+    }
+  }
+  
+  return () => source.close()
+}
+
+/**
+ * Wait for transfer completion, streaming status changes where possible and
+ * polling otherwise
  */
 export async function waitForTransferCompletion(
   txHash: string,
@@ -150,6 +195,40 @@ export async function waitForTransferCompletion(
 ): Promise<TransferStatus> {
   const { maxAttempts = 60, intervalMs = 5000, onStatusUpdate } = options
   
+  // null when streaming is unavailable, 'timeout' if it ran out of time
+  const streamed = await new Promise<TransferStatus | 'timeout' | null>((resolve) => {
+    const timeout = setTimeout(() => {
+      close?.()
+      resolve('timeout')
+    }, maxAttempts * intervalMs)
+    const close = subscribeTransferStatus(
+      txHash,
+      (status) => {
+        onStatusUpdate?.(status)
+        if (isTerminal(status)) {
+          clearTimeout(timeout)
+          resolve(status)
+        }
+      },
+      () => {
+        // Stream unavailable: fall back to polling
+        clearTimeout(timeout)
+        resolve(null)
+      }
+    )
+    if (!close) {
+      clearTimeout(timeout)
+      resolve(null)
+    }
+  })
+  
+  if (streamed === 'timeout') {
+    throw new Error('Transfer completion timeout')
+  }
+  if (streamed) {
+    return streamed
+  }
+  
   for (let i = 0; i < maxAttempts; i++) {
     const status = await getTransferStatus(txHash)
     
@@ -158,7 +237,7 @@ export async function waitForTransferCompletion(
         onStatusUpdate(status)
       }
       
-      if (status.status === 'completed' || status.status === 'failed') {
+      if (isTerminal(status)) {
         return status
       }
     }